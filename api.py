@@ -0,0 +1,415 @@
+# ==========================================================
+# FIELD DEVICE JSON API
+# A small asyncio HTTP API over the same tables, procedures and
+# triggers the Streamlit app uses, so a device action is one HTTP
+# request instead of a full script rerun.
+#
+#     WILDLIFE_API_TOKEN=... uvicorn api:app --host 127.0.0.1 --port 8000 --workers 4
+#
+# Needs fastapi, uvicorn and aiomysql. Connection settings come
+# from db.DB_CONFIG, which may be a privileged account, so the API
+# refuses to start without WILDLIFE_API_TOKEN and every request must
+# send it in the X-API-Key header. Devices on other hosts should
+# reach it through a TLS-terminating proxy rather than a bare
+# public bind.
+#
+# Writes:  POST /sightings, /sightings/{id}/details, /threats,
+#          /animals/health, /equipment/issue, /equipment/return
+# Batches: POST /batch runs many of the above on one connection,
+#          each in its own transaction or all in one (atomic).
+# Lookups: GET /lookups/{name}?after=...&limit=... (keyset pages)
+#          GET /animals/tracking/{tracking_id}, GET /ping
+# ==========================================================
+import hmac
+import os
+from contextlib import asynccontextmanager
+from datetime import date, time, timedelta
+from typing import Any, List, Literal, Optional
+
+import aiomysql
+import pymysql
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from db import DB_CONFIG
+from domains import DOMAINS
+
+POOL_MIN = int(os.environ.get("WILDLIFE_API_POOL_MIN", "2"))
+POOL_MAX = int(os.environ.get("WILDLIFE_API_POOL_MAX", "20"))
+API_TOKEN = os.environ.get("WILDLIFE_API_TOKEN")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_OPS = 500
+
+# MySQL error number -> HTTP status for client mistakes
+DB_ERROR_STATUS = {
+    1062: 409,   # duplicate key
+    1451: 409,   # row still referenced
+    1452: 422,   # unknown ranger/habitat/animal/sighting
+    1644: 409,   # SIGNAL from a trigger (e.g. trg_no_sick_sighting)
+    1265: 422,   # value outside an ENUM domain
+    1366: 422,
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+# ------------------------------------------------------
+# Request bodies
+# ------------------------------------------------------
+class SightingIn(BaseModel):
+    Ranger_ID: int
+    Sighting_Date: date
+    Sighting_Time: time
+    Location: str = Field(max_length=100)
+    # Same capture key as field_queue.py: a retried request returns the
+    # sighting created the first time instead of adding another one
+    Capture_Key: Optional[str] = Field(default=None, max_length=36)
+
+
+class DetailIn(BaseModel):
+    Animal_ID: int
+    Ranger_ID: int
+
+
+class DetailsIn(BaseModel):
+    sighting_ID: int
+    details: List[DetailIn] = Field(min_length=1, max_length=MAX_BATCH_OPS)
+
+
+class ThreatIn(BaseModel):
+    Habitat_ID: int
+    Ranger_ID: int
+    Threat_Level: Literal[tuple(DOMAINS["Threat_Level"])]
+    Description: str
+    Capture_Key: Optional[str] = Field(default=None, max_length=36)
+
+
+class HealthIn(BaseModel):
+    Tracking_ID: str = Field(max_length=20)
+    Health_status: Literal[tuple(DOMAINS["Health_status"])]
+
+
+class IssueIn(BaseModel):
+    Ranger_ID: int
+    Equipment_ID: int
+    Date_Issued: Optional[date] = None
+
+
+class ReturnIn(BaseModel):
+    Equipment_ID: int
+    Ranger_ID: Optional[int] = None
+
+
+class BatchOp(BaseModel):
+    op: Literal["sighting", "details", "threat", "health", "issue", "return"]
+    body: dict
+
+
+class BatchIn(BaseModel):
+    ops: List[BatchOp] = Field(min_length=1, max_length=MAX_BATCH_OPS)
+    atomic: bool = False   # True: all ops commit together or not at all
+
+
+# ------------------------------------------------------
+# Operations (run inside a transaction on cursor `cur`)
+# ------------------------------------------------------
+async def log_sighting(cur, body):
+    # LAST_INSERT_ID(expr) hands back the existing id on a replayed capture key
+    await cur.execute("""
+        INSERT INTO Sighting (Ranger_ID, Sighting_Date, Sighting_Time, Location, Capture_Key)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE Sighting_ID = LAST_INSERT_ID(Sighting_ID)
+    """, (body.Ranger_ID, body.Sighting_Date, body.Sighting_Time, body.Location, body.Capture_Key))
+    return {"Sighting_ID": cur.lastrowid}
+
+
+async def add_details(cur, body):
+    # Re-sending a detail is a no-op; bad references still fail
+    await cur.executemany("""
+        INSERT INTO Sighting_Details (sighting_ID, Animal_ID, Ranger_ID) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE sighting_ID = sighting_ID
+    """, [(body.sighting_ID, d.Animal_ID, d.Ranger_ID) for d in body.details])
+    return {"sighting_ID": body.sighting_ID, "details": len(body.details)}
+
+
+async def log_threat(cur, body):
+    if body.Capture_Key is None:
+        await cur.execute("CALL LogThreatReport(%s, %s, %s, %s)",
+                          (body.Habitat_ID, body.Ranger_ID, body.Threat_Level, body.Description))
+    else:
+        # Keyed (retry-safe) variant of LogThreatReport: same row, plus the key
+        await cur.execute("""
+            INSERT INTO Threat_Report (Habitat_ID, Ranger_ID, Report_Date, Threat_Level, Description, Capture_Key)
+            VALUES (%s, %s, CURDATE(), %s, %s, %s)
+            ON DUPLICATE KEY UPDATE Report_ID = LAST_INSERT_ID(Report_ID)
+        """, (body.Habitat_ID, body.Ranger_ID, body.Threat_Level, body.Description, body.Capture_Key))
+    await cur.execute("SELECT LAST_INSERT_ID() AS Report_ID")
+    return await cur.fetchone()
+
+
+async def update_health(cur, body):
+    await cur.execute("SELECT COUNT(*) AS n FROM Animal WHERE Tracking_ID = %s", (body.Tracking_ID,))
+    if not (await cur.fetchone())["n"]:
+        raise ApiError(404, f"No animal with tracking ID {body.Tracking_ID}")
+    await cur.execute("CALL UpdateAnimalHealth(%s, %s)", (body.Tracking_ID, body.Health_status))
+    return {"Tracking_ID": body.Tracking_ID, "Health_status": body.Health_status}
+
+
+async def issue_equipment(cur, body):
+    # Lock the equipment row so two devices cannot take the same item
+    await cur.execute("SELECT StatusEqui FROM Equipment WHERE Equipment_ID = %s FOR UPDATE",
+                      (body.Equipment_ID,))
+    row = await cur.fetchone()
+    if row is None:
+        raise ApiError(404, f"No equipment {body.Equipment_ID}")
+    if row["StatusEqui"] != "Available":
+        raise ApiError(409, f"Equipment {body.Equipment_ID} is {row['StatusEqui']}")
+    # trg_equipment_inuse sets StatusEqui = 'In Use'
+    await cur.execute("INSERT INTO Uses (Ranger_ID, Equipment_ID, Date_Issued) VALUES (%s, %s, %s)",
+                      (body.Ranger_ID, body.Equipment_ID, body.Date_Issued or date.today()))
+    return {"Equipment_ID": body.Equipment_ID, "Ranger_ID": body.Ranger_ID, "StatusEqui": "In Use"}
+
+
+async def return_equipment(cur, body):
+    query, params = "DELETE FROM Uses WHERE Equipment_ID = %s", [body.Equipment_ID]
+    if body.Ranger_ID is not None:
+        query += " AND Ranger_ID = %s"
+        params.append(body.Ranger_ID)
+    await cur.execute(query, params)
+    if cur.rowcount == 0:
+        raise ApiError(404, f"Equipment {body.Equipment_ID} is not issued")
+    # trg_equipment_available sets StatusEqui = 'Available'
+    return {"Equipment_ID": body.Equipment_ID, "returned": cur.rowcount}
+
+
+OPERATIONS = {
+    "sighting": (SightingIn, log_sighting),
+    "details": (DetailsIn, add_details),
+    "threat": (ThreatIn, log_threat),
+    "health": (HealthIn, update_health),
+    "issue": (IssueIn, issue_equipment),
+    "return": (ReturnIn, return_equipment),
+}
+
+# Paginated lookups: name -> (SELECT, key columns, {query param: column})
+LOOKUPS = {
+    "species": ("SELECT Sp_ID, common_name, Scientific_name, conservation_status FROM Species",
+                ("Sp_ID",), {"status": "conservation_status"}),
+    "habitats": ("SELECT Habitat_ID, habitat_type, climate, region FROM Habitat",
+                 ("Habitat_ID",), {}),
+    "rangers": ("SELECT Ranger_ID, fname, raankOfRanger FROM Ranger",
+                ("Ranger_ID",), {"rank": "raankOfRanger"}),
+    "animals": ("SELECT Animal_ID, Sp_ID, Tracking_ID, DOB, Gender, Health_status FROM Animal",
+                ("Animal_ID", "Sp_ID"), {"species": "Sp_ID", "health": "Health_status"}),
+    "equipment": ("SELECT Equipment_ID, equip_type, StatusEqui, Org_ID FROM Equipment",
+                  ("Equipment_ID",), {"status": "StatusEqui"}),
+    "sightings": ("SELECT Sighting_ID, Ranger_ID, Sighting_Date, Sighting_Time, Location FROM Sighting",
+                  ("Sighting_ID",), {"ranger": "Ranger_ID"}),
+    "threats": ("SELECT Report_ID, Habitat_ID, Ranger_ID, Report_Date, Threat_Level, Description FROM Threat_Report",
+                ("Report_ID",), {"habitat": "Habitat_ID", "level": "Threat_Level"}),
+}
+
+
+# ------------------------------------------------------
+# Plumbing
+# ------------------------------------------------------
+def _json_row(row):
+    # TIME columns come back as timedelta; send them as HH:MM:SS
+    return {k: str(v) if isinstance(v, timedelta) else v for k, v in row.items()}
+
+
+def _db_error(e):
+    errno = e.args[0] if e.args else None
+    message = e.args[1] if len(e.args) > 1 else str(e)
+    return ApiError(DB_ERROR_STATUS.get(errno, 500), message)
+
+
+async def _run(conn, op, body):
+    model, handler = OPERATIONS[op]
+    if not isinstance(body, model):
+        try:
+            body = model.model_validate(body)
+        except ValueError as e:
+            raise ApiError(422, str(e))
+    async with conn.cursor(aiomysql.DictCursor) as cur:
+        try:
+            return await handler(cur, body)
+        except pymysql.err.MySQLError as e:
+            raise _db_error(e)
+
+
+# One operation in its own transaction
+async def _in_transaction(conn, op, body):
+    await conn.begin()
+    try:
+        result = await _run(conn, op, body)
+        await conn.commit()
+        return result
+    except BaseException:
+        await conn.rollback()
+        raise
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if not API_TOKEN:
+        raise RuntimeError("Set WILDLIFE_API_TOKEN: the API does not run without authentication")
+    app.state.pool = await aiomysql.create_pool(
+        host=DB_CONFIG["host"], user=DB_CONFIG["user"], password=DB_CONFIG["password"],
+        db=DB_CONFIG["database"], autocommit=True, connect_timeout=DB_CONFIG["connection_timeout"],
+        minsize=POOL_MIN, maxsize=POOL_MAX)
+    yield
+    app.state.pool.close()
+    await app.state.pool.wait_closed()
+
+
+# No token configured means no request is accepted
+async def check_token(x_api_key: Optional[str] = Header(default=None)):
+    if not API_TOKEN or x_api_key is None or not hmac.compare_digest(x_api_key.encode(), API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-API-Key")
+
+
+app = FastAPI(title="Wildlife Conservation Field API", lifespan=lifespan,
+              dependencies=[Depends(check_token)])
+
+
+async def _single(request, op, body):
+    async with request.app.state.pool.acquire() as conn:
+        try:
+            return await _in_transaction(conn, op, body)
+        except ApiError as e:
+            raise HTTPException(status_code=e.status, detail=e.detail)
+
+
+# ------------------------------------------------------
+# Write endpoints
+# ------------------------------------------------------
+@app.post("/sightings", status_code=201)
+async def post_sighting(body: SightingIn, request: Request):
+    return await _single(request, "sighting", body)
+
+
+@app.post("/sightings/{sighting_id}/details", status_code=201)
+async def post_details(sighting_id: int, details: List[DetailIn], request: Request):
+    return await _single(request, "details", DetailsIn(sighting_ID=sighting_id, details=details))
+
+
+@app.post("/threats", status_code=201)
+async def post_threat(body: ThreatIn, request: Request):
+    return await _single(request, "threat", body)
+
+
+@app.post("/animals/health")
+async def post_health(body: HealthIn, request: Request):
+    return await _single(request, "health", body)
+
+
+@app.post("/equipment/issue")
+async def post_issue(body: IssueIn, request: Request):
+    return await _single(request, "issue", body)
+
+
+@app.post("/equipment/return")
+async def post_return(body: ReturnIn, request: Request):
+    return await _single(request, "return", body)
+
+
+# --- Many operations, one connection ---
+# Not atomic: every op commits on its own and gets its own result.
+# Atomic: one transaction; the first failure rolls everything back.
+@app.post("/batch")
+async def post_batch(batch: BatchIn, request: Request):
+    results: List[dict[str, Any]] = []
+    async with request.app.state.pool.acquire() as conn:
+        if not batch.atomic:
+            for op in batch.ops:
+                try:
+                    results.append({"ok": True, "result": await _in_transaction(conn, op.op, op.body)})
+                except ApiError as e:
+                    results.append({"ok": False, "status": e.status, "error": e.detail})
+            return {"results": results, "committed": sum(r["ok"] for r in results)}
+
+        await conn.begin()
+        try:
+            for i, op in enumerate(batch.ops):
+                results.append({"ok": True, "result": await _run(conn, op.op, op.body)})
+            await conn.commit()
+        except ApiError as e:
+            await conn.rollback()
+            raise HTTPException(status_code=e.status, detail={"failed_op": i, "error": e.detail})
+        except BaseException:
+            await conn.rollback()
+            raise
+    return {"results": results, "committed": len(results)}
+
+
+# ------------------------------------------------------
+# Lookups
+# ------------------------------------------------------
+# Keyset pagination: pass the returned next_after back as ?after=...
+# (comma separated for two-column keys). Each page is an index range
+# scan on the primary key, however deep the client pages.
+@app.get("/lookups/{name}")
+async def get_lookup(name: str, request: Request, after: Optional[str] = None,
+                     limit: int = DEFAULT_PAGE_SIZE):
+    if name not in LOOKUPS:
+        raise HTTPException(status_code=404, detail=f"Unknown lookup {name}; try one of {sorted(LOOKUPS)}")
+    select, key, filters = LOOKUPS[name]
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    where, params = [], []
+    for param, column in filters.items():
+        value = request.query_params.get(param)
+        if value is not None:
+            where.append(f"{column} = %s")
+            params.append(value)
+    if after:
+        values = after.split(",")
+        if len(values) != len(key):
+            raise HTTPException(status_code=422, detail=f"after needs {len(key)} value(s): {', '.join(key)}")
+        where.append(f"({', '.join(key)}) > ({', '.join(['%s'] * len(key))})")
+        params.extend(values)
+    query = select
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {', '.join(key)} LIMIT %s"
+    params.append(limit + 1)   # one extra row tells whether there is a next page
+
+    async with request.app.state.pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(query, params)
+            rows = await cur.fetchall()
+    more = len(rows) > limit
+    rows = [_json_row(r) for r in rows[:limit]]
+    next_after = ",".join(str(rows[-1][k]) for k in key) if more else None
+    return {"items": rows, "next_after": next_after}
+
+
+@app.get("/animals/tracking/{tracking_id}")
+async def get_animal_by_tracking(tracking_id: str, request: Request):
+    async with request.app.state.pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute("""
+                SELECT a.Animal_ID, a.Sp_ID, a.Tracking_ID, s.common_name, a.DOB, a.Gender, a.Health_status,
+                       als.last_seen_date, als.last_location, als.sightings_count
+                FROM Animal a
+                JOIN Species s ON a.Sp_ID = s.Sp_ID
+                LEFT JOIN Animal_Last_Seen als ON als.Animal_ID = a.Animal_ID
+                WHERE a.Tracking_ID = %s
+            """, (tracking_id.strip(),))
+            row = await cur.fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"No animal with tracking ID {tracking_id}")
+    return _json_row(row)
+
+
+@app.get("/ping")
+async def ping(request: Request):
+    async with request.app.state.pool.acquire() as conn:
+        await conn.ping()
+    return {"status": "ok"}
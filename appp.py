@@ -1,19 +1,56 @@
 import streamlit as st
-import mysql.connector
 from mysql.connector import Error
 import pandas as pd
 from datetime import date
 import time
+import os
+import json
+import uuid
+import streamlit.components.v1 as components
+
+from db import (connect, pooled_connection, transaction, insert_many, stream_query, execute_prepared,
+                quote_identifier, DEFAULT_CHUNK_SIZE)
+from queries import TABLES, ANALYTICS_QUERIES
+from export import EXPORT_FORMATS, MIME_TYPES, parquet_available, export_query, cleanup_export, format_bytes
+from cooccurrence import CooccurrenceIndex, SOURCE_TABLES as COOCCURRENCE_TABLES, SPECIES_BASES
+from threat_series import ThreatSeriesEngine, SHORT_WINDOW, LONG_WINDOW
+from optimistic import changed_columns, build_conditional_update, build_reload, conflict_rows
+from demographics import load_demographics, population_pyramid, health_by_age, birth_cohorts, species_summary
+from search import SEARCH_KINDS, build_search
+from field_queue import FieldQueue, is_offline_error, new_capture_key
+from assignment_optimizer import load_problem as load_assignment_problem, solve as solve_assignments, HABITAT_CAPACITY
+from last_seen import lookup_tracking, not_seen_since, recently_seen
+from health_history import status_as_of, status_counts_as_of, transitions, daily_transitions, history_for_tracking
+from change_feed import CDC_TABLES, latest_seq
+from frame_cache import UNTRACKED_MAX_AGE, FrameCache
+from cascade_delete import preview_delete, blocking_rows, run_delete
+from domains import DOMAINS, decode
+from name_resolver import NameResolver
+from shared_store import SESSION_COOKIE, SESSION_MAX_AGE, get_sessions, get_shared_cache
 
 # ==========================================================
 # LOGIN VALIDATION
 # ==========================================================
-if "user" not in st.session_state or "password" not in st.session_state or "role" not in st.session_state:
+# The session token is kept in a cookie (never in the URL) and checked
+# against the shared session store on every rerun: a login made on
+# another worker (or before a reload) is picked up, and a logout or
+# expiry on any worker ends the session here too.
+CLIENT = st.context.headers.get("User-Agent", "")
+if "sid" in st.query_params:
+    del st.query_params["sid"]  # links from when the token was in the URL
+session_token = st.session_state.get("session_token") or st.context.cookies.get(SESSION_COOKIE)
+login_session = get_sessions().get(session_token, CLIENT)
+if login_session:
+    st.session_state.update(login_session)
+    st.session_state.session_token = session_token
+else:
+    for key in ("user", "role", "session_token"):
+        st.session_state.pop(key, None)
+if "user" not in st.session_state or "role" not in st.session_state:
     st.warning("Please log in first.")
     st.switch_page("login.py")
-    
+
 USER = st.session_state.user
-PASSWORD = st.session_state.password
 ROLE = "Supervisor" if USER == "root" else "Viewer"
 
 # ==========================================================
@@ -28,36 +65,202 @@ def view_only_message():
 # ==========================================================
 # DATABASE CONNECTION
 # ==========================================================
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password':'NAGS@2882',
-    'database': 'wildlife_conservation'
-}
+# Seconds to wait before trying an unreachable server again
+RECONNECT_BACKOFF = 30
+# Rows shown by "Load Table"; Export streams the full table to a file
+PREVIEW_ROWS = 10000
+# Offline lookup lists: how often the local copy is rewritten, and how
+# many recent sightings the Sighting Details form offers
+LOOKUP_SAVE_INTERVAL = 300
+RECENT_SIGHTINGS = 500
+# Animals per page of the health status as-of snapshot
+HEALTH_PAGE_ROWS = 500
+
+# Connection settings live in db.py (shared with the command-line tools)
+@st.cache_resource
+def _connect():
+    return connect()
 
+# Time of the last failed attempt (shared by all sessions)
 @st.cache_resource
-def get_connection():
+def _connection_state():
+    return {"failed_at": 0.0}
+
+# Failed attempts are not cached. The connection is not pinged before
+# use: one the server dropped is reopened when a statement fails on it
+# (reconnect / read_rows).
+# quiet=True skips the error message (offline-capable forms use it).
+def get_connection(quiet=False):
+    state = _connection_state()
+    if time.time() - state["failed_at"] < RECONNECT_BACKOFF:
+        if not quiet:
+            st.error("Database connection error: server unreachable, retrying shortly.")
+        return None
     try:
-        return mysql.connector.connect(**DB_CONFIG)
+        return _connect()
     except Error as e:
-        st.error(f"Database connection error: {e}")
+        state["failed_at"] = time.time()
+        if not quiet:
+            st.error(f"Database connection error: {e}")
         return None
 
+# --- Reopen the shared connection after a connection error ---
+# Returns False (and starts the backoff) when the server is unreachable.
+def reconnect(conn):
+    try:
+        conn.reconnect(attempts=1)
+        return True
+    except Error:
+        _connection_state()["failed_at"] = time.time()
+        return False
+
+# --- Rows of a read; a dropped connection is reopened and the read retried once ---
+# Parameterised statements go through the prepared statement cache
+# (parsed once per connection).
+def read_rows(conn, query, params=None):
+    for attempt in (1, 2):
+        try:
+            if params is not None and not query.lstrip().upper().startswith("CALL"):
+                return execute_prepared(conn, query, params)
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, params or ())
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+        except Error as e:
+            if attempt == 2 or not is_offline_error(e) or not reconnect(conn):
+                raise
+
+# Writes are not retried (the first attempt may have reached the server);
+# the connection is reopened so the user's next attempt can succeed.
 def execute_query(query, params=None, fetch=True):
     conn = get_connection()
     if conn is None:
         return None
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params or ())
         if fetch:
-            result = cursor.fetchall()
+            return read_rows(conn, query, params)
+        if params is not None and not query.lstrip().upper().startswith("CALL"):
+            execute_prepared(conn, query, params, fetch=False)
+        else:
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            conn.commit()
             cursor.close()
-            return result
+        frames_changed()
+        return True
+    except Error as e:
+        if is_offline_error(e):
+            reconnect(conn)
+        if "denied" in str(e).lower():
+            st.warning("🚫 You don't have permission to perform this action.")
         else:
+            st.error(f"Query execution error: {e}")
+        return None
+
+# --- First `limit` rows of a large read, as a DataFrame ---
+# Streamed in chunks on a pooled connection of its own (an unbuffered
+# result would block the shared one). Stopping at the limit drops that
+# connection's socket rather than reading the rest (the pool reopens
+# it). Returns (frame, truncated).
+def preview_query(query, params=None, limit=None):
+    limit = limit or PREVIEW_ROWS
+    frames, rows_read = [], 0
+    try:
+        with pooled_connection() as conn:
+            chunks = stream_query(conn, query, params, chunk_size=min(limit + 1, DEFAULT_CHUNK_SIZE))
+            for columns, _, rows in chunks:
+                frames.append(pd.DataFrame.from_records(rows, columns=columns))
+                rows_read += len(rows)
+                if rows_read > limit:
+                    break
+            chunks.close()
+    except Error as e:
+        st.error(f"Query execution error: {e}")
+        return None, False
+    df = pd.concat(frames, ignore_index=True)
+    return df.head(limit), len(df) > limit
+
+# --- Local journal for field captures made while offline ---
+@st.cache_resource
+def get_field_queue():
+    return FieldQueue()
+
+# --- Lookup list that still works offline ---
+# The last list seen online is kept in the field queue, refreshed at
+# most every LOOKUP_SAVE_INTERVAL seconds rather than on every render.
+def offline_lookup(name, query):
+    queue = get_field_queue()
+    conn = get_connection(quiet=True)
+    rows = None
+    if conn is not None:
+        try:
+            rows = read_rows(conn, query)
+        except Error as e:
+            if not is_offline_error(e):
+                st.error(f"Query execution error: {e}")
+    if rows:
+        queue.save_lookup(name, rows, min_interval=LOOKUP_SAVE_INTERVAL)
+        return rows
+    return queue.load_lookup(name)
+
+# --- Write now, or journal the capture locally if the server is unreachable ---
+# Returns "saved", "queued", or None when the server rejected the write.
+# Keyed captures put the same Capture_Key in the online write and the
+# queued copy, so a write that committed but lost its reply is skipped
+# at sync instead of inserted twice.
+def write_or_queue(query, params, capture):
+    conn = get_connection(quiet=True)
+    if conn is not None:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
             conn.commit()
             cursor.close()
-            return True
+            frames_changed()
+            return "saved"
+        except Error as e:
+            if not is_offline_error(e):
+                if "denied" in str(e).lower():
+                    st.warning("🚫 You don't have permission to perform this action.")
+                else:
+                    st.error(f"Query execution error: {e}")
+                return None
+            reconnect(conn)
+    capture()
+    return "queued"
+
+# --- Run several statements as one transaction ---
+# work(cursor) does the statements; its return value is passed back.
+# Everything commits once at the end, or rolls back on error (None).
+# Runs on a pooled connection of its own: on the shared one, statements
+# of other sessions would land inside the transaction.
+def execute_transaction(work):
+    if get_connection() is None:
+        return None
+    try:
+        with pooled_connection() as conn, transaction(conn) as cursor:
+            result = work(cursor)
+        frames_changed()
+        return result
+    except Error as e:
+        if "denied" in str(e).lower():
+            st.warning("🚫 You don't have permission to perform this action.")
+        else:
+            st.error(f"Query execution error: {e}")
+        return None
+
+# --- Like execute_query(fetch=False) but returns the affected row count ---
+def execute_update(query, params=None):
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        count = execute_prepared(conn, query, params, fetch=False)
+        conn.commit()
+        if count:
+            frames_changed()
+        return count
     except Error as e:
         if "denied" in str(e).lower():
             st.warning("🚫 You don't have permission to perform this action.")
@@ -65,6 +268,233 @@ def execute_query(query, params=None, fetch=True):
             st.error(f"Query execution error: {e}")
         return None
 
+# --- Select box for a coded domain column in an Update form ---
+# NULL (e.g. values the section-15 migration could not map) shows as
+# "(not set)" and stays NULL unless the user picks a label.
+NOT_SET = "(not set)"
+
+def domain_select(label, column, current):
+    options = DOMAINS[column]
+    if current in options:
+        return st.selectbox(label, options, index=options.index(current))
+    choice = st.selectbox(label, [NOT_SET] + options)
+    return None if choice == NOT_SET else choice
+
+# --- Row as it was when the user opened it in an Update form ---
+# Kept in session_state so a rerun (e.g. the submit itself) does not
+# silently pick up someone else's newer version as the baseline.
+# Replaced when another row is selected, dropped when the page changes.
+def edit_snapshot(form_key, row_key, loader):
+    snap = st.session_state.get(f"snapshot_{form_key}")
+    if snap is None or snap["key"] != row_key:
+        snap = {"key": row_key, "row": loader()}
+        st.session_state[f"snapshot_{form_key}"] = snap
+    return snap["row"]
+
+# --- Save only the changed columns, guarded by row_version ---
+# Returns True when saved; reports "no changes" and conflicts itself.
+def save_changes(form_key, table, original, new_values):
+    changes = changed_columns(original, new_values)
+    if not changes:
+        st.info("No changes to save.")
+        return False
+    query, params = build_conditional_update(table, original, changes)
+    count = execute_update(query, params)
+    if count is None:
+        return False
+    st.session_state.pop(f"snapshot_{form_key}", None)
+    if count == 0:
+        reload_query, reload_params = build_reload(table, original)
+        latest = execute_query(reload_query, reload_params)
+        if not latest:
+            st.error("⚠️ This record was deleted by someone else. Your changes were not saved.")
+        else:
+            st.error("⚠️ Someone else changed this record while you were editing. "
+                     "Your changes were not saved; the form now shows the latest values.")
+            st.dataframe(pd.DataFrame(conflict_rows(original, changes, latest[0])).astype(str),
+                         use_container_width=True)
+        return False
+    return True
+
+# --- Current Table_Version counters for the given tables ---
+# Used as cache keys: a changed counter means the cached result is stale.
+def get_table_versions(*tables):
+    placeholders = ", ".join(["%s"] * len(tables))
+    rows = execute_query(f"SELECT table_name, version FROM Table_Version WHERE table_name IN ({placeholders})", tables)
+    found = {r['table_name']: r['version'] for r in rows or []}
+    return tuple(found.get(t, 0) for t in tables)
+
+# --- Co-occurrence index, rebuilt only when Inhabits/Sighting_Details change ---
+@st.cache_resource(max_entries=1)
+def load_cooccurrence(versions):
+    return CooccurrenceIndex.from_connection(get_connection())
+
+# --- Threat time-series engine, shared by all sessions ---
+@st.cache_resource
+def get_threat_engine():
+    return ThreatSeriesEngine()
+
+# --- Species name resolver, shared by all sessions ---
+@st.cache_resource
+def _name_resolver():
+    return NameResolver.from_connection(get_connection())
+
+# Brought up to date from change_log (Species/Alt_Names) on every use
+def get_name_resolver():
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        resolver = _name_resolver()
+        resolver.refresh(conn)
+        return resolver
+    except Error as e:
+        st.error(f"Query execution error: {e}")
+        return None
+
+# --- Delete with impact preview and chunked child deletes (cascade_delete.py) ---
+# Shows the rows each child table will lose; the button removes them in
+# small committed batches with a progress bar, then the parent row.
+# Returns True once the parent row is gone.
+def delete_with_preview(entity, key_value, button_label):
+    conn = get_connection()
+    if conn is None:
+        return False
+    try:
+        impact = preview_delete(conn, entity, key_value)
+    except Error as e:
+        st.error(f"Query execution error: {e}")
+        return False
+    st.write("#### Delete impact")
+    st.dataframe(pd.DataFrame(impact), use_container_width=True, hide_index=True)
+    if blocking_rows(impact):
+        st.error(f"❌ This {entity.lower()} cannot be deleted while the rows marked 'blocks' exist.")
+        return False
+    if not st.button(button_label):
+        return False
+    bar = st.progress(0.0, text="Deleting...")
+
+    def report(p):
+        bar.progress(min(p["done"] / p["total"], 1.0) if p["total"] else 1.0,
+                     text=f"{p['step']}: {p['deleted']} of {p['expected']}")
+
+    try:
+        # The batch transactions run on a connection of their own
+        with pooled_connection() as delete_conn:
+            stats = run_delete(delete_conn, entity, key_value, progress=report, impact=impact)
+    except Error as e:
+        if "denied" in str(e).lower():
+            st.warning("🚫 You don't have permission to perform this action.")
+        else:
+            st.error(f"Query execution error: {e}")
+        return False
+    finally:
+        frames_changed()
+    bar.progress(1.0, text=f"Removed {stats['rows']} related rows in {stats['batches']} batches "
+                           f"({stats['seconds']:.1f}s)")
+    return stats["deleted_parent"]
+
+# --- DataFrame memo cache shared by all sessions (frame_cache.py) ---
+@st.cache_resource
+def get_frame_cache():
+    return FrameCache()
+
+# Writes made through this app drop cached frames right away, in this
+# worker and (through the shared generation token) in every other one;
+# changes from elsewhere show up through change_log (CDC tables) or the
+# Table_Version counters (section 19). Frames reading a table neither
+# covers are kept for UNTRACKED_MAX_AGE only.
+def frames_changed():
+    get_frame_cache().invalidate()
+    get_shared_cache().bump()
+
+# Non-CDC tables with Table_Version counters (sections 7 and 19)
+VERSIONED_TABLES = ("Inhabits", "Habitat", "Ranger", "Assigned_To", "Organization")
+
+# --- Version token for the tables a frame reads ---
+# Returns (token, tracked): tracked is False when some table has no
+# counter the token can see.
+def frame_version(conn, tables):
+    cdc = [t for t in tables if t in CDC_TABLES]
+    versioned = [t for t in tables if t in VERSIONED_TABLES]
+    tracked = len(cdc) + len(versioned) == len(tables)
+    try:
+        seq = latest_seq(conn, cdc) if cdc else 0
+    except Error:
+        seq, tracked = None, False  # change_log missing: rely on max age
+    counters = ()
+    if versioned:
+        try:
+            cursor = conn.cursor()
+            marks = ", ".join(["%s"] * len(versioned))
+            cursor.execute(f"SELECT table_name, version FROM Table_Version WHERE table_name IN ({marks})",
+                           tuple(versioned))
+            found = dict(cursor.fetchall())
+            cursor.close()
+        except Error:
+            found = {}
+        counters = tuple(found.get(t) for t in versioned)
+        tracked = tracked and None not in counters
+    return (seq, counters, get_shared_cache().generation()), tracked
+
+# --- Cache key owner: "shared", or this session's id for scope="session" ---
+# Session entries are private to one browser session (paging and filter
+# views nobody else asks for) and are dropped when it logs out.
+def frame_owner(scope):
+    if scope == "session":
+        return st.session_state.setdefault("frame_cache_session", uuid.uuid4().hex)
+    return "shared"
+
+# --- DataFrame for a read-only query, rebuilt only when its data changed ---
+# tables: the tables the query reads. scope="session" keeps a private
+# entry per session; identical frames are still stored only once.
+def cached_frame(name, query, tables, params=None, scope="shared"):
+    conn = get_connection()
+    if conn is None:
+        return pd.DataFrame()
+    version, tracked = frame_version(conn, tables)
+    shared = get_shared_cache()
+
+    # Rows come from the shared cache when another worker already ran the query
+    def build():
+        rows = shared.get_or_build(("frame", query, params, version), lambda: execute_query(query, params))
+        return None if rows is None else decode(pd.DataFrame(rows))
+
+    df = get_frame_cache().get((frame_owner(scope), name, params), version, build,
+                               max_age=None if tracked else UNTRACKED_MAX_AGE)
+    return df if df is not None else pd.DataFrame()
+
+# --- Health status as-of frame through the frame cache ---
+# A past date's snapshot no longer changes; today's is kept briefly.
+def health_as_of_frame(key, as_of, build, scope="shared"):
+    max_age = UNTRACKED_MAX_AGE if as_of >= date.today() else None
+    df = get_frame_cache().get((frame_owner(scope), "health_as_of", as_of) + key, 0, build, max_age=max_age)
+    return df if df is not None else pd.DataFrame()
+
+# --- Export a query result as a file download ---
+# Rows are streamed to a temp file (see export.py) instead of being
+# loaded into a DataFrame first.
+def export_widget(query, name, key):
+    with st.expander(f"⬇️ Export {name}"):
+        formats = EXPORT_FORMATS if parquet_available() else ["CSV"]
+        fmt = st.selectbox("Format", formats, key=f"export_fmt_{key}")
+        if st.button("Prepare Export", key=f"export_btn_{key}"):
+            # Own connection: the unbuffered stream would block the shared one
+            try:
+                with pooled_connection() as conn:
+                    path, stats = export_query(conn, query, fmt)
+            except (Error, RuntimeError) as e:
+                st.error(f"Export failed: {e}")
+                return
+            ext = "csv" if fmt == "CSV" else "parquet"
+            with open(path, "rb") as f:
+                st.download_button(f"💾 Download {name}.{ext}", f,
+                                   file_name=f"{name}.{ext}", mime=MIME_TYPES[fmt],
+                                   key=f"export_dl_{key}")
+            cleanup_export(path)
+            st.caption(f"{stats['rows']} rows, {format_bytes(stats['bytes'])} in {stats['seconds']:.2f}s "
+                       f"({format_bytes(stats['bytes_per_sec'])}/s)")
+
 # ==========================================================
 # PAGE CONFIG
 # ==========================================================
@@ -76,11 +506,64 @@ st.sidebar.success(f"👤 User: **{USER}** \n🎖️ Role: **{ROLE}**")
 if USER == "root":
     st.sidebar.warning("⚠️ You are using ROOT (full access).")
 
+# --- Give the browser the session token as a cookie ---
+# Streamlit can read cookies but not set them, so a hidden component
+# writes it on the app's own document. SameSite=Strict keeps it out of
+# cross-site requests; Secure is added when served over HTTPS. Written
+# from JavaScript it cannot be HttpOnly: see shared_store.py.
+def set_session_cookie(token, max_age):
+    script = f"""<script>
+        const doc = window.parent.document;
+        const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+        doc.cookie = {json.dumps(SESSION_COOKIE)} + "=" + {json.dumps(token)}
+            + "; Path=/; Max-Age={int(max_age)}; SameSite=Strict" + secure;
+    </script>"""
+    components.html(script, height=0)
+
+if st.session_state.session_token not in (st.context.cookies.get(SESSION_COOKIE),
+                                          st.session_state.get("cookie_token")):
+    set_session_cookie(st.session_state.session_token, SESSION_MAX_AGE)
+    st.session_state.cookie_token = st.session_state.session_token
+
+# The store entry is deleted for every worker; the browser's cookie
+# then matches no session. This session's private frames go too.
 if st.sidebar.button("🚪 Logout"):
+    get_sessions().delete(st.session_state.get("session_token"))
+    if "frame_cache_session" in st.session_state:
+        get_frame_cache().invalidate((st.session_state.frame_cache_session,))
     for key in list(st.session_state.keys()):
         del st.session_state[key]
     st.switch_page("login.py")
 
+# Offline field captures: push them as soon as the server is reachable
+field_queue = get_field_queue()
+queue_counts = field_queue.counts()
+if queue_counts.get("pending"):
+    sync_conn = get_connection(quiet=True)
+    if sync_conn is None:
+        st.sidebar.warning(f"📥 {queue_counts['pending']} field capture(s) saved offline, waiting to sync.")
+    else:
+        try:
+            with pooled_connection() as own_conn:
+                sync_stats = field_queue.sync(own_conn)
+            st.sidebar.success(f"🔄 Synced {sync_stats['synced']} field capture(s) in {sync_stats['batches']} batch(es).")
+        except Error as e:
+            st.sidebar.warning(f"📥 Field capture sync postponed: {e}")
+        queue_counts = field_queue.counts()
+if queue_counts.get("rejected"):
+    with st.sidebar.expander(f"❌ {queue_counts['rejected']} field capture(s) rejected"):
+        st.dataframe(pd.DataFrame(field_queue.rejected()), use_container_width=True)
+
+if can_edit():
+    with st.sidebar.expander("🧮 Frame cache"):
+        cache_stats = get_frame_cache().stats()
+        st.caption(f"{cache_stats['used_mb']:.1f} / {cache_stats['budget_mb']:.0f} MB · "
+                   f"{cache_stats['entries']} entries, {cache_stats['frames']} frames")
+        st.caption(f"Hits {cache_stats['hits']} · misses {cache_stats['misses']} "
+                   f"({cache_stats['hit_rate']:.0%}) · evictions {cache_stats['evictions']} · "
+                   f"shared {cache_stats['shared']}")
+        st.caption(f"Worker {os.getpid()} · shared store: {type(get_shared_cache().store).__name__}")
+
 st.sidebar.markdown("---")
 
 # ==========================================================
@@ -89,6 +572,7 @@ st.sidebar.markdown("---")
 st.sidebar.title("🌿 Navigation")
 page = st.sidebar.radio("Go to", [
     "🏠 Home",
+    "🔎 Search",
     "📊 View All Tables",
     "🦁 Species Management",
     "🌳 Habitat Management",
@@ -102,6 +586,13 @@ page = st.sidebar.radio("Go to", [
     "📈 Analytics"
 ])
 
+# Update-form baselines (edit_snapshot) are dropped when the user leaves
+# the page, so a form opened again later starts from the current row
+if st.session_state.get("edit_snapshot_page") != page:
+    for key in [k for k in st.session_state if k.startswith("snapshot_")]:
+        del st.session_state[key]
+    st.session_state.edit_snapshot_page = page
+
 # ==========================================================
 # HOME PAGE
 # ==========================================================
@@ -127,21 +618,63 @@ if page == "🏠 Home":
     if recent:
         st.dataframe(pd.DataFrame(recent), use_container_width=True)
 
+# ==========================================================
+# GLOBAL SEARCH
+# ==========================================================
+elif page == "🔎 Search":
+    st.header("🔎 Search")
+    text = st.text_input("Search threats, species, habitats and rangers", placeholder="e.g. snare, poaching, Nilgiris")
+    kinds = st.multiselect("Search in", SEARCH_KINDS, default=SEARCH_KINDS)
+    limit = st.slider("Max results", 5, 100, 20)
+    if text:
+        query, params = build_search(text, kinds, limit)
+        if query is None:
+            st.info("Enter at least one word of two or more letters.")
+        else:
+            start = time.perf_counter()
+            results = execute_query(query, params)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if results:
+                st.caption(f"{len(results)} results in {elapsed_ms:.0f} ms")
+                df = pd.DataFrame(results)
+                df["score"] = df["score"].astype(float).round(3)
+                st.dataframe(df, use_container_width=True)
+            elif results is not None:
+                st.info("No matches found.")
+
+    # In-memory lookup over common, scientific and alternative names
+    with st.expander("🧬 Resolve species names"):
+        raw = st.text_area("One name per line", placeholder="asian elephant\nPanthera pardus\nscaly anteatr")
+        names = [n for n in raw.splitlines() if n.strip()]
+        if names:
+            resolver = get_name_resolver()
+            if resolver is not None:
+                start = time.perf_counter()
+                matches = resolver.resolve_many(names)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                st.caption(f"{len(names)} names resolved in {elapsed_ms:.1f} ms")
+                st.dataframe(pd.DataFrame([
+                    {"input": n, "Sp_ID": m.Sp_ID if m else None, "matched_name": m.name if m else None,
+                     "source": m.source if m else None, "score": m.score if m else None,
+                     "ambiguous": m.ambiguous if m else None}
+                    for n, m in zip(names, matches)
+                ]), use_container_width=True, hide_index=True)
+
 # ==========================================================
 # VIEW ALL TABLES
 # ==========================================================
 elif page == "📊 View All Tables":
     st.header("📊 View All Database Tables")
-    table = st.selectbox("Select Table", [
-        "Species", "Alt_Names", "Habitat", "Inhabits", "Ranger", 
-        "Assigned_To", "Animal", "Threat_Report", "Organization", 
-        "Equipment", "Uses", "Sighting", "Sighting_Details"
-    ])
+    table = st.selectbox("Select Table", TABLES)
     if st.button("Load Table"):
-        data = execute_query(f"SELECT * FROM {table}")
-        if data:
-            st.dataframe(pd.DataFrame(data), use_container_width=True)
-            st.success(f"Loaded {len(data)} records from {table}")
+        df, truncated = preview_query(f"SELECT * FROM {quote_identifier(table, TABLES)}")
+        if df is not None and not df.empty:
+            st.dataframe(df, use_container_width=True)
+            if truncated:
+                st.info(f"Showing the first {len(df)} records of {table}; use Export for the full table.")
+            else:
+                st.success(f"Loaded {len(df)} records from {table}")
+    export_widget(f"SELECT * FROM {quote_identifier(table, TABLES)}", table, "table")
 
 # ==========================================================
 # SPECIES MANAGEMENT
@@ -158,30 +691,41 @@ elif page == "🦁 Species Management":
 
     # View
     with tabs[0]:
-        species = execute_query("SELECT * FROM Species")
-        if species:
-            st.dataframe(pd.DataFrame(species), use_container_width=True)
+        species = cached_frame("species", "SELECT * FROM Species", ["Species"])
+        if not species.empty:
+            st.dataframe(species, use_container_width=True)
             st.write("### Alternative Names")
-            alt = execute_query("SELECT s.common_name, a.Alt_Name FROM Species s JOIN Alt_Names a ON s.Sp_ID = a.Sp_ID")
-            if alt:
-                st.dataframe(pd.DataFrame(alt), use_container_width=True)
+            alt = cached_frame("alt_names", "SELECT s.common_name, a.Alt_Name FROM Species s JOIN Alt_Names a ON s.Sp_ID = a.Sp_ID",
+                               ["Species", "Alt_Names"])
+            if not alt.empty:
+                st.dataframe(alt, use_container_width=True)
 
     # Add
     if can_edit() and len(tabs) > 1:
         with tabs[1]:
+            habitat_list = execute_query("SELECT Habitat_ID, habitat_type, region FROM Habitat") or []
             with st.form("add_species"):
                 common = st.text_input("Common Name")
                 sci = st.text_input("Scientific Name")
-                status = st.selectbox("Conservation Status", ["Least Concern", "Near Threatened", "Vulnerable", "Endangered", "Critically Endangered"])
+                status = st.selectbox("Conservation Status", DOMAINS["conservation_status"])
                 life = st.number_input("Average Lifespan (years)", min_value=1, max_value=200)
-                alt_name = st.text_input("Alternative Name (optional)")
+                alt_text = st.text_input("Alternative Names (optional, comma separated)")
+                habitat_dict = {f"{h['habitat_type']} - {h['region']}": h['Habitat_ID'] for h in habitat_list}
+                selected_habitats = st.multiselect("Habitats (optional)", list(habitat_dict.keys()))
                 if st.form_submit_button("Add"):
-                    q = """INSERT INTO Species (common_name, Scientific_name, conservation_status, Avg_lifespan)
-                           VALUES (%s,%s,%s,%s)"""
-                    ok = execute_query(q, (common, sci, status, life), fetch=False)
-                    if ok and alt_name:
-                        spid = execute_query("SELECT LAST_INSERT_ID() as id")[0]['id']
-                        execute_query("INSERT INTO Alt_Names (Sp_ID, Alt_Name) VALUES (%s,%s)", (spid, alt_name), fetch=False)
+                    alt_names = list(dict.fromkeys(n.strip() for n in alt_text.split(",") if n.strip()))
+                    habitat_ids = [habitat_dict[h] for h in selected_habitats]
+
+                    # Species, its names and habitats in one transaction / one commit
+                    def add_species(cursor):
+                        cursor.execute("""INSERT INTO Species (common_name, Scientific_name, conservation_status, Avg_lifespan)
+                                          VALUES (%s,%s,%s,%s)""", (common, sci, status, life))
+                        spid = cursor.lastrowid
+                        insert_many(cursor, "Alt_Names", ("Sp_ID", "Alt_Name"), [(spid, n) for n in alt_names])
+                        insert_many(cursor, "Inhabits", ("Sp_ID", "Habitat_ID"), [(spid, h) for h in habitat_ids])
+                        return spid
+
+                    ok = execute_transaction(add_species)
                     if ok:
                         st.success("✅ Species added successfully!")
                         time.sleep(1)
@@ -197,21 +741,20 @@ elif page == "🦁 Species Management":
                 spec_dict = {f"{s['common_name']} (ID:{s['Sp_ID']})": s['Sp_ID'] for s in species_list}
                 sel = st.selectbox("Select Species", list(spec_dict.keys()))
                 spid = spec_dict[sel]
-                cur = execute_query("SELECT * FROM Species WHERE Sp_ID=%s", (spid,))[0]
+                cur = edit_snapshot("update_species", spid,
+                                    lambda: execute_query("SELECT * FROM Species WHERE Sp_ID=%s", (spid,))[0])
                 with st.form("update_species"):
                     c = st.text_input("Common Name", cur['common_name'])
                     sname = st.text_input("Scientific Name", cur['Scientific_name'])
-                    stt = st.selectbox("Status",
-                        ["Least Concern","Near Threatened","Vulnerable","Endangered","Critically Endangered"],
-                        index=["Least Concern","Near Threatened","Vulnerable","Endangered","Critically Endangered"].index(cur['conservation_status']))
+                    stt = domain_select("Status", "conservation_status", cur['conservation_status'])
                     life = st.number_input("Lifespan", value=cur['Avg_lifespan'])
                     if st.form_submit_button("Update"):
-                        execute_query("""UPDATE Species SET common_name=%s, Scientific_name=%s,
-                                      conservation_status=%s, Avg_lifespan=%s WHERE Sp_ID=%s""",
-                                      (c,sname,stt,life,spid), fetch=False)
-                        st.success("✅ Updated successfully!")
-                        time.sleep(1)
-                        st.rerun()
+                        if save_changes("update_species", "Species", cur,
+                                        {"common_name": c, "Scientific_name": sname,
+                                         "conservation_status": stt, "Avg_lifespan": life}):
+                            st.success("✅ Updated successfully!")
+                            time.sleep(1)
+                            st.rerun()
     elif ROLE == "Viewer":
         # avoid repeating view_only_message many times; keep quiet if already shown above
         pass
@@ -225,10 +768,7 @@ elif page == "🦁 Species Management":
                 sel = st.selectbox("Select to Delete", list(sp_map.keys()))
                 spid = sp_map[sel]
                 st.warning("⚠️ This will delete the species and related records.")
-                if st.button("Delete"):
-                    # NOTE: Deletion from Species should cascade to Alt_Names and Inhabits if ON DELETE CASCADE is set.
-                    # Otherwise, you need to delete from child tables first. Assuming CASCADE for simplicity.
-                    execute_query("DELETE FROM Species WHERE Sp_ID=%s", (spid,), fetch=False)
+                if delete_with_preview("Species", spid, "Delete"):
                     st.success("Deleted successfully!")
                     time.sleep(1)
                     st.rerun()
@@ -248,19 +788,19 @@ elif page == "🌳 Habitat Management":
 
     # View
     with tabs[0]:
-        habitat_data = execute_query("SELECT * FROM Habitat")
-        if habitat_data:
-            st.dataframe(pd.DataFrame(habitat_data), use_container_width=True)
+        habitat_data = cached_frame("habitats", "SELECT * FROM Habitat", ["Habitat"])
+        if not habitat_data.empty:
+            st.dataframe(habitat_data, use_container_width=True)
             st.write("### Species in Habitats")
-            species_habitat = execute_query("""
+            species_habitat = cached_frame("species_habitats", """
                 SELECT h.habitat_type, h.region, s.common_name
                 FROM Habitat h
                 JOIN Inhabits i ON h.Habitat_ID = i.Habitat_ID
                 JOIN Species s ON i.Sp_ID = s.Sp_ID
                 ORDER BY h.habitat_type
-            """)
-            if species_habitat:
-                st.dataframe(pd.DataFrame(species_habitat), use_container_width=True)
+            """, ["Habitat", "Inhabits", "Species"])
+            if not species_habitat.empty:
+                st.dataframe(species_habitat, use_container_width=True)
 
     # Add
     if can_edit() and len(tabs) > 1:
@@ -289,7 +829,8 @@ elif page == "🌳 Habitat Management":
                 habitat_dict = {f"{h['habitat_type']} - {h['region']} (ID: {h['Habitat_ID']})": h['Habitat_ID'] for h in habitat_list}
                 selected = st.selectbox("Select Habitat to Update", list(habitat_dict.keys()))
                 habitat_id = habitat_dict[selected]
-                current = execute_query("SELECT * FROM Habitat WHERE Habitat_ID = %s", (habitat_id,))[0]
+                current = edit_snapshot("update_habitat", habitat_id,
+                                        lambda: execute_query("SELECT * FROM Habitat WHERE Habitat_ID = %s", (habitat_id,))[0])
                 with st.form("update_habitat"):
                     habitat_type = st.text_input("Habitat Type", value=current['habitat_type'])
                     climate = st.selectbox("Climate", ["Tropical", "Humid", "Cool", "Arid"],
@@ -297,9 +838,9 @@ elif page == "🌳 Habitat Management":
                     region = st.text_input("Region", value=current['region'])
                     area_size = st.number_input("Area Size", value=float(current['area_size']))
                     if st.form_submit_button("Update Habitat"):
-                        query = """UPDATE Habitat SET habitat_type=%s, climate=%s, region=%s, area_size=%s 
-                                   WHERE Habitat_ID=%s"""
-                        result = execute_query(query, (habitat_type, climate, region, area_size, habitat_id), fetch=False)
+                        result = save_changes("update_habitat", "Habitat", current,
+                                              {"habitat_type": habitat_type, "climate": climate,
+                                               "region": region, "area_size": area_size})
                         if result:
                             st.success("Habitat updated successfully!")
                             time.sleep(1)
@@ -316,13 +857,10 @@ elif page == "🌳 Habitat Management":
                 selected = st.selectbox("Select Habitat to Delete", list(habitat_dict.keys()))
                 habitat_id = habitat_dict[selected]
                 st.warning("⚠️ This will delete the habitat and all related records!")
-                if st.button("Delete Habitat"):
-                    # NOTE: Assuming CASCADE delete is set on Inhabits, Assigned_To, and Threat_Report
-                    result = execute_query("DELETE FROM Habitat WHERE Habitat_ID = %s", (habitat_id,), fetch=False)
-                    if result:
-                        st.success("Habitat deleted successfully!")
-                        time.sleep(1)
-                        st.rerun()
+                if delete_with_preview("Habitat", habitat_id, "Delete Habitat"):
+                    st.success("Habitat deleted successfully!")
+                    time.sleep(1)
+                    st.rerun()
 
 # ==========================================================
 # RANGER MANAGEMENT
@@ -339,26 +877,26 @@ elif page == "👮 Ranger Management":
 
     # View
     with tabs[0]:
-        ranger_data = execute_query("SELECT * FROM Ranger")
-        if ranger_data:
-            st.dataframe(pd.DataFrame(ranger_data), use_container_width=True)
+        ranger_data = cached_frame("rangers", "SELECT * FROM Ranger", ["Ranger"])
+        if not ranger_data.empty:
+            st.dataframe(ranger_data, use_container_width=True)
             st.write("### Ranger Habitat Assignments")
-            assignments = execute_query("""
+            assignments = cached_frame("ranger_assignments", """
                 SELECT r.fname, r.raankOfRanger, h.habitat_type, h.region, a.Assigned_Date
                 FROM Ranger r
                 JOIN Assigned_To a ON r.Ranger_ID = a.Ranger_ID
                 JOIN Habitat h ON a.Habitat_ID = h.Habitat_ID
                 ORDER BY r.fname
-            """)
-            if assignments:
-                st.dataframe(pd.DataFrame(assignments), use_container_width=True)
+            """, ["Ranger", "Assigned_To", "Habitat"])
+            if not assignments.empty:
+                st.dataframe(assignments, use_container_width=True)
 
     # Add
     if can_edit() and len(tabs) > 1:
         with tabs[1]:
             with st.form("add_ranger"):
                 fname = st.text_input("Full Name")
-                rank = st.selectbox("Rank", ["Junior Ranger", "Field Ranger", "Senior Ranger", "Wildlife Officer"])
+                rank = st.selectbox("Rank", DOMAINS["raankOfRanger"])
                 date_joined = st.date_input("Date Joined")
                 phone = st.text_input("Phone")
                 email = st.text_input("Email")
@@ -381,17 +919,16 @@ elif page == "👮 Ranger Management":
                 ranger_dict = {f"{r['fname']} (ID: {r['Ranger_ID']})": r['Ranger_ID'] for r in ranger_list}
                 selected = st.selectbox("Select Ranger to Update", list(ranger_dict.keys()))
                 ranger_id = ranger_dict[selected]
-                current = execute_query("SELECT * FROM Ranger WHERE Ranger_ID = %s", (ranger_id,))[0]
+                current = edit_snapshot("update_ranger", ranger_id,
+                                        lambda: execute_query("SELECT * FROM Ranger WHERE Ranger_ID = %s", (ranger_id,))[0])
                 with st.form("update_ranger"):
                     fname = st.text_input("Full Name", value=current['fname'])
-                    rank = st.selectbox("Rank", ["Junior Ranger", "Field Ranger", "Senior Ranger", "Wildlife Officer"],
-                        index=["Junior Ranger", "Field Ranger", "Senior Ranger", "Wildlife Officer"].index(current['raankOfRanger']))
+                    rank = domain_select("Rank", "raankOfRanger", current['raankOfRanger'])
                     phone = st.text_input("Phone", value=current['Phone'])
                     email = st.text_input("Email", value=current['email'])
                     if st.form_submit_button("Update Ranger"):
-                        query = """UPDATE Ranger SET fname=%s, raankOfRanger=%s, Phone=%s, email=%s 
-                                   WHERE Ranger_ID=%s"""
-                        result = execute_query(query, (fname, rank, phone, email, ranger_id), fetch=False)
+                        result = save_changes("update_ranger", "Ranger", current,
+                                              {"fname": fname, "raankOfRanger": rank, "Phone": phone, "email": email})
                         if result:
                             st.success("Ranger updated successfully!")
                             time.sleep(1)
@@ -408,13 +945,10 @@ elif page == "👮 Ranger Management":
                 selected = st.selectbox("Select Ranger to Delete", list(ranger_dict.keys()))
                 ranger_id = ranger_dict[selected]
                 st.warning("⚠️ This will delete the ranger and all related records!")
-                if st.button("Delete Ranger"):
-                    # NOTE: Assuming CASCADE delete is set on Assigned_To, Uses, Threat_Report, Sighting, Sighting_Details, and Super_Ranger_ID is nullable or handled.
-                    result = execute_query("DELETE FROM Ranger WHERE Ranger_ID = %s", (ranger_id,), fetch=False)
-                    if result:
-                        st.success("Ranger deleted successfully!")
-                        time.sleep(1)
-                        st.rerun()
+                if delete_with_preview("Ranger", ranger_id, "Delete Ranger"):
+                    st.success("Ranger deleted successfully!")
+                    time.sleep(1)
+                    st.rerun()
 
 # ==========================================================
 # ANIMAL MANAGEMENT
@@ -423,21 +957,52 @@ elif page == "🐾 Animal Management":
     st.header("🐾 Animal Management")
 
     if ROLE == "Viewer":
-        tab_labels = ["View Animals"]
+        tab_labels = ["View Animals", "Last Seen", "Health History"]
     else:
-        tab_labels = ["View Animals", "Add Animal", "Update Animal", "Delete Animal"]
+        tab_labels = ["View Animals", "Add Animal", "Update Animal", "Delete Animal", "Last Seen", "Health History"]
 
     tabs = st.tabs(tab_labels)
 
     # View
     with tabs[0]:
-        animal_data = execute_query("""
+        animal_data = cached_frame("animals", """
             SELECT a.Animal_ID, s.common_name, a.Tracking_ID, a.DOB, a.Gender, a.Health_status
             FROM Animal a
             JOIN Species s ON a.Sp_ID = s.Sp_ID
-        """)
-        if animal_data:
-            st.dataframe(pd.DataFrame(animal_data), use_container_width=True)
+        """, ["Animal", "Species"])
+        if not animal_data.empty:
+            st.dataframe(animal_data, use_container_width=True)
+
+        # Demographics from the trigger-maintained Animal_Demographics table
+        st.write("### Population Demographics")
+        species_list = execute_query("SELECT Sp_ID, common_name FROM Species")
+        conn = get_connection()
+        if species_list and conn is not None:
+            species_names = {s['Sp_ID']: s['common_name'] for s in species_list}
+            demo_options = {"All Species": None}
+            demo_options.update({f"{name} (ID:{spid})": spid for spid, name in species_names.items()})
+            selected_demo = st.selectbox("Species", list(demo_options.keys()), key="demographics_species")
+            try:
+                demo = load_demographics(conn, demo_options[selected_demo])
+            except Error as e:
+                st.error(f"Query execution error: {e}")
+                demo = None
+            if demo is not None and not demo.empty:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write("#### Population Pyramid (age band × gender)")
+                    st.bar_chart(population_pyramid(demo))
+                with col2:
+                    st.write("#### Health Status by Age Band")
+                    st.dataframe(health_by_age(demo), use_container_width=True)
+                st.write("#### Current Animals by Birth Year")
+                st.line_chart(birth_cohorts(demo))
+                if demo_options[selected_demo] is None:
+                    summary = species_summary(demo)
+                    summary.index = [species_names.get(i, i) for i in summary.index]
+                    st.dataframe(summary, use_container_width=True)
+            elif demo is not None:
+                st.info("No animals recorded for this species.")
 
     # Add
     if can_edit() and len(tabs) > 1:
@@ -452,8 +1017,8 @@ elif page == "🐾 Animal Management":
                     sp_id = species_dict[selected_species]
                     tracking_id = st.text_input("Tracking ID")
                     dob = st.date_input("Date of Birth")
-                    gender = st.selectbox("Gender", ["Male", "Female"])
-                    health_status = st.selectbox("Health Status", ["Healthy", "Sick", "Injured", "Under Treatment"])
+                    gender = st.selectbox("Gender", DOMAINS["Gender"])
+                    health_status = st.selectbox("Health Status", DOMAINS["Health_status"])
                     if st.form_submit_button("Add Animal"):
                         query = """INSERT INTO Animal (Animal_ID, Sp_ID, Tracking_ID, DOB, Gender, Health_status) 
                                    VALUES (%s, %s, %s, %s, %s, %s)"""
@@ -476,26 +1041,19 @@ elif page == "🐾 Animal Management":
                 animal_dict = {f"{a['common_name']} - {a['Tracking_ID']}": (a['Animal_ID'], a['Sp_ID']) for a in animal_list}
                 selected = st.selectbox("Select Animal to Update", list(animal_dict.keys()))
                 animal_id, sp_id = animal_dict[selected]
-                current = execute_query("SELECT * FROM Animal WHERE Animal_ID = %s AND Sp_ID = %s", (animal_id, sp_id))[0]
+                current = edit_snapshot("update_animal", (animal_id, sp_id),
+                                        lambda: execute_query("SELECT * FROM Animal WHERE Animal_ID = %s AND Sp_ID = %s", (animal_id, sp_id))[0])
+                result = None
                 with st.form("update_animal"):
                     tracking_id = st.text_input("Tracking ID", value=current['Tracking_ID'])
-                    gender = st.selectbox("Gender", ["Male", "Female"], index=0 if current['Gender'] == 'Male' else 1)
-
-                    # Fix: Corrected quotation and added robust fallback
-                    health_options = ["Healthy", "Sick", "Injured", "Under Treatment"]
-                    try:
-                        selected_index = health_options.index(current['Health_status'])
-                    except ValueError:
-                        selected_index = 0  # default if somehow invalid value
-
-                    health_status = st.selectbox("Health Status", health_options, index=selected_index)
+                    gender = domain_select("Gender", "Gender", current['Gender'])
+                    health_status = domain_select("Health Status", "Health_status", current['Health_status'])
 
                     if st.form_submit_button("Update Animal"):
-                        query = """UPDATE Animal SET Tracking_ID=%s, Gender=%s, Health_status=%s 
-                        WHERE Animal_ID=%s AND Sp_ID=%s"""
-                        result = execute_query(query, (tracking_id, gender, health_status, animal_id, sp_id), fetch=False)
+                        result = save_changes("update_animal", "Animal", current,
+                                              {"Tracking_ID": tracking_id, "Gender": gender, "Health_status": health_status})
                 if result:
-                    st.success("Animal added successfully!")
+                    st.success("Animal updated successfully!")
                     time.sleep(1)
                     st.rerun()
                    
@@ -522,6 +1080,101 @@ elif page == "🐾 Animal Management":
                         time.sleep(1)
                         st.rerun()
 
+    # Last seen (trigger-maintained Animal_Last_Seen)
+    with tabs[-2]:
+        conn = get_connection()
+        if conn is not None:
+            try:
+                st.write("### Find by Tracking ID")
+                tracking = st.text_input("Tracking ID", key="last_seen_tracking")
+                if tracking.strip():
+                    found = lookup_tracking(conn, tracking)
+                    if found.empty:
+                        st.info("No animal with that tracking ID.")
+                    else:
+                        st.dataframe(found, use_container_width=True)
+
+                st.write("### Not Seen Recently")
+                days = st.number_input("Not seen in (days)", min_value=1, value=30, step=1)
+                missing = not_seen_since(conn, int(days))
+                if missing.empty:
+                    st.success(f"Every animal has been seen in the last {int(days)} days.")
+                else:
+                    never = int(missing['last_seen_date'].isna().sum())
+                    st.warning(f"⚠️ {len(missing)} animal(s) not seen in {int(days)} days ({never} never seen).")
+                    st.dataframe(missing, use_container_width=True)
+
+                st.write("### Recently Seen")
+                st.dataframe(recently_seen(conn), use_container_width=True)
+            except Error as e:
+                st.error(f"Query execution error: {e}")
+
+    # Health history (trigger-maintained Animal_Health_History)
+    with tabs[-1]:
+        conn = get_connection()
+        if conn is not None:
+            try:
+                st.write("### Status As Of")
+                col1, col2 = st.columns(2)
+                with col1:
+                    as_of = st.date_input("Date", value=date.today(), key="health_as_of")
+                with col2:
+                    health_species = {"All Species": None}
+                    health_species.update({f"{s['common_name']} (ID:{s['Sp_ID']})": s['Sp_ID']
+                                           for s in execute_query("SELECT Sp_ID, common_name FROM Species") or []})
+                    sp_id = health_species[st.selectbox("Species", list(health_species.keys()), key="health_species")]
+                counts = health_as_of_frame(("counts", sp_id), as_of,
+                                            lambda: status_counts_as_of(conn, as_of, sp_id))
+                if counts.empty:
+                    st.info("No health history recorded by that date.")
+                else:
+                    counts['status'] = counts['status'].fillna("Unknown")
+                    st.bar_chart(counts.set_index('status')['animals'])
+                    total = int(counts['animals'].sum())
+                    pages = (total + HEALTH_PAGE_ROWS - 1) // HEALTH_PAGE_ROWS
+                    health_page = 1
+                    if pages > 1:
+                        health_page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                               key=f"health_page_{as_of}_{sp_id}")
+                    offset = (health_page - 1) * HEALTH_PAGE_ROWS
+                    snapshot = health_as_of_frame(("rows", sp_id, offset), as_of,
+                                                  lambda: status_as_of(conn, as_of, sp_id, HEALTH_PAGE_ROWS, offset),
+                                                  scope="session")
+                    st.caption(f"Animals {offset + 1}-{offset + len(snapshot)} of {total}")
+                    st.dataframe(snapshot, use_container_width=True)
+
+                st.write("### Transitions")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    since = st.date_input("From", value=date.today().replace(day=1), key="health_from")
+                with col2:
+                    until = st.date_input("To", value=date.today(), key="health_to")
+                with col3:
+                    into = st.selectbox("Changed to", ["Any"] + DOMAINS["Health_status"], key="health_into")
+                if since > until:
+                    st.warning("'From' must not be after 'To'.")
+                else:
+                    daily = daily_transitions(conn, since, until)
+                    if not daily.empty:
+                        st.line_chart(daily)
+                    changes = transitions(conn, since, until, status=None if into == "Any" else into)
+                    if changes.empty:
+                        st.info("No status changes in that range.")
+                    else:
+                        st.caption(f"Latest {len(changes)} change(s)")
+                        st.dataframe(changes, use_container_width=True)
+
+                st.write("### One Animal")
+                tracking = st.text_input("Tracking ID", key="health_tracking")
+                if tracking.strip():
+                    timeline = history_for_tracking(conn, tracking)
+                    if timeline.empty:
+                        st.info("No health history for that tracking ID.")
+                    else:
+                        st.dataframe(timeline, use_container_width=True)
+            except Error as e:
+                st.error(f"Query execution error: {e}")
+
 # ==========================================================
 # SIGHTING MANAGEMENT
 # ==========================================================
@@ -537,31 +1190,31 @@ elif page == "🔍 Sighting Management":
 
     # View
     with tabs[0]:
-        sighting_data = execute_query("""
+        sighting_data = cached_frame("sightings", """
             SELECT s.Sighting_ID, r.fname as ranger_name, s.Sighting_Date, 
                 s.Sighting_Time, s.Location
             FROM Sighting s
             JOIN Ranger r ON s.Ranger_ID = r.Ranger_ID
             ORDER BY s.Sighting_Date DESC
-        """)
-        if sighting_data:
-            st.dataframe(pd.DataFrame(sighting_data), use_container_width=True)
+        """, ["Sighting", "Ranger"])
+        if not sighting_data.empty:
+            st.dataframe(sighting_data, use_container_width=True)
             st.write("### Sighting Details (Animals Observed)")
-            details = execute_query("""
+            details = cached_frame("sighting_details", """
                 SELECT sd.sighting_ID, s.Location, sp.common_name, a.Tracking_ID, r.fname
                 FROM Sighting_Details sd
                 JOIN Sighting s ON sd.sighting_ID = s.Sighting_ID
                 JOIN Animal a ON sd.Animal_ID = a.Animal_ID
                 JOIN Species sp ON a.Sp_ID = sp.Sp_ID
                 JOIN Ranger r ON sd.Ranger_ID = r.Ranger_ID
-            """)
-            if details:
-                st.dataframe(pd.DataFrame(details), use_container_width=True)
+            """, ["Sighting_Details", "Sighting", "Animal", "Species", "Ranger"])
+            if not details.empty:
+                st.dataframe(details, use_container_width=True)
 
     # Add Sighting
     if can_edit() and len(tabs) > 1:
         with tabs[1]:
-            ranger_list = execute_query("SELECT Ranger_ID, fname FROM Ranger")
+            ranger_list = offline_lookup("rangers", "SELECT Ranger_ID, fname FROM Ranger")
             if ranger_list:
                 with st.form("add_sighting"):
                     ranger_dict = {r['fname']: r['Ranger_ID'] for r in ranger_list}
@@ -571,30 +1224,41 @@ elif page == "🔍 Sighting Management":
                     sighting_time = st.time_input("Sighting Time")
                     location = st.text_input("Location")
                     if st.form_submit_button("Add Sighting"):
-                        query = """INSERT INTO Sighting (Ranger_ID, Sighting_Date, Sighting_Time, Location) 
-                                VALUES (%s, %s, %s, %s)"""
-                        result = execute_query(query, (ranger_id, sighting_date, sighting_time, location), fetch=False)
-                        if result:
+                        query = """INSERT INTO Sighting (Ranger_ID, Sighting_Date, Sighting_Time, Location, Capture_Key)
+                                VALUES (%s, %s, %s, %s, %s)
+                                ON DUPLICATE KEY UPDATE Sighting_ID = LAST_INSERT_ID(Sighting_ID)"""
+                        capture_key = new_capture_key()
+                        result = write_or_queue(query, (ranger_id, sighting_date, sighting_time, location, capture_key),
+                                                lambda: field_queue.capture_sighting(ranger_id, sighting_date, sighting_time, location,
+                                                                                     capture_key=capture_key))
+                        if result == "saved":
                             st.success("Sighting added successfully!")
                             time.sleep(1)
                             st.rerun()
+                        elif result == "queued":
+                            st.info("📥 Database unreachable: sighting saved on this device and will sync automatically.")
     elif ROLE == "Viewer":
         view_only_message()
 
     # Add Sighting Detail (Link Animal to Sighting)
     if can_edit() and len(tabs) > 2:
         with tabs[2]:
-            sighting_list = execute_query("SELECT Sighting_ID, Sighting_Date, Location FROM Sighting ORDER BY Sighting_ID DESC")
-            animal_list = execute_query("SELECT Animal_ID, Sp_ID, Tracking_ID FROM Animal WHERE Health_status != 'Sick'")
-            ranger_list = execute_query("SELECT Ranger_ID, fname FROM Ranger")
+            sighting_list = offline_lookup("sightings", f"SELECT Sighting_ID, Sighting_Date, Location FROM Sighting ORDER BY Sighting_ID DESC LIMIT {RECENT_SIGHTINGS}") or []
+            animal_list = offline_lookup("healthy_animals", "SELECT Animal_ID, Sp_ID, Tracking_ID FROM Animal WHERE Health_status != 'Sick'")
+            ranger_list = offline_lookup("rangers", "SELECT Ranger_ID, fname FROM Ranger")
+            # Sightings captured offline can be linked before they sync
+            queued_sightings = field_queue.pending("sighting")
             
-            if sighting_list and animal_list and ranger_list:
+            if (sighting_list or queued_sightings) and animal_list and ranger_list:
                 st.info("Note: The 'trg_no_sick_sighting' trigger prevents adding sick animals here.")
                 with st.form("add_sighting_detail"):
                     # Sighting Selection
-                    sighting_map = {f"ID: {s['Sighting_ID']} ({s['Location']} on {s['Sighting_Date']})": s['Sighting_ID'] for s in sighting_list}
+                    sighting_map = {f"📥 Offline ({q['payload']['Location']} on {q['payload']['Sighting_Date']})": ("key", q['capture_key'])
+                                    for q in queued_sightings}
+                    sighting_map.update({f"ID: {s['Sighting_ID']} ({s['Location']} on {s['Sighting_Date']})": ("id", s['Sighting_ID'])
+                                         for s in sighting_list})
                     selected_sighting = st.selectbox("Select Sighting Event", list(sighting_map.keys()))
-                    sighting_id = sighting_map[selected_sighting]
+                    sighting_ref, sighting_id = sighting_map[selected_sighting]
                     
                     # Animal Selection
                     animal_map = {f"ID: {a['Animal_ID']} (Track: {a['Tracking_ID']})": a['Animal_ID'] for a in animal_list}
@@ -611,11 +1275,18 @@ elif page == "🔍 Sighting Management":
                         # which is an assumption based on the original DDL structure.
                         query = """INSERT INTO Sighting_Details (sighting_ID, Animal_ID, Ranger_ID) 
                                    VALUES (%s, %s, %s)"""
-                        result = execute_query(query, (sighting_id, animal_id, ranger_id_detail), fetch=False)
-                        if result:
+                        if sighting_ref == "key":
+                            field_queue.capture_sighting_detail(animal_id, ranger_id_detail, sighting_key=sighting_id)
+                            result = "queued"
+                        else:
+                            result = write_or_queue(query, (sighting_id, animal_id, ranger_id_detail),
+                                                    lambda: field_queue.capture_sighting_detail(animal_id, ranger_id_detail, sighting_id=sighting_id))
+                        if result == "saved":
                             st.success(f"Animal {animal_id} linked to Sighting {sighting_id} successfully!")
                             time.sleep(1)
                             st.rerun()
+                        elif result == "queued":
+                            st.info("📥 Saved on this device; the link will sync when the database is reachable.")
             else:
                 st.warning("Ensure Habitats, Animals (not sick), and Rangers are added before linking sightings.")
 
@@ -627,24 +1298,23 @@ elif page == "⚠️ Threat Reports":
     st.header("⚠️ Threat Report Management")
 
     if ROLE == "Viewer":
-        tab_labels = ["View Threats"]
+        tab_labels = ["View Threats", "Hotspots"]
     else:
-        tab_labels = ["View Threats", "Log New Threat"]
+        tab_labels = ["View Threats", "Log New Threat", "Hotspots"]
 
     tabs = st.tabs(tab_labels)
 
     # View
     with tabs[0]:
-        threat_data = execute_query("""
+        df = cached_frame("threats", """
             SELECT tr.Report_ID, h.habitat_type, h.region, r.fname as ranger_name,
                 tr.Report_Date, tr.Threat_Level, tr.Description
             FROM Threat_Report tr
             JOIN Habitat h ON tr.Habitat_ID = h.Habitat_ID
             JOIN Ranger r ON tr.Ranger_ID = r.Ranger_ID
             ORDER BY tr.Report_Date DESC
-        """)
-        if threat_data:
-            df = pd.DataFrame(threat_data)
+        """, ["Threat_Report", "Habitat", "Ranger"])
+        if not df.empty:
             def color_threat(val):
                 if val == 'High':
                     return 'background-color: #ffcccc'
@@ -656,11 +1326,11 @@ elif page == "⚠️ Threat Reports":
             st.dataframe(styled_df, use_container_width=True)
 
     # Log New Threat
-    if can_edit() and len(tabs) > 1:
+    if can_edit() and len(tabs) > 2:
         with tabs[1]:
             st.write("### Log New Threat (Using Procedure)")
-            habitat_list = execute_query("SELECT Habitat_ID, habitat_type, region FROM Habitat")
-            ranger_list = execute_query("SELECT Ranger_ID, fname FROM Ranger")
+            habitat_list = offline_lookup("habitats", "SELECT Habitat_ID, habitat_type, region FROM Habitat")
+            ranger_list = offline_lookup("rangers", "SELECT Ranger_ID, fname FROM Ranger")
             if habitat_list and ranger_list:
                 with st.form("log_threat"):
                     habitat_dict = {f"{h['habitat_type']} - {h['region']}": h['Habitat_ID'] for h in habitat_list}
@@ -669,18 +1339,55 @@ elif page == "⚠️ Threat Reports":
                     ranger_dict = {r['fname']: r['Ranger_ID'] for r in ranger_list}
                     selected_ranger = st.selectbox("Reporting Ranger", list(ranger_dict.keys()))
                     ranger_id = ranger_dict[selected_ranger]
-                    threat_level = st.selectbox("Threat Level", ["Low", "Medium", "High"])
+                    threat_level = st.selectbox("Threat Level", DOMAINS["Threat_Level"])
                     description = st.text_area("Description")
                     if st.form_submit_button("Log Threat Report"):
-                        query = "CALL LogThreatReport(%s, %s, %s, %s)"
-                        result = execute_query(query, (habitat_id, ranger_id, threat_level, description), fetch=False)
-                        if result:
+                        # Keyed variant of LogThreatReport (same row, plus the capture key)
+                        query = """INSERT INTO Threat_Report (Habitat_ID, Ranger_ID, Report_Date, Threat_Level, Description, Capture_Key)
+                                VALUES (%s, %s, CURDATE(), %s, %s, %s)
+                                ON DUPLICATE KEY UPDATE Report_ID = LAST_INSERT_ID(Report_ID)"""
+                        capture_key = new_capture_key()
+                        result = write_or_queue(query, (habitat_id, ranger_id, threat_level, description, capture_key),
+                                                lambda: field_queue.capture_threat(habitat_id, ranger_id, threat_level, description,
+                                                                                   capture_key=capture_key))
+                        if result == "saved":
                             st.success("Threat report logged successfully!")
                             time.sleep(5)
                             st.rerun()
+                        elif result == "queued":
+                            st.info("📥 Database unreachable: threat report saved on this device and will sync automatically.")
     elif ROLE == "Viewer":
         view_only_message()
 
+    # Hotspots (rolling severity from Habitat_Threat_Daily)
+    with tabs[-1]:
+        st.write(f"### Threat Hotspots (rolling {SHORT_WINDOW}/{LONG_WINDOW}-day severity)")
+        conn = get_connection()
+        if conn is not None:
+            engine = get_threat_engine()
+            try:
+                engine.refresh(conn)
+            except Error as e:
+                st.error(f"Query execution error: {e}")
+            ranking = engine.hotspots()
+            habitat_list = execute_query("SELECT Habitat_ID, habitat_type, region FROM Habitat")
+            if ranking is not None and habitat_list:
+                habitats = pd.DataFrame(habitat_list)
+                board = ranking.merge(habitats, on="Habitat_ID")
+                if board.empty:
+                    st.info("No threat reports in the last few months.")
+                else:
+                    st.caption(f"As of {engine.as_of} · ⚠️ = {SHORT_WINDOW}-day severity well above the usual level")
+                    board["anomaly"] = board["anomaly"].map({True: "⚠️", False: ""})
+                    st.dataframe(board[["habitat_type", "region", "severity_7d", "severity_30d",
+                                        "trend", "z_score", "anomaly"]].round(2),
+                                 use_container_width=True)
+                    habitat_dict = {f"{r['habitat_type']} - {r['region']}": r['Habitat_ID'] for _, r in board.iterrows()}
+                    selected = st.selectbox("Habitat Trend", list(habitat_dict.keys()))
+                    series = engine.habitat_series(habitat_dict[selected])
+                    if series is not None:
+                        st.line_chart(series)
+
 # ==========================================================
 # ORGANIZATION MANAGEMENT
 # ==========================================================
@@ -696,9 +1403,9 @@ elif page == "🏢 Organization Management":
 
     # View
     with tabs[0]:
-        org_data = execute_query("SELECT * FROM Organization")
-        if org_data:
-            st.dataframe(pd.DataFrame(org_data), use_container_width=True)
+        org_data = cached_frame("organizations", "SELECT * FROM Organization", ["Organization"])
+        if not org_data.empty:
+            st.dataframe(org_data, use_container_width=True)
 
     # Add
     if can_edit() and len(tabs) > 1:
@@ -728,7 +1435,8 @@ elif page == "🏢 Organization Management":
                 org_dict = {f"{o['fi_name']} (ID: {o['Org_ID']})": o['Org_ID'] for o in org_list}
                 selected = st.selectbox("Select Organization to Update", list(org_dict.keys()))
                 org_id = org_dict[selected]
-                current = execute_query("SELECT * FROM Organization WHERE Org_ID = %s", (org_id,))[0]
+                current = edit_snapshot("update_org", org_id,
+                                        lambda: execute_query("SELECT * FROM Organization WHERE Org_ID = %s", (org_id,))[0])
                 with st.form("update_org"):
                     fi_name = st.text_input("Organization Name", value=current['fi_name'])
                     type_org = st.selectbox("Type", ["NGO", "Government", "Private"],
@@ -737,9 +1445,9 @@ elif page == "🏢 Organization Management":
                     email = st.text_input("Email", value=current['email'])
                     contact = st.text_input("Contact Person", value=current['contact'])
                     if st.form_submit_button("Update Organization"):
-                        query = """UPDATE Organization SET fi_name=%s, typeOrg=%s, phone=%s, email=%s, contact=%s 
-                            WHERE Org_ID=%s"""
-                        result = execute_query(query, (fi_name, type_org, phone, email, contact, org_id), fetch=False)
+                        result = save_changes("update_org", "Organization", current,
+                                              {"fi_name": fi_name, "typeOrg": type_org, "phone": phone,
+                                               "email": email, "contact": contact})
                         if result:
                             st.success("Organization updated successfully!")
                             time.sleep(1)
@@ -783,22 +1491,22 @@ elif page == "🔧 Equipment Management":
 
     # View
     with tabs[0]:
-        equipment_data = execute_query("""
+        equipment_data = cached_frame("equipment", """
             SELECT e.Equipment_ID, e.equip_type, e.StatusEqui, e.purchase_date, o.fi_name as organization
             FROM Equipment e
             JOIN Organization o ON e.Org_ID = o.Org_ID
-        """)
-        if equipment_data:
-            st.dataframe(pd.DataFrame(equipment_data), use_container_width=True)
+        """, ["Equipment", "Organization"])
+        if not equipment_data.empty:
+            st.dataframe(equipment_data, use_container_width=True)
             st.write("### Equipment Usage")
-            usage_data = execute_query("""
+            usage_data = cached_frame("equipment_usage", """
                 SELECT r.fname as ranger_name, e.equip_type, u.Date_Issued, e.StatusEqui
                 FROM Uses u
                 JOIN Ranger r ON u.Ranger_ID = r.Ranger_ID
                 JOIN Equipment e ON u.Equipment_ID = e.Equipment_ID
-            """)
-            if usage_data:
-                st.dataframe(pd.DataFrame(usage_data), use_container_width=True)
+            """, ["Uses", "Ranger", "Equipment"])
+            if not usage_data.empty:
+                st.dataframe(usage_data, use_container_width=True)
 
     # Add
     if can_edit() and len(tabs) > 1:
@@ -807,7 +1515,7 @@ elif page == "🔧 Equipment Management":
             if org_list:
                 with st.form("add_equipment"):
                     equip_type = st.text_input("Equipment Type")
-                    status = st.selectbox("Status", ["Available", "In Use", "Maintenance"])
+                    status = st.selectbox("Status", DOMAINS["StatusEqui"])
                     purchase_date = st.date_input("Purchase Date")
                     org_dict = {o['fi_name']: o['Org_ID'] for o in org_list}
                     selected_org = st.selectbox("Providing Organization", list(org_dict.keys()))
@@ -832,7 +1540,8 @@ elif page == "🔧 Equipment Management":
                 equip_map = {f"ID: {e['Equipment_ID']} - {e['equip_type']}": e['Equipment_ID'] for e in equip_list}
                 selected_equip_id = st.selectbox("Select Equipment to Update", list(equip_map.keys()))
                 equip_id = equip_map[selected_equip_id]
-                current = execute_query("SELECT * FROM Equipment WHERE Equipment_ID = %s", (equip_id,))[0]
+                current = edit_snapshot("update_equipment", equip_id,
+                                        lambda: execute_query("SELECT * FROM Equipment WHERE Equipment_ID = %s", (equip_id,))[0])
                 
                 org_dict = {o['fi_name']: o['Org_ID'] for o in org_list}
                 org_names = list(org_dict.keys())
@@ -840,17 +1549,16 @@ elif page == "🔧 Equipment Management":
                 
                 with st.form("update_equipment"):
                     equip_type = st.text_input("Equipment Type", value=current['equip_type'])
-                    status = st.selectbox("Status", ["Available", "In Use", "Maintenance"],
-                        index=["Available", "In Use", "Maintenance"].index(current['StatusEqui']))
+                    status = domain_select("Status", "StatusEqui", current['StatusEqui'])
                     purchase_date = st.date_input("Purchase Date", value=current['purchase_date'])
                     selected_org_name = st.selectbox("Providing Organization", org_names, 
                         index=org_names.index(current_org))
                     org_id = org_dict[selected_org_name]
                     
                     if st.form_submit_button("Update Equipment"):
-                        query = """UPDATE Equipment SET StatusEqui=%s, purchase_date=%s, equip_type=%s, Org_ID=%s 
-                                   WHERE Equipment_ID=%s"""
-                        result = execute_query(query, (status, purchase_date, equip_type, org_id, equip_id), fetch=False)
+                        result = save_changes("update_equipment", "Equipment", current,
+                                              {"StatusEqui": status, "purchase_date": purchase_date,
+                                               "equip_type": equip_type, "Org_ID": org_id})
                         if result:
                             st.success("Equipment updated successfully!")
                             time.sleep(1)
@@ -935,7 +1643,7 @@ elif page == "⚙️ Functions & Procedures":
             sel = st.selectbox("Select Animal", list(amap.keys()))
             aid, spid = amap[sel]
             if st.button("Calculate Age"):
-                res = execute_query(f"SELECT age_of_animal({aid}, {spid}) as age")
+                res = execute_query("SELECT age_of_animal(%s, %s) as age", (aid, spid))
                 if res:
                     st.success(f"🎂 Animal Age: {res[0]['age']} years")
 
@@ -948,7 +1656,7 @@ elif page == "⚙️ Functions & Procedures":
             sel = st.selectbox("Select Ranger", list(rmap.keys()))
             rid = rmap[sel]
             if st.button("Calculate Experience"):
-                res = execute_query(f"SELECT ranger_experience({rid}) as exp")
+                res = execute_query("SELECT ranger_experience(%s) as exp", (rid,))
                 if res:
                     st.success(f"👮 Experience: {res[0]['exp']} years")
 
@@ -966,7 +1674,7 @@ elif page == "⚙️ Functions & Procedures":
             sel = st.selectbox("Select Threat Report", list(tmap.keys()))
             rid = tmap[sel]
             if st.button("Calculate Score"):
-                res = execute_query(f"SELECT threat_severity_score({rid}) as score")
+                res = execute_query("SELECT threat_severity_score(%s) as score", (rid,))
                 if res:
                     score = res[0]['score']
                     text = {0: "Unknown", 1: "Low", 2: "Medium", 3: "High"}
@@ -985,7 +1693,7 @@ elif page == "⚙️ Functions & Procedures":
                     amap = {f"{a['common_name']} - {a['Tracking_ID']} (Current: {a['Health_status']})": a['Tracking_ID'] for a in animals}
                     sel = st.selectbox("Select Animal", list(amap.keys()))
                     tid = amap[sel]
-                    new = st.selectbox("New Health Status", ["Healthy", "Sick", "Injured", "Under Treatment"])
+                    new = st.selectbox("New Health Status", DOMAINS["Health_status"])
                     if st.form_submit_button("Update Health"):
                         execute_query("CALL UpdateAnimalHealth(%s, %s)", (tid, new), fetch=False)
                         st.success(f"✅ Updated health to {new}")
@@ -1000,76 +1708,96 @@ elif page == "⚙️ Functions & Procedures":
 elif page == "📈 Analytics":
     st.header("📈 Wildlife Analytics Dashboard")
 
-    col1, col2 = st.columns(2)
-    with col1:
-        st.write("### Conservation Status Distribution")
-        data = execute_query("SELECT conservation_status, COUNT(*) as c FROM Species GROUP BY conservation_status")
+    # Bar chart reports: (title, index column)
+    chart_reports = [
+        ("Conservation Status Distribution", "conservation_status"),
+        ("Animals by Health Status", "Health_status"),
+        ("Threat Reports by Level", "Threat_Level"),
+        ("Equipment Status Overview", "StatusEqui"),
+    ]
+    for row_start in range(0, len(chart_reports), 2):
+        cols = st.columns(2)
+        for col, (title, index_col) in zip(cols, chart_reports[row_start:row_start + 2]):
+            with col:
+                st.write(f"### {title}")
+                data = execute_query(ANALYTICS_QUERIES[title])
+                if data:
+                    df = pd.DataFrame(data)
+                    st.bar_chart(df.set_index(index_col))
+                export_widget(ANALYTICS_QUERIES[title], title.replace(" ", "_"), title)
+        st.write("---")
+
+    # Table reports
+    for title in ["Species Count by Habitat", "Ranger Assignment Summary", "Recent Sightings Summary"]:
+        st.write(f"### {title}")
+        data = execute_query(ANALYTICS_QUERIES[title])
         if data:
-            df = pd.DataFrame(data)
-            st.bar_chart(df.set_index("conservation_status"))
-
-    with col2:
-        st.write("### Animals by Health Status")
-        data = execute_query("SELECT Health_status, COUNT(*) as c FROM Animal GROUP BY Health_status")
-        if data:
-            df = pd.DataFrame(data)
-            st.bar_chart(df.set_index("Health_status"))
-
-    st.write("---")
-
-    col3, col4 = st.columns(2)
-    with col3:
-        st.write("### Threat Reports by Level")
-        data = execute_query("SELECT Threat_Level, COUNT(*) as c FROM Threat_Report GROUP BY Threat_Level")
-        if data:
-            df = pd.DataFrame(data)
-            st.bar_chart(df.set_index("Threat_Level"))
-
-    with col4:
-        st.write("### Equipment Status Overview")
-        data = execute_query("SELECT StatusEqui, COUNT(*) as c FROM Equipment GROUP BY StatusEqui")
-        if data:
-            df = pd.DataFrame(data)
-            st.bar_chart(df.set_index("StatusEqui"))
-
-    st.write("---")
-    st.write("### Species Count by Habitat")
-    data = execute_query("""
-        SELECT h.habitat_type, h.region, COUNT(DISTINCT i.Sp_ID) as species_count
-        FROM Habitat h LEFT JOIN Inhabits i ON h.Habitat_ID = i.Habitat_ID
-        GROUP BY h.Habitat_ID, h.habitat_type, h.region
-        ORDER BY species_count DESC
-    """)
-    if data:
-        st.dataframe(pd.DataFrame(data), use_container_width=True)
-
-    st.write("---")
-    st.write("### Ranger Assignment Summary")
-    data = execute_query("""
-        SELECT r.fname, r.raankOfRanger, COUNT(a.Habitat_ID) as habitats_assigned,
-               TIMESTAMPDIFF(YEAR, r.date_joined, CURDATE()) as years_experience
-        FROM Ranger r
-        LEFT JOIN Assigned_To a ON r.Ranger_ID = a.Ranger_ID
-        GROUP BY r.Ranger_ID, r.fname, r.raankOfRanger, r.date_joined
-        ORDER BY years_experience DESC
-    """)
-    if data:
-        st.dataframe(pd.DataFrame(data), use_container_width=True)
-
-    st.write("---")
-    st.write("### Recent Sightings Summary")
-    data = execute_query("""
-        SELECT DATE(s.Sighting_Date) as date,
-               COUNT(DISTINCT s.Sighting_ID) as total_sightings,
-               COUNT(DISTINCT sd.Animal_ID) as animals_spotted
-        FROM Sighting s
-        LEFT JOIN Sighting_Details sd ON s.Sighting_ID = sd.sighting_ID
-        GROUP BY DATE(s.Sighting_Date)
-        ORDER BY date DESC
-        LIMIT 10
-    """)
-    if data:
-        st.dataframe(pd.DataFrame(data), use_container_width=True)
+            st.dataframe(pd.DataFrame(data), use_container_width=True)
+        export_widget(ANALYTICS_QUERIES[title], title.replace(" ", "_"), title)
+        if title == "Ranger Assignment Summary" and st.button("Suggest Assignments"):
+            conn = get_connection()
+            if conn is not None:
+                try:
+                    proposals, unassigned, stats = solve_assignments(load_assignment_problem(conn))
+                except (Error, RuntimeError) as e:
+                    st.error(f"Error: {e}")
+                else:
+                    st.caption(f"Solved {stats['rangers']} rangers across {stats['habitats']} habitats "
+                               f"({stats['slots']} slots) in {stats['seconds']:.3f}s")
+                    if proposals.empty:
+                        st.info("Need at least one ranger and one habitat.")
+                    else:
+                        st.dataframe(proposals, use_container_width=True)
+                    if not unassigned.empty and not proposals.empty:
+                        st.warning(f"⚠️ {len(unassigned)} ranger(s) left unassigned: every habitat already has "
+                                   f"{HABITAT_CAPACITY} proposed rangers.")
+                        st.dataframe(unassigned, use_container_width=True)
+        st.write("---")
+
+    st.write("### Species & Habitat Co-occurrence")
+    if get_connection() is not None:
+        index = load_cooccurrence(get_table_versions(*COOCCURRENCE_TABLES))
+        species_names = {s['Sp_ID']: s['common_name'] for s in execute_query("SELECT Sp_ID, common_name FROM Species") or []}
+        habitat_names = {h['Habitat_ID']: f"{h['habitat_type']} - {h['region']}"
+                         for h in execute_query("SELECT Habitat_ID, habitat_type, region FROM Habitat") or []}
+        top_k = st.slider("Results to show", 1, 25, 5)
+
+        col5, col6 = st.columns(2)
+        with col5:
+            st.write("#### Similar Species")
+            basis = st.radio("Based on", SPECIES_BASES, horizontal=True)
+            sp_map = {f"{name} (ID:{spid})": spid for spid, name in species_names.items()}
+            if sp_map:
+                sel = st.selectbox("Species", list(sp_map.keys()))
+                similar = index.similar_species(sp_map[sel], top_k, basis)
+                if similar:
+                    st.dataframe(pd.DataFrame([
+                        {"common_name": species_names.get(spid, spid), "similarity": round(sim, 3), "shared": shared}
+                        for spid, sim, shared in similar
+                    ]), use_container_width=True)
+                else:
+                    st.info("No co-occurring species found.")
+        with col6:
+            st.write("#### Similar Habitats")
+            hab_map = {f"{name} (ID: {hid})": hid for hid, name in habitat_names.items()}
+            if hab_map:
+                sel = st.selectbox("Habitat", list(hab_map.keys()))
+                similar = index.similar_habitats(hab_map[sel], top_k)
+                if similar:
+                    st.dataframe(pd.DataFrame([
+                        {"habitat": habitat_names.get(hid, hid), "similarity": round(sim, 3), "shared_species": shared}
+                        for hid, sim, shared in similar
+                    ]), use_container_width=True)
+                else:
+                    st.info("No habitats share species with this one.")
+
+        st.write("#### Most Frequent Species Pairs")
+        pairs = index.top_pairs(basis, 20)
+        if pairs:
+            st.dataframe(pd.DataFrame([
+                {"species_a": species_names.get(a, a), "species_b": species_names.get(b, b), "count": c}
+                for a, b, c in pairs
+            ]), use_container_width=True)
 
 # ==========================================================
 # FOOTER + DB TEST
@@ -0,0 +1,235 @@
+# ==========================================================
+# RANGER ASSIGNMENT OPTIMIZER
+# Suggests one habitat per ranger so patrol effort follows need.
+#
+# Habitat need = area share + recent threat-score share
+# (Habitat_Threat_Daily, section 8 of final_project.sql).
+# The k-th ranger at a habitat is worth need / k (diminishing
+# returns), up to HABITAT_CAPACITY rangers per habitat. Busy rangers
+# pay a penalty that grows with the habitat's need, so they are
+# steered towards lighter posts, and keeping a ranger where they
+# already are earns a small continuity bonus.
+#
+# Solved exactly as a min-cost flow written as a sparse LP for
+# SciPy's HiGHS solver: rangers -> habitats -> habitat slots.
+# Rangers with the same load and no current post are
+# interchangeable, so they share one node per load level instead of
+# each having an arc to every habitat, and only slots that can pay
+# off are generated (slot_counts). Rangers left over when every
+# habitat is full are returned as unassigned.
+# ==========================================================
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
+
+THREAT_DAYS = 90          # threat history window used for habitat need
+AREA_WEIGHT = 0.5         # need = AREA_WEIGHT * area share + (1 - AREA_WEIGHT) * threat share
+LOAD_PENALTY = 0.3        # busiest ranger at the neediest habitat, relative to the marginal slot value
+CONTINUITY_BONUS = 0.2    # value of keeping a ranger where they already are, same unit
+HABITAT_CAPACITY = 50     # most rangers proposed for one habitat
+
+
+# --- Pull everything the solver needs in four queries ---
+def load_problem(conn, today=None):
+    since = (today or date.today()) - timedelta(days=THREAT_DAYS)
+    cursor = conn.cursor()
+    cursor.execute("SELECT Ranger_ID, fname FROM Ranger ORDER BY Ranger_ID")
+    rangers = cursor.fetchall()
+    cursor.execute("SELECT Habitat_ID, habitat_type, region, area_size FROM Habitat ORDER BY Habitat_ID")
+    habitats = cursor.fetchall()
+    cursor.execute("SELECT Ranger_ID, Habitat_ID FROM Assigned_To")
+    assigned = cursor.fetchall()
+    cursor.execute("""
+        SELECT Habitat_ID, SUM(score_sum) FROM Habitat_Threat_Daily
+        WHERE Report_Day >= %s GROUP BY Habitat_ID
+    """, (since,))
+    threats = cursor.fetchall()
+    cursor.close()
+
+    ranger_ids = np.array([r[0] for r in rangers], dtype=np.int64)
+    habitat_ids = np.array([h[0] for h in habitats], dtype=np.int64)
+    area = np.array([float(h[3] or 0) for h in habitats])
+    threat = np.zeros(len(habitat_ids))
+    if threats:
+        t = np.array(threats, dtype=float).reshape(-1, 2)
+        pos = np.searchsorted(habitat_ids, t[:, 0].astype(np.int64))
+        ok = (pos < len(habitat_ids)) & (habitat_ids[np.minimum(pos, len(habitat_ids) - 1)] == t[:, 0])
+        threat[pos[ok]] = t[ok, 1]
+    pairs = np.array(assigned, dtype=np.int64).reshape(-1, 2)
+    return {
+        "ranger_ids": ranger_ids,
+        "ranger_names": [r[1] for r in rangers],
+        "habitat_ids": habitat_ids,
+        "habitat_names": [f"{h[1]} - {h[2]}" for h in habitats],
+        "area": area,
+        "threat": threat,
+        "assigned": pairs,
+    }
+
+
+# --- Habitat need shares (sum to 1) ---
+def habitat_need(area, threat):
+    def share(x):
+        total = x.sum()
+        return x / total if total > 0 else np.full(len(x), 1.0 / max(len(x), 1))
+    return AREA_WEIGHT * share(area) + (1 - AREA_WEIGHT) * share(threat)
+
+
+# --- Value of the m-th best slot over all habitats ---
+# Slot k (1-based) of habitat h is worth need_h / k; binary search for
+# the value t at which m slots are worth at least t.
+def marginal_value(need, m, capacity=HABITAT_CAPACITY):
+    lo, hi = 0.0, float(need.max())
+    if m <= 0 or hi <= 0:
+        return 0.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if np.minimum(np.floor(need / mid), capacity).sum() >= m:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+# --- Slots worth generating per habitat ---
+# With t the value of the last slot that has to be filled, moving a
+# ranger changes their bonus/penalty by at most
+# (CONTINUITY_BONUS + LOAD_PENALTY) * t, so a slot worth less than t
+# minus that is never used by an optimal plan.
+# Returns (slots per habitat, t).
+def slot_counts(need, n_rangers, capacity=HABITAT_CAPACITY):
+    marginal = marginal_value(need, min(n_rangers, capacity * len(need)), capacity)
+    lowest = marginal * (1.0 - CONTINUITY_BONUS - LOAD_PENALTY)
+    if lowest > 0:
+        counts = np.floor(need / lowest + 1e-9).astype(np.int64)
+    else:
+        counts = np.full(len(need), capacity)
+    # every habitat can receive someone
+    return np.clip(counts, 1, max(1, min(capacity, n_rangers))), marginal
+
+
+# --- Solve ---
+# Returns (proposals, unassigned, stats): one row per placed ranger,
+# the rangers no habitat had room for, and solve statistics.
+def solve(problem):
+    start = time.perf_counter()
+    ranger_ids = problem["ranger_ids"]
+    habitat_ids = problem["habitat_ids"]
+    n_r, n_h = len(ranger_ids), len(habitat_ids)
+    names = np.asarray(problem["ranger_names"], dtype=object) if "ranger_names" in problem else None
+    stats = {"seconds": 0.0, "rangers": n_r, "habitats": n_h, "slots": 0, "variables": 0, "unassigned": n_r}
+    if n_r == 0 or n_h == 0:
+        return pd.DataFrame(), _rangers(ranger_ids, names, np.zeros(n_r), np.arange(n_r)), stats
+
+    need = habitat_need(problem["area"], problem["threat"])
+    slots, marginal = slot_counts(need, n_r)
+    scale = marginal if marginal > 0 else float(need.mean())
+
+    # Current load and existing pairs as index arrays
+    pairs = problem["assigned"]
+    r_pos = np.searchsorted(ranger_ids, pairs[:, 0]).clip(max=n_r - 1)
+    h_pos = np.searchsorted(habitat_ids, pairs[:, 1]).clip(max=n_h - 1)
+    valid = (ranger_ids[r_pos] == pairs[:, 0]) & (habitat_ids[h_pos] == pairs[:, 1])
+    r_pos, h_pos = r_pos[valid], h_pos[valid]
+    load = np.bincount(r_pos, minlength=n_r).astype(float)
+    levels, level_of = np.unique(load, return_inverse=True)
+    n_l = len(levels)
+
+    # Penalty for a ranger of load level l at habitat h
+    need_rel = need / need.max() if need.max() > 0 else need
+    penalty = LOAD_PENALTY * scale * (levels / max(load.max(), 1.0))[:, None] * need_rel[None, :]
+
+    # Variables (arcs) in this order, all maximised by value:
+    # current pair ranger->habitat, ranger->its load level,
+    # level->habitat, habitat slot k->sink
+    slot_h = np.repeat(np.arange(n_h), slots)
+    slot_k = np.arange(len(slot_h)) - np.repeat(np.cumsum(slots) - slots, slots) + 1
+    n_pair, n_lh, n_slot = len(r_pos), n_l * n_h, len(slot_h)
+    o_rl = n_pair
+    o_lh = o_rl + n_r
+    o_slot = o_lh + n_lh
+    n_var = o_slot + n_slot
+    value = np.concatenate([
+        CONTINUITY_BONUS * scale - penalty[level_of[r_pos], h_pos],
+        np.zeros(n_r),
+        -penalty.ravel(),
+        need[slot_h] / slot_k,
+    ])
+
+    # Each ranger is placed at most once: its pair arcs + level arc <= 1
+    once = coo_matrix((np.ones(n_pair + n_r), (np.concatenate([r_pos, np.arange(n_r)]), np.arange(n_pair + n_r))),
+                      shape=(n_r, n_var))
+    # Flow in = flow out at the level nodes (rows 0..n_l-1) and habitat nodes
+    lh_level, lh_habitat = np.divmod(np.arange(n_lh), n_h)
+    flow = coo_matrix((
+        np.concatenate([np.ones(n_r), -np.ones(n_lh), np.ones(n_lh), np.ones(n_pair), -np.ones(n_slot)]),
+        (np.concatenate([level_of, lh_level, n_l + lh_habitat, n_l + h_pos, n_l + slot_h]),
+         np.concatenate([o_rl + np.arange(n_r), o_lh + np.arange(n_lh), o_lh + np.arange(n_lh),
+                         np.arange(n_pair), o_slot + np.arange(n_slot)]))),
+        shape=(n_l + n_h, n_var))
+    upper = np.ones(n_var)
+    upper[o_lh:o_slot] = np.inf
+    # Interior point + crossover: several times faster than simplex here
+    result = linprog(-value, A_ub=once.tocsr(), b_ub=np.ones(n_r), A_eq=flow.tocsr(), b_eq=np.zeros(n_l + n_h),
+                     bounds=np.column_stack([np.zeros(n_var), upper]), method="highs-ipm")
+    if result.status != 0:
+        raise RuntimeError(f"Assignment solver failed: {result.message}")
+    # Network constraint matrix: the optimal vertex crossover returns is integral
+    x = np.rint(result.x).astype(np.int64)
+
+    # Rangers kept on a current post; each level's flow goes to its
+    # remaining rangers in ID order (they are interchangeable)
+    habitat_of = np.full(n_r, -1)
+    kept = x[:o_rl] > 0
+    habitat_of[r_pos[kept]] = h_pos[kept]
+    via_level = np.flatnonzero(x[o_rl:o_lh] > 0)
+    level_flow = x[o_lh:o_slot].reshape(n_l, n_h)
+    for level in range(n_l):
+        members = via_level[level_of[via_level] == level]
+        habitat_of[members] = np.repeat(np.arange(n_h), level_flow[level])[:len(members)]
+
+    placed = np.flatnonzero(habitat_of >= 0)
+    current = np.zeros(n_r * n_h, dtype=bool)
+    current[r_pos * n_h + h_pos] = True
+    proposals = _rangers(ranger_ids, names, load, placed)
+    proposals.insert(len(proposals.columns) - 1, "Habitat_ID", habitat_ids[habitat_of[placed]])
+    if "habitat_names" in problem:
+        proposals.insert(len(proposals.columns) - 1, "habitat",
+                         np.asarray(problem["habitat_names"], dtype=object)[habitat_of[placed]])
+    proposals["habitat_need"] = need[habitat_of[placed]]
+    proposals["already_assigned"] = current[placed * n_h + habitat_of[placed]]
+    # Slot = place within the habitat: current posts first, then lighter load
+    proposals = proposals.sort_values(["habitat_need", "Habitat_ID", "already_assigned", "current_load", "Ranger_ID"],
+                                      ascending=[False, True, False, True, True], ignore_index=True)
+    proposals.insert(proposals.columns.get_loc("habitat_need"), "slot",
+                     proposals.groupby("Habitat_ID").cumcount() + 1)
+
+    missing = np.flatnonzero(habitat_of < 0)
+    stats.update(seconds=time.perf_counter() - start, slots=n_slot, variables=n_var, unassigned=len(missing))
+    return proposals, _rangers(ranger_ids, names, load, missing), stats
+
+
+def _rangers(ranger_ids, names, load, positions):
+    df = pd.DataFrame({"Ranger_ID": ranger_ids[positions]})
+    if names is not None:
+        df["ranger"] = names[positions]
+    df["current_load"] = load[positions].astype(int)
+    return df
+
+
+# --- Random problem of a given size (for the benchmark) ---
+def synthetic_problem(n_rangers, n_habitats, seed=0):
+    rng = np.random.default_rng(seed)
+    n_pairs = min(n_rangers * 2, n_rangers * n_habitats)
+    pairs = np.column_stack([rng.integers(1, n_rangers + 1, n_pairs), rng.integers(1, n_habitats + 1, n_pairs)])
+    return {
+        "ranger_ids": np.arange(1, n_rangers + 1, dtype=np.int64),
+        "habitat_ids": np.arange(1, n_habitats + 1, dtype=np.int64),
+        "area": rng.uniform(50, 2000, n_habitats),
+        "threat": rng.poisson(3, n_habitats).astype(float),
+        "assigned": np.unique(pairs, axis=0),
+    }
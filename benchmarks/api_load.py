@@ -0,0 +1,120 @@
+# ==========================================================
+# BENCHMARK: field API throughput vs the Streamlit path
+# Start the API first (uvicorn api:app --workers 4), then run from
+# the repository root:
+#     python -m benchmarks.api_load                         # lookups
+#     python -m benchmarks.api_load --mode sighting         # writes rows!
+#     python -m benchmarks.api_load --mode batch --batch-size 50
+#     python -m benchmarks.api_load --streamlit 20          # + app reruns
+# Needs httpx; --streamlit uses streamlit.testing (server-side
+# script reruns only, so it flatters Streamlit: no websocket or
+# browser diffing is included).
+# ==========================================================
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import date, datetime
+
+import httpx
+
+from db import DB_CONFIG
+
+LOOKUP_PATHS = ["/lookups/animals?limit=50", "/lookups/rangers?limit=50",
+                "/lookups/equipment?status=Available", "/lookups/sightings?limit=50"]
+
+
+def sighting_body(ranger_id):
+    now = datetime.now()
+    return {"Ranger_ID": ranger_id, "Sighting_Date": date.today().isoformat(),
+            "Sighting_Time": now.strftime("%H:%M:%S"), "Location": "load test",
+            "Capture_Key": str(uuid.uuid4())}
+
+
+def make_request(mode, i, ranger_id, batch_size):
+    if mode == "lookup":
+        return "GET", LOOKUP_PATHS[i % len(LOOKUP_PATHS)], None
+    if mode == "sighting":
+        return "POST", "/sightings", sighting_body(ranger_id)
+    ops = [{"op": "sighting", "body": sighting_body(ranger_id)} for _ in range(batch_size)]
+    return "POST", "/batch", {"ops": ops}
+
+
+async def run_load(args):
+    headers = {"X-API-Key": args.token} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=30) as client:
+        ranger_id = None
+        if args.mode != "lookup":
+            page = (await client.get("/lookups/rangers?limit=1")).raise_for_status().json()
+            if not page["items"]:
+                raise SystemExit("No rangers in the database")
+            ranger_id = page["items"][0]["Ranger_ID"]
+
+        latencies, failures = [], 0
+        counter = iter(range(args.requests))
+
+        async def worker():
+            nonlocal failures
+            for i in counter:
+                method, path, body = make_request(args.mode, i, ranger_id, args.batch_size)
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    ops = args.requests * (args.batch_size if args.mode == "batch" else 1)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"API {args.mode}: {args.requests} requests, concurrency {args.concurrency}, {failures} failed")
+    print(f"  {args.requests / elapsed:>9.1f} requests/s  {ops / elapsed:>9.1f} ops/s")
+    print(f"  latency ms: p50 {statistics.median(latencies) * 1000:.1f}  p95 {p95 * 1000:.1f}")
+
+
+# --- The same action through the Streamlit app: one full script rerun ---
+def run_streamlit(reruns, page):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file("appp.py", default_timeout=60)
+    app.session_state["user"] = DB_CONFIG["user"]
+    app.session_state["password"] = DB_CONFIG["password"]
+    app.session_state["role"] = "Supervisor"
+    app.run()
+    app.sidebar.radio[0].set_value(page).run()   # warm caches and connection
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    print(f"Streamlit '{page}': {reruns} reruns")
+    print(f"  {reruns / sum(times):>9.1f} reruns/s (single session)")
+    print(f"  rerun ms: p50 {statistics.median(times) * 1000:.1f}  max {max(times) * 1000:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests per second: field API vs Streamlit reruns.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", default=os.environ.get("WILDLIFE_API_TOKEN"))
+    parser.add_argument("--mode", choices=["lookup", "sighting", "batch"], default="lookup")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=20, help="ops per /batch request")
+    parser.add_argument("--streamlit", type=int, default=0, metavar="N",
+                        help="also time N reruns of appp.py")
+    parser.add_argument("--page", default="🔍 Sighting Management", help="Streamlit page to rerun")
+    args = parser.parse_args()
+
+    asyncio.run(run_load(args))
+    if args.streamlit:
+        run_streamlit(args.streamlit, args.page)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# ==========================================================
+# BENCHMARK: assignment optimizer solve time vs problem size
+# Run from the repository root:
+#     python -m benchmarks.assignment_solve
+#     python -m benchmarks.assignment_solve --sizes 500 1000 2000 4000
+# Uses synthetic problems, so no database is needed.
+# ==========================================================
+import argparse
+
+from assignment_optimizer import synthetic_problem, solve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the ranger assignment solver.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000, 3000, 10000],
+                        help="number of rangers (habitats = rangers / 2)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rangers':>8} {'habitats':>9} {'slots':>7} {'vars':>8} {'unplaced':>9} {'best s':>8} {'mean s':>8}")
+    for n in args.sizes:
+        problem = synthetic_problem(n, max(n // 2, 1))
+        times = []
+        for _ in range(args.repeat):
+            _, _, stats = solve(problem)
+            times.append(stats["seconds"])
+        print(f"{n:>8} {stats['habitats']:>9} {stats['slots']:>7} {stats['variables']:>8} {stats['unassigned']:>9} "
+              f"{min(times):>8.3f} {sum(times) / len(times):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# ==========================================================
+# BENCHMARK: status/level columns as strings vs coded domains
+# Run from the repository root:
+#     python -m benchmarks.coded_domains                  # pandas only
+#     python -m benchmarks.coded_domains --rows 2000000
+#     python -m benchmarks.coded_domains --db --password ...
+# pandas: memory and groupby time of object (string) columns vs
+# categoricals, plus the cost of decoding ENUM codes (column + 0).
+# --db: loads the same rows into a VARCHAR and an ENUM scratch
+# table and compares their size and GROUP BY time (both dropped).
+# ==========================================================
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from domains import DOMAINS, DTYPES, from_codes
+
+COLUMNS = ["Health_status", "Threat_Level", "StatusEqui"]
+DB_BATCH = 5000
+
+
+def synthetic(rows, seed=7):
+    rng = np.random.default_rng(seed)
+    data = {"habitat": rng.integers(1, 200, rows)}
+    for column in COLUMNS:
+        labels = np.array(DOMAINS[column], dtype=object)
+        data[column] = labels[rng.integers(0, len(labels), rows)]
+    return pd.DataFrame(data)
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def mb(df):
+    return df.memory_usage(index=True, deep=True).sum() / (1024 * 1024)
+
+
+def group(df):
+    for column in COLUMNS:
+        df.groupby(["habitat", column], observed=True).size()
+
+
+def bench_pandas(rows, repeat):
+    strings = synthetic(rows)
+    coded = strings.astype({c: DTYPES[c] for c in COLUMNS})
+    codes = {c: coded[c].cat.codes + 1 for c in COLUMNS}   # what "column + 0" returns
+
+    print(f"pandas, {rows} rows, columns {', '.join(COLUMNS)}")
+    print(f"{'':<12} {'MB':>8} {'groupby s':>10}")
+    t_str = best_of(lambda: group(strings), repeat)
+    t_cat = best_of(lambda: group(coded), repeat)
+    print(f"{'strings':<12} {mb(strings):>8.1f} {t_str:>10.3f}")
+    print(f"{'categorical':<12} {mb(coded):>8.1f} {t_cat:>10.3f}")
+    print(f"{'ratio':<12} {mb(strings) / mb(coded):>7.1f}x {t_str / t_cat:>9.1f}x")
+    t_labels = best_of(lambda: [strings[c].astype(DTYPES[c]) for c in COLUMNS], repeat)
+    t_codes = best_of(lambda: [from_codes(codes[c], c) for c in COLUMNS], repeat)
+    print(f"decode once: from labels {t_labels:.3f}s, from ENUM codes {t_codes:.3f}s")
+
+
+def bench_db(args, rows, repeat):
+    import mysql.connector
+
+    conn = mysql.connector.connect(host=args.host, user=args.user, password=args.password,
+                                   database=args.database, autocommit=True)
+    cursor = conn.cursor()
+    df = synthetic(rows)
+    tables = {
+        "bench_domains_varchar": ", ".join(f"{c} VARCHAR(50)" for c in COLUMNS),
+        "bench_domains_enum": ", ".join(
+            f"{c} ENUM({', '.join(repr(v) for v in DOMAINS[c])})" for c in COLUMNS),
+    }
+    values = list(zip(df["habitat"].tolist(), *(df[c].tolist() for c in COLUMNS)))
+    placeholders = ", ".join(["%s"] * (len(COLUMNS) + 1))
+
+    print(f"\nMySQL, {rows} rows")
+    print(f"{'table':<24} {'data MB':>8} {'groupby s':>10}")
+    try:
+        for table, columns in tables.items():
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE TABLE {table} (id INT AUTO_INCREMENT PRIMARY KEY, habitat INT, {columns})")
+            insert = f"INSERT INTO {table} (habitat, {', '.join(COLUMNS)}) VALUES ({placeholders})"
+            for i in range(0, len(values), DB_BATCH):
+                cursor.executemany(insert, values[i:i + DB_BATCH])
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+            cursor.execute("SELECT data_length FROM information_schema.TABLES "
+                           "WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+            size = cursor.fetchone()[0] / (1024 * 1024)
+
+            def run():
+                for column in COLUMNS:
+                    cursor.execute(f"SELECT habitat, {column}, COUNT(*) FROM {table} GROUP BY habitat, {column}")
+                    cursor.fetchall()
+
+            print(f"{table:<24} {size:>8.1f} {best_of(run, repeat):>10.3f}")
+    finally:
+        for table in tables:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strings vs coded domains: storage and groupby time.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db", action="store_true", help="also compare VARCHAR vs ENUM tables in MySQL")
+    parser.add_argument("--db-rows", type=int, default=200_000)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PWD", ""))
+    parser.add_argument("--database", default="wildlife_conservation")
+    args = parser.parse_args()
+
+    bench_pandas(args.rows, args.repeat)
+    if args.db:
+        bench_db(args, args.db_rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
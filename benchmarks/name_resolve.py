@@ -0,0 +1,69 @@
+# ==========================================================
+# BENCHMARK: species name resolver throughput
+# Run from the repository root:
+#     python -m benchmarks.name_resolve
+#     python -m benchmarks.name_resolve --species 500 2000 10000
+#     python -m benchmarks.name_resolve --distinct 1.0   # no repeats
+# Uses synthetic species (3 names each), so no database is needed.
+# "exact" inputs differ only in case/accents/spacing; "fuzzy"
+# inputs carry one swapped letter pair.
+# ==========================================================
+import argparse
+import random
+import time
+
+from name_resolver import NameResolver
+
+CONSONANTS = "bcdfghklmnprstvz"
+VOWELS = "aeiou"
+
+
+def word(rng, n):
+    return "".join(rng.choice(VOWELS if i % 2 else CONSONANTS) for i in range(n))
+
+
+def build(species, rng):
+    resolver = NameResolver()
+    names = []
+    for sp_id in range(1, species + 1):
+        entries = [("common_name", f"{word(rng, 6).title()} {word(rng, 7)}"),
+                   ("Scientific_name", f"{word(rng, 8).title()} {word(rng, 9)}"),
+                   ("Alt_Name", f"{word(rng, 5)} {word(rng, 6)}")]
+        resolver.set_species(sp_id, entries)
+        names.extend(name for _, name in entries)
+    return resolver, names
+
+
+def exact_input(rng, name):
+    return "  " + name.upper().replace("a", "á").replace("A", "Á") + " "
+
+
+def fuzzy_input(rng, name):
+    i = rng.randrange(len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Names resolved per second, exact and fuzzy.")
+    parser.add_argument("--species", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--names", type=int, default=50000, help="inputs per run")
+    parser.add_argument("--distinct", type=float, default=0.2,
+                        help="share of distinct inputs (bulk files repeat names)")
+    args = parser.parse_args()
+
+    print(f"{'species':>8} {'kind':>6} {'names/s':>10} {'resolved':>9}")
+    for species in args.species:
+        rng = random.Random(species)
+        resolver, known = build(species, rng)
+        for kind, make in (("exact", exact_input), ("fuzzy", fuzzy_input)):
+            pool = [make(rng, rng.choice(known)) for _ in range(max(1, int(args.names * args.distinct)))]
+            inputs = [rng.choice(pool) for _ in range(args.names)]
+            start = time.perf_counter()
+            matches = resolver.resolve_many(inputs)
+            elapsed = time.perf_counter() - start
+            resolved = sum(m is not None for m in matches) / len(matches)
+            print(f"{species:>8} {kind:>6} {len(inputs) / elapsed:>10.0f} {resolved:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# ==========================================================
+# BENCHMARK: plain text queries vs the prepared statement cache
+# Needs the wildlife_conservation database. Run from the repository root:
+#     python -m benchmarks.prepared_lookup --password ...
+#     python -m benchmarks.prepared_lookup --iterations 20000
+# Each hot lookup is run N times both ways on the same connection;
+# the prepared path only parses the SQL once.
+# ==========================================================
+import argparse
+import os
+import time
+
+import mysql.connector
+
+from db import execute_prepared, forget_prepared
+
+LOOKUPS = {
+    "animal by key": (
+        "SELECT Animal_ID, Sp_ID, Tracking_ID, DOB, Gender, Health_status "
+        "FROM Animal WHERE Animal_ID = %s AND Sp_ID = %s",
+        "SELECT Animal_ID, Sp_ID FROM Animal LIMIT 1"),
+    "animal age": (
+        "SELECT age_of_animal(%s, %s) AS age",
+        "SELECT Animal_ID, Sp_ID FROM Animal LIMIT 1"),
+    "ranger experience": (
+        "SELECT ranger_experience(%s) AS exp",
+        "SELECT Ranger_ID FROM Ranger LIMIT 1"),
+    "species habitats": (
+        "SELECT h.Habitat_ID, h.habitat_type, h.region FROM Inhabits i "
+        "JOIN Habitat h ON i.Habitat_ID = h.Habitat_ID WHERE i.Sp_ID = %s",
+        "SELECT Sp_ID FROM Species LIMIT 1"),
+}
+
+
+def run_text(conn, query, params, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query, params)
+        cursor.fetchall()
+        cursor.close()
+    return time.perf_counter() - start
+
+
+def run_prepared(conn, query, params, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        execute_prepared(conn, query, params)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-query cost of text vs prepared lookups.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PWD", ""))
+    parser.add_argument("--database", default="wildlife_conservation")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(host=args.host, user=args.user, password=args.password,
+                                   database=args.database, autocommit=True)
+    print(f"{'lookup':<20} {'text us':>9} {'prepared us':>12} {'speedup':>8}")
+    for name, (query, sample) in LOOKUPS.items():
+        cursor = conn.cursor()
+        cursor.execute(sample)
+        params = cursor.fetchone()
+        cursor.close()
+        if params is None:
+            print(f"{name:<20} (no sample row)")
+            continue
+        execute_prepared(conn, query, params)   # prepare outside the timing
+        text = run_text(conn, query, params, args.iterations)
+        prepared = run_prepared(conn, query, params, args.iterations)
+        per = 1e6 / args.iterations
+        print(f"{name:<20} {text * per:>9.1f} {prepared * per:>12.1f} {text / prepared:>7.2f}x")
+    forget_prepared(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
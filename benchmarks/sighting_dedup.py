@@ -0,0 +1,84 @@
+# ==========================================================
+# BENCHMARK: duplicate sighting detection throughput
+# Run from the repository root:
+#     python -m benchmarks.sighting_dedup
+#     python -m benchmarks.sighting_dedup --rows 200000 1000000 --chunk-days 31
+# Builds a synthetic detail history (no database needed), injects
+# re-logged sightings a few minutes apart, and times find_duplicates
+# over date windows the way sighting_dedup.run reads them.
+# ==========================================================
+import argparse
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from sighting_dedup import DEFAULT_WINDOW, find_duplicates
+
+PLACES = ["North Ridge", "Lake Shore", "River Bend", "East Plains", "Hill Camp",
+          "South Gate", "Bamboo Grove", "Salt Lick", "Waterhole 3", "Old Quarry"]
+
+
+# Returns (history frame, set of injected duplicate sighting_IDs)
+def build(rows, days, dup_share, rng):
+    base = int(rows * (1 - dup_share))
+    animals = max(1, rows // 200)
+    start = pd.Timestamp("2020-01-01")
+    # Original sightings at least 2 hours apart per animal/place
+    ts = start + pd.to_timedelta(np.sort(rng.choice(days * 12, base, replace=True)) * 2, unit="h")
+    df = pd.DataFrame({
+        "sighting_ID": np.arange(1, base + 1),
+        "Animal_ID": rng.integers(1, animals + 1, base),
+        "Ranger_ID": rng.integers(1, 51, base),
+        "ts": ts,
+        "Location": rng.choice(PLACES, base),
+    })
+    df = df.drop_duplicates(["Animal_ID", "Location", "ts"])
+    source = df.sample(n=min(len(df), rows - len(df)), random_state=int(rng.integers(1 << 31)))
+    # Re-logs: another ranger, 1-20 minutes later, same place written differently
+    dups = source.assign(
+        sighting_ID=np.arange(base + 1, base + 1 + len(source)),
+        Ranger_ID=rng.integers(1, 51, len(source)),
+        ts=source["ts"] + pd.to_timedelta(rng.integers(1, 21, len(source)), unit="min"),
+        Location=source["Location"].str.upper() + " ",
+    )
+    return pd.concat([df, dups], ignore_index=True), set(dups["sighting_ID"].tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detail rows clustered per second.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--days", type=int, default=5 * 365, help="history length")
+    parser.add_argument("--chunk-days", type=int, default=31)
+    parser.add_argument("--dup-share", type=float, default=0.05)
+    args = parser.parse_args()
+
+    window = DEFAULT_WINDOW
+    overlap = timedelta(days=1)
+    print(f"{'rows':>9} {'windows':>8} {'seconds':>8} {'rows/s':>10} {'found':>8} {'recall':>7}")
+    for rows in args.rows:
+        rng = np.random.default_rng(rows)
+        df, injected = build(rows, args.days, args.dup_share, rng)
+        df = df.sort_values("ts", ignore_index=True)
+        found, windows = set(), 0
+        start = df["ts"].min().normalize()
+        last = df["ts"].max()
+        elapsed = 0.0
+        while start <= last:
+            end = start + timedelta(days=args.chunk_days)
+            # the slice stands in for load_window; only clustering is timed
+            chunk = df[(df["ts"] >= start - overlap) & (df["ts"] < end)]
+            t0 = time.perf_counter()
+            dups = find_duplicates(chunk, window)
+            dups = dups[dups["ts"] >= start]
+            elapsed += time.perf_counter() - t0
+            found.update(dups["sighting_ID"].tolist())
+            windows += 1
+            start = end
+        recall = len(found & injected) / len(injected) if injected else 1.0
+        print(f"{len(df):>9} {windows:>8} {elapsed:>8.2f} {len(df) / elapsed:>10.0f} {len(found):>8} {recall:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# ==========================================================
+# DELETE IMPACT PREVIEW + BATCHED CASCADE
+# Deleting a Species, Habitat or Ranger used to rely on ON DELETE
+# CASCADE: every child row went in one implicit transaction that
+# held its locks until the end.
+#
+# Here the children are removed first, table by table, in small
+# committed chunks (so other sessions get in between), and the
+# parent row goes last, when its cascades have nothing left to do.
+# Explicit deletes also fire the child tables' triggers (change_log,
+# Animal_Last_Seen, Habitat_Threat_Daily), which cascades do not.
+# ==========================================================
+import time
+
+from db import transaction
+
+DEFAULT_CHUNK_SIZE = 1000
+PAUSE_SECONDS = 0.02       # breathing room for other sessions between chunks
+
+# Each plan: parent key column, child steps in delete order
+# (label, table, condition) and rows that block the delete.
+# Conditions use %(id)s for the parent key; all are index lookups.
+PLANS = {
+    "Species": {
+        "key": "Sp_ID",
+        "steps": [
+            ("Alternative names", "Alt_Names", "Sp_ID = %(id)s"),
+            ("Habitat links", "Inhabits", "Sp_ID = %(id)s"),
+        ],
+        "blockers": [
+            ("Animals of this species", "Animal", "Sp_ID = %(id)s"),
+        ],
+    },
+    "Habitat": {
+        "key": "Habitat_ID",
+        "steps": [
+            ("Species links", "Inhabits", "Habitat_ID = %(id)s"),
+            ("Ranger assignments", "Assigned_To", "Habitat_ID = %(id)s"),
+            ("Threat reports", "Threat_Report", "Habitat_ID = %(id)s"),
+            ("Daily threat scores", "Habitat_Threat_Daily", "Habitat_ID = %(id)s"),
+        ],
+        "blockers": [],
+    },
+    "Ranger": {
+        "key": "Ranger_ID",
+        "steps": [
+            ("Sighting details by this ranger", "Sighting_Details", "Ranger_ID = %(id)s"),
+            ("Other details on this ranger's sightings", "Sighting_Details",
+             "Ranger_ID <> %(id)s AND sighting_ID IN (SELECT Sighting_ID FROM Sighting WHERE Ranger_ID = %(id)s)"),
+            ("Sightings", "Sighting", "Ranger_ID = %(id)s"),
+            ("Threat reports", "Threat_Report", "Ranger_ID = %(id)s"),
+            ("Equipment in use", "Uses", "Ranger_ID = %(id)s"),
+            ("Habitat assignments", "Assigned_To", "Ranger_ID = %(id)s"),
+        ],
+        "blockers": [],
+    },
+}
+
+# Rangers supervised by a deleted ranger keep their rows (SET NULL)
+NULLIFY = {
+    "Ranger": [("Supervised rangers (supervisor cleared)", "Ranger", "Super_Ranger_ID", "Super_Ranger_ID = %(id)s")],
+}
+
+
+def _count(cursor, table, condition, key_value):
+    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {condition}", {"id": key_value})
+    return cursor.fetchone()[0]
+
+
+# --- Rows affected per child table ---
+# Returns [{"step", "table", "rows", "action"}]; action is
+# "delete", "update" (SET NULL) or "blocks".
+def preview_delete(conn, entity, key_value):
+    plan = PLANS[entity]
+    cursor = conn.cursor()
+    impact = []
+    for label, table, condition in plan["steps"]:
+        impact.append({"step": label, "table": table, "action": "delete",
+                       "rows": _count(cursor, table, condition, key_value)})
+    for label, table, _, condition in NULLIFY.get(entity, []):
+        impact.append({"step": label, "table": table, "action": "update",
+                       "rows": _count(cursor, table, condition, key_value)})
+    for label, table, condition in plan["blockers"]:
+        impact.append({"step": label, "table": table, "action": "blocks",
+                       "rows": _count(cursor, table, condition, key_value)})
+    cursor.close()
+    return impact
+
+
+def blocking_rows(impact):
+    return sum(i["rows"] for i in impact if i["action"] == "blocks")
+
+
+# --- Run one statement in committed chunks until nothing is left ---
+def _chunked(conn, statement, key_value, chunk_size, on_chunk):
+    total = 0
+    while True:
+        with transaction(conn) as cursor:
+            cursor.execute(statement + " LIMIT %(limit)s", {"id": key_value, "limit": chunk_size})
+            n = cursor.rowcount
+        total += n
+        on_chunk(total)
+        if n < chunk_size:
+            return total
+        time.sleep(PAUSE_SECONDS)
+
+
+# --- Delete children in chunks, then the parent ---
+# progress(p) is called after every chunk with
+# {"step", "deleted", "expected", "done", "total"}.
+# Returns {"rows", "batches", "seconds", "deleted_parent"}.
+def run_delete(conn, entity, key_value, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, impact=None):
+    plan = PLANS[entity]
+    impact = impact or preview_delete(conn, entity, key_value)
+    if blocking_rows(impact):
+        raise ValueError(f"{entity} {key_value} still has dependent rows that cannot be removed")
+    expected = {i["step"]: i["rows"] for i in impact}
+    total = sum(i["rows"] for i in impact if i["action"] != "blocks")
+    stats = {"rows": 0, "batches": 0, "seconds": 0.0, "deleted_parent": False}
+    start = time.perf_counter()
+
+    def run(label, statement):
+        before = stats["rows"]
+
+        def on_chunk(done_here):
+            stats["batches"] += 1
+            stats["rows"] = before + done_here
+            if progress:
+                progress({"step": label, "deleted": done_here, "expected": expected.get(label, 0),
+                          "done": stats["rows"], "total": total})
+
+        _chunked(conn, statement, key_value, chunk_size, on_chunk)
+
+    for label, table, column, condition in NULLIFY.get(entity, []):
+        run(label, f"UPDATE {table} SET {column} = NULL WHERE {condition}")
+    for label, table, condition in plan["steps"]:
+        run(label, f"DELETE FROM {table} WHERE {condition}")
+
+    # Anything added meanwhile still goes through the FK cascade
+    with transaction(conn) as cursor:
+        cursor.execute(f"DELETE FROM {entity} WHERE {plan['key']} = %(id)s", {"id": key_value})
+        stats["deleted_parent"] = cursor.rowcount > 0
+    stats["seconds"] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,212 @@
+# ==========================================================
+# CHANGE FEED
+# Tails the trigger-written change_log (section 13 of
+# final_project.sql) from a per-consumer checkpoint, so caches
+# and derived tables can update incrementally:
+#
+#     feed = ChangeFeed("search_index", tables=["Species"])
+#     feed.consume(conn, lambda batch, cursor: ...)
+#
+# seq values are handed out when a row is inserted but become
+# visible when its transaction commits, so a slow transaction can
+# leave a temporary hole. Reading stops at a hole until it fills.
+# Only seqs of rolled-back transactions may be skipped: a hole is
+# passed once no open transaction holds it any more (see
+# ChangeFeed._skip_hole), never just because it is old.
+# ==========================================================
+import json
+from collections import namedtuple
+from datetime import timedelta
+
+from mysql.connector import errors
+
+from db import transaction
+
+# Tables with change_log triggers (sections 13 and 16 of final_project.sql)
+CDC_TABLES = ("Species", "Animal", "Sighting", "Sighting_Details", "Threat_Report", "Equipment", "Uses",
+              "Alt_Names")
+
+DEFAULT_BATCH_SIZE = 1000
+HOLE_GRACE = timedelta(seconds=2)     # before a hole nobody holds is skipped
+GAP_TIMEOUT = timedelta(seconds=30)   # only for servers without NOWAIT (before MySQL 8.0)
+PRUNE_CHUNK = 10000
+
+ER_LOCK_NOWAIT = 3572
+NOWAIT_UNSUPPORTED = {1064, 1235}     # syntax error / not supported
+
+Change = namedtuple("Change", ["seq", "table_name", "op", "pk", "changed_at"])
+
+
+# --- Highest seq, overall or for some tables (cheap cache key) ---
+def latest_seq(conn, tables=None):
+    cursor = conn.cursor()
+    if tables:
+        marks = ", ".join(["%s"] * len(tables))
+        cursor.execute(f"""
+            SELECT MAX(m) FROM (
+                SELECT table_name, MAX(seq) AS m FROM change_log
+                WHERE table_name IN ({marks}) GROUP BY table_name
+            ) t
+        """, tuple(tables))
+    else:
+        cursor.execute("SELECT MAX(seq) FROM change_log")
+    row = cursor.fetchone()
+    cursor.close()
+    return int(row[0] or 0)
+
+
+# --- Delete log rows every consumer has already processed ---
+# Returns the number of rows removed.
+def prune(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(last_seq) FROM change_log_checkpoint")
+    upto = cursor.fetchone()[0]
+    removed = 0
+    while upto:
+        cursor.execute("DELETE FROM change_log WHERE seq <= %s ORDER BY seq LIMIT %s", (upto, PRUNE_CHUNK))
+        conn.commit()
+        removed += cursor.rowcount
+        if cursor.rowcount < PRUNE_CHUNK:
+            break
+    cursor.close()
+    return removed
+
+
+def _load_pk(value):
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode()
+    return json.loads(value) if isinstance(value, str) else value
+
+
+class ChangeFeed:
+    # start: where a consumer without a checkpoint begins,
+    # "earliest" (replay the retained log) or "latest" (only new changes)
+    def __init__(self, consumer, tables=None, batch_size=DEFAULT_BATCH_SIZE,
+                 gap_timeout=GAP_TIMEOUT, start="earliest"):
+        self.consumer = consumer
+        self.start = start
+        self.tables = set(tables) if tables else None
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self._holes = {}   # first seq of a hole -> server time this feed first saw it
+
+    # --- Last committed seq for this consumer ---
+    # A new consumer starts just before the oldest retained row (the
+    # log may have been pruned) or at the current end of the log.
+    def checkpoint(self, conn, lock=False):
+        cursor = conn.cursor()
+        query = "SELECT last_seq FROM change_log_checkpoint WHERE consumer = %s"
+        cursor.execute(query + (" FOR UPDATE" if lock else ""), (self.consumer,))
+        row = cursor.fetchone()
+        if row is None:
+            if self.start == "latest":
+                cursor.execute("SELECT MAX(seq) FROM change_log")
+            else:
+                cursor.execute("SELECT MIN(seq) - 1 FROM change_log")
+            row = cursor.fetchone()
+        cursor.close()
+        return int(row[0] or 0)
+
+    # --- Read the next batch after `after` ---
+    # Returns (changes for the watched tables, seq to checkpoint).
+    # The seq also covers skipped rows from other tables.
+    def poll(self, conn, after):
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT seq, table_name, op, pk, changed_at FROM change_log
+            WHERE seq > %s ORDER BY seq LIMIT %s
+        """, (after, self.batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            cursor.close()
+            return [], after
+        cursor.execute("SELECT NOW(6)")
+        now = cursor.fetchone()[0]
+        cursor.close()
+
+        changes, upto = [], after
+        for seq, table_name, op, pk, changed_at in rows:
+            # A hole before this row: wait until it fills or is known dead
+            if seq != upto + 1 and not self._skip_hole(conn, upto, seq, now):
+                break
+            upto = seq
+            if self.tables is None or table_name in self.tables:
+                changes.append(Change(seq, table_name, op, _load_pk(pk), changed_at))
+        for start in [h for h in self._holes if h <= upto]:
+            del self._holes[start]
+        return changes, upto
+
+    # --- May the missing seqs between after and before be skipped? ---
+    # A locking NOWAIT read over the hole fails while the transaction
+    # that took those seqs is still open, however long it runs; once it
+    # finds nothing, they were rolled back. A hole is also left alone
+    # for HOLE_GRACE after this consumer first saw it (the statement
+    # that took a seq may not have written its row yet). Servers
+    # without NOWAIT skip a hole gap_timeout after it was first seen.
+    # Keep one ChangeFeed per consumer so these timings carry over
+    # between polls.
+    def _skip_hole(self, conn, after, before, now):
+        first_seen = self._holes.setdefault(after + 1, now)
+        age = now - first_seen
+        if age < HOLE_GRACE:
+            return False
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM change_log WHERE seq > %s AND seq < %s FOR SHARE NOWAIT",
+                           (after, before))
+            # Rows there now: they committed and are read on the next poll
+            return cursor.fetchone()[0] == 0
+        except errors.DatabaseError as e:
+            if e.errno == ER_LOCK_NOWAIT:
+                return False
+            if e.errno in NOWAIT_UNSUPPORTED:
+                return age >= self.gap_timeout
+            raise
+        finally:
+            cursor.close()
+
+    # --- Give a new consumer its checkpoint row ---
+    # SELECT ... FOR UPDATE on a missing row locks nothing, so two
+    # workers could both start a new consumer from scratch. The row is
+    # created in its own transaction before consume() locks it.
+    def _ensure_checkpoint(self, conn):
+        with transaction(conn) as cursor:
+            cursor.execute("INSERT IGNORE INTO change_log_checkpoint (consumer, last_seq) VALUES (%s, %s)",
+                           (self.consumer, self.checkpoint(conn)))
+
+    # --- Move the checkpoint forward (never backwards) ---
+    def commit(self, cursor, seq):
+        cursor.execute("""
+            INSERT INTO change_log_checkpoint (consumer, last_seq) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE last_seq = GREATEST(last_seq, VALUES(last_seq))
+        """, (self.consumer, seq))
+
+    # --- Process batches until caught up ---
+    # handler(changes, cursor) runs inside the same transaction that
+    # advances the checkpoint, so derived tables written through the
+    # cursor and the checkpoint commit (or roll back) together.
+    # Returns the number of changes handed to the handler.
+    def consume(self, conn, handler, max_batches=None):
+        handled = batches = 0
+        self._ensure_checkpoint(conn)
+        while max_batches is None or batches < max_batches:
+            with transaction(conn) as cursor:
+                after = self.checkpoint(conn, lock=True)  # one worker per consumer at a time
+                changes, upto = self.poll(conn, after)
+                if upto == after:
+                    break
+                if changes:
+                    handler(changes, cursor)
+                self.commit(cursor, upto)
+            handled += len(changes)
+            batches += 1
+        return handled
+
+    # --- Collapse a batch to the final op per key ---
+    # Useful for caches that only need "what to reload / drop".
+    @staticmethod
+    def latest_by_key(changes):
+        latest = {}
+        for c in changes:
+            latest[(c.table_name, tuple(sorted(c.pk.items())))] = c
+        return list(latest.values())
@@ -0,0 +1,121 @@
+# ==========================================================
+# SPECIES / HABITAT CO-OCCURRENCE
+# Builds sparse incidence matrices from the Inhabits and
+# Sighting_Details link tables and answers "most similar
+# species / habitats" questions from them.
+#
+#   H: species x habitat   (Inhabits)
+#   S: species x sighting  (Sighting_Details joined to Animal)
+#
+#   species x species (shared habitats) = H @ H.T
+#   species x species (co-sighted)      = S @ S.T
+#   habitat x habitat (shared species)  = H.T @ H
+# ==========================================================
+import numpy as np
+import scipy.sparse as sp
+
+# Tables whose Table_Version counters invalidate a cached index
+SOURCE_TABLES = ("Inhabits", "Sighting_Details")
+
+SPECIES_BASES = ["Shared habitats", "Co-sightings"]
+
+
+# --- Build a binary CSR incidence matrix from (row_id, col_id) pairs ---
+def _incidence(row_ids, col_ids, row_keys, col_keys):
+    rows = np.searchsorted(row_keys, row_ids)
+    cols = np.searchsorted(col_keys, col_ids)
+    data = np.ones(len(rows), dtype=np.float32)
+    m = sp.csr_matrix((data, (rows, cols)), shape=(len(row_keys), len(col_keys)))
+    m.sum_duplicates()
+    m.data[:] = 1.0  # several animals of a species in one sighting still count once
+    return m
+
+
+# --- Scale rows to unit length so a dot product is cosine similarity ---
+def _normalize_rows(m):
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.diags(1.0 / norms) @ m
+
+
+# --- Top k entries of a sparse 1 x n row, skipping one index ---
+def _top_k(row, k, skip):
+    row = row.tocoo()
+    idx, vals = row.col, row.data
+    keep = idx != skip
+    idx, vals = idx[keep], vals[keep]
+    if len(vals) > k:
+        part = np.argpartition(-vals, k)[:k]
+        idx, vals = idx[part], vals[part]
+    order = np.argsort(-vals, kind="stable")
+    return idx[order], vals[order]
+
+
+class CooccurrenceIndex:
+    def __init__(self, inhabits, sightings):
+        # inhabits: (n, 2) array of Sp_ID, Habitat_ID
+        # sightings: (m, 2) array of sighting_ID, Sp_ID
+        inhabits = np.asarray(inhabits, dtype=np.int64).reshape(-1, 2)
+        sightings = np.asarray(sightings, dtype=np.int64).reshape(-1, 2)
+
+        self.species_ids = np.unique(np.concatenate([inhabits[:, 0], sightings[:, 1]]))
+        self.habitat_ids = np.unique(inhabits[:, 1])
+        sighting_ids = np.unique(sightings[:, 0])
+
+        H = _incidence(inhabits[:, 0], inhabits[:, 1], self.species_ids, self.habitat_ids)
+        S = _incidence(sightings[:, 1], sightings[:, 0], self.species_ids, sighting_ids)
+
+        self.species_habitat = H
+        self.species_species = {
+            "Shared habitats": (H @ H.T).tocsr(),
+            "Co-sightings": (S @ S.T).tocsr(),
+        }
+        self.habitat_habitat = (H.T @ H).tocsr()
+
+        # Row-normalised copies for cosine similarity lookups
+        self._species_norm = {
+            "Shared habitats": _normalize_rows(H).tocsr(),
+            "Co-sightings": _normalize_rows(S).tocsr(),
+        }
+        self._habitat_norm = _normalize_rows(H.T.tocsr()).tocsr()
+
+    @classmethod
+    def from_connection(cls, conn):
+        cursor = conn.cursor()
+        cursor.execute("SELECT Sp_ID, Habitat_ID FROM Inhabits")
+        inhabits = cursor.fetchall()
+        cursor.execute("""
+            SELECT DISTINCT sd.sighting_ID, a.Sp_ID
+            FROM Sighting_Details sd
+            JOIN Animal a ON sd.Animal_ID = a.Animal_ID
+        """)
+        sightings = cursor.fetchall()
+        cursor.close()
+        return cls(inhabits, sightings)
+
+    def _similar(self, keys, norm, counts, item_id, k):
+        pos = np.searchsorted(keys, item_id)
+        if pos >= len(keys) or keys[pos] != item_id:
+            return []
+        sims = norm[pos] @ norm.T
+        idx, vals = _top_k(sims, k, pos)
+        shared = counts[pos, idx].toarray().ravel() if len(idx) else []
+        return [(int(keys[i]), float(v), int(c)) for i, v, c in zip(idx, vals, shared)]
+
+    # --- Public lookups: list of (id, cosine similarity, shared count) ---
+    def similar_species(self, sp_id, k=10, basis="Shared habitats"):
+        return self._similar(self.species_ids, self._species_norm[basis],
+                             self.species_species[basis], sp_id, k)
+
+    def similar_habitats(self, habitat_id, k=10):
+        return self._similar(self.habitat_ids, self._habitat_norm,
+                             self.habitat_habitat, habitat_id, k)
+
+    # --- Strongest co-occurring pairs: list of (id_a, id_b, count) ---
+    def top_pairs(self, basis="Shared habitats", n=20):
+        upper = sp.triu(self.species_species[basis], k=1).tocoo()
+        if upper.nnz == 0:
+            return []
+        order = np.argsort(-upper.data, kind="stable")[:n]
+        return [(int(self.species_ids[upper.row[i]]), int(self.species_ids[upper.col[i]]), int(upper.data[i]))
+                for i in order]
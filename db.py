@@ -0,0 +1,215 @@
+# ==========================================================
+# DATA ACCESS HELPERS
+# Plain mysql.connector helpers shared by appp.py and the
+# command-line tools. No Streamlit in here: callers decide how
+# errors are shown.
+# ==========================================================
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import errors, pooling
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password':'NAGS@2882',
+    'database': 'wildlife_conservation',
+    # Each statement sees the latest committed data (the shared connection
+    # would otherwise keep reading one REPEATABLE READ snapshot until the
+    # next write, and cache version checks would never see other sessions)
+    'autocommit': True,
+    'connection_timeout': 5
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+POOL_SIZE = int(os.environ.get("WILDLIFE_POOL_SIZE", "8"))
+
+
+# --- New connection from DB_CONFIG (keyword arguments override it) ---
+def connect(**overrides):
+    return mysql.connector.connect(**{**DB_CONFIG, **overrides})
+
+
+# --- Process-wide pool of DB_CONFIG connections, opened on first use ---
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(pool_name="wildlife", pool_size=POOL_SIZE, **DB_CONFIG)
+        return _pool
+
+
+# --- Connection of its own for one unit of work, from the pool ---
+# Checking out skips the TCP connect and login; returning resets the
+# session (open transaction, variables, prepared statements). A
+# connection left with an unread result is disconnected first, which
+# discards the result; the pool reconnects it on the next checkout.
+# When every pooled connection is busy, a plain one is opened instead.
+@contextmanager
+def pooled_connection():
+    try:
+        conn = get_pool().get_connection()
+        pooled = True
+    except errors.PoolError:
+        conn = connect()
+        pooled = False
+    try:
+        yield conn
+    finally:
+        forget_prepared(conn)
+        if pooled and conn.unread_result:
+            conn.disconnect()
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+
+
+# --- Stream a result set in chunks ---
+# Uses an unbuffered cursor so rows are pulled from the server
+# chunk by chunk instead of being loaded all at once. The connection
+# is busy until the result is read to the end: give it one of its own
+# (pooled_connection), which discards the rest when the block exits.
+# Yields (column_names, description, rows) per chunk.
+def stream_query(conn, query, params=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(query, params or ())
+        columns = list(cursor.column_names)
+        description = cursor.description
+        yielded = False
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yielded = True
+            yield columns, description, rows
+        if not yielded:
+            # Empty result: still hand back the column layout
+            yield columns, description, []
+    finally:
+        # Not drained when the consumer stopped early: that would pull
+        # the rest of the result into memory. Disconnecting (what
+        # pooled_connection does) discards it.
+        try:
+            cursor.close()
+        except mysql.connector.Error:
+            pass
+
+
+# --- Unit of work ---
+# Groups several statements into one transaction with a single commit:
+#     with transaction(conn) as cursor:
+#         cursor.execute("INSERT ...")
+#         new_id = cursor.lastrowid
+#         insert_many(cursor, "Alt_Names", ("Sp_ID", "Alt_Name"), rows)
+# Anything raised inside the block rolls the whole group back.
+@contextmanager
+def transaction(conn):
+    conn.start_transaction()
+    cursor = conn.cursor()
+    try:
+        yield cursor
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# --- Multi-row INSERT in one statement ---
+# table/columns come from code, never from user input.
+# on_duplicate: optional "ON DUPLICATE KEY UPDATE" assignments.
+# Returns the affected row count.
+def insert_many(cursor, table, columns, rows, ignore=False, on_duplicate=None):
+    rows = list(rows)
+    if not rows:
+        return 0
+    row_marks = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    verb = "INSERT IGNORE" if ignore else "INSERT"
+    query = f"{verb} INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([row_marks] * len(rows))
+    if on_duplicate:
+        query += f" ON DUPLICATE KEY UPDATE {on_duplicate}"
+    cursor.execute(query, tuple(v for row in rows for v in row))
+    return cursor.rowcount
+
+
+# --- Whitelisted identifiers ---
+# Table/column names cannot be bound as parameters, so names that come
+# from the UI are checked against a fixed list and backtick-quoted.
+def quote_identifier(name, allowed):
+    if name not in allowed:
+        raise ValueError(f"Unknown identifier: {name!r}")
+    return "`" + name.replace("`", "``") + "`"
+
+
+# --- Prepared statement cache ---
+# One prepared cursor per (connection, SQL template): the statement is
+# parsed by the server once and later calls only send the parameters.
+# mysql.connector re-prepares unless it is handed the *same* string
+# object, so the cached key string is what gets executed.
+MAX_PREPARED_STATEMENTS = 128
+
+_prepared = OrderedDict()   # (id(conn), connection_id, sql) -> (sql, cursor)
+_prepared_lock = threading.RLock()
+
+
+# Caller holds _prepared_lock until it is done with the cursor, so no
+# other thread can evict and close it in between.
+def _prepared_cursor(conn, query):
+    key = (id(conn), conn.connection_id, query)
+    entry = _prepared.get(key)
+    if entry is not None:
+        _prepared.move_to_end(key)
+        return entry
+    entry = (query, conn.cursor(prepared=True))
+    _prepared[key] = entry
+    while len(_prepared) > MAX_PREPARED_STATEMENTS:
+        _close_prepared(_prepared.popitem(last=False)[1])
+    return entry
+
+
+def _close_prepared(entry):
+    if entry is None:
+        return
+    try:
+        entry[1].close()   # deallocates the server-side statement
+    except Exception:
+        pass
+
+
+# Drop cached statements of a connection (e.g. before closing it).
+def forget_prepared(conn):
+    with _prepared_lock:
+        for key in [k for k in _prepared if k[0] == id(conn)]:
+            _close_prepared(_prepared.pop(key))
+
+
+# --- Run a parameterised statement through the cache ---
+# params must be a tuple/list (%s placeholders). Returns rows as dicts
+# when fetch is True, otherwise the affected row count. One lock covers
+# the cache and the execution, so every prepared statement in the
+# process runs one at a time. The app runs them all on its one shared
+# connection, which can only take one statement at a time anyway.
+def execute_prepared(conn, query, params=None, fetch=True):
+    with _prepared_lock:
+        sql, cursor = _prepared_cursor(conn, query)
+        try:
+            cursor.execute(sql, tuple(params or ()))
+            if not fetch:
+                return cursor.rowcount
+            rows = cursor.fetchall()
+            columns = cursor.column_names
+        except Exception:
+            # Don't reuse a cursor whose prepare or execute failed
+            _close_prepared(_prepared.pop((id(conn), conn.connection_id, query), None))
+            raise
+    return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,97 @@
+# ==========================================================
+# ANIMAL DEMOGRAPHICS
+# Reads the trigger-maintained Animal_Demographics table (section 10
+# of final_project.sql) instead of scanning Animal and calling
+# age_of_animal() per row. Ages are whole years from the date of
+# birth, computed by the server (TIMESTAMPDIFF) as of the given day.
+# Counts are of the animals recorded now: deleted animals are
+# already subtracted by the triggers.
+# ==========================================================
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Age band edges in years: [0,2), [2,5), [5,10), ...
+AGE_BAND_EDGES = [0, 2, 5, 10, 15, 20, 30, np.inf]
+AGE_BAND_LABELS = ["0-1", "2-4", "5-9", "10-14", "15-19", "20-29", "30+"]
+UNKNOWN_BAND = "Unknown"
+UNKNOWN_DOB = date(1000, 1, 1)   # stored for animals without a DOB
+
+COLUMNS = ["Sp_ID", "Gender", "Health_status", "Birth_Year", "Age", "animal_count"]
+
+
+# --- Counts by species, gender, health, birth year and age ---
+# One species is a primary key prefix lookup. Birth_Year is 0 and
+# Age missing when the DOB is unknown.
+def load_demographics(conn, sp_id=None, today=None):
+    params = [UNKNOWN_DOB, UNKNOWN_DOB, today or date.today()]
+    where = ""
+    if sp_id is not None:
+        where = " AND Sp_ID = %s"
+        params.append(sp_id)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT Sp_ID, Gender, Health_status,
+               IF(Birth_Date = %s, 0, YEAR(Birth_Date)) AS Birth_Year,
+               IF(Birth_Date = %s, NULL, TIMESTAMPDIFF(YEAR, Birth_Date, %s)) AS Age,
+               SUM(animal_count)
+        FROM Animal_Demographics
+        WHERE animal_count > 0{where}
+        GROUP BY Sp_ID, Gender, Health_status, Birth_Year, Age
+    """, tuple(params))
+    rows = cursor.fetchall()
+    cursor.close()
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df["Age"] = pd.to_numeric(df["Age"])
+    df["animal_count"] = df["animal_count"].astype("int64")
+    return df
+
+
+# --- Add an ordered age_band column ---
+def with_age_bands(df):
+    bands = pd.cut(df["Age"], AGE_BAND_EDGES, right=False, labels=AGE_BAND_LABELS)
+    bands = bands.cat.add_categories([UNKNOWN_BAND]).fillna(UNKNOWN_BAND)
+    return df.assign(age_band=bands)
+
+
+# --- Age band x gender counts (population pyramid) ---
+def population_pyramid(df):
+    if df.empty:
+        return pd.DataFrame()
+    return with_age_bands(df).pivot_table(index="age_band", columns="Gender", values="animal_count",
+                                          aggfunc="sum", fill_value=0, observed=False)
+
+
+# --- Age band x health status counts ---
+def health_by_age(df):
+    if df.empty:
+        return pd.DataFrame()
+    return with_age_bands(df).pivot_table(index="age_band", columns="Health_status", values="animal_count",
+                                          aggfunc="sum", fill_value=0, observed=False)
+
+
+# --- Current animals per birth year, and born in or before each year ---
+# Not a births trend: animals deleted since are not counted, so older
+# cohorts shrink as animals are removed.
+def birth_cohorts(df):
+    known = df[df["Birth_Year"] > 0]
+    if known.empty:
+        return pd.DataFrame(columns=["animals_now", "animals_now_born_by_year"])
+    born = known.groupby("Birth_Year")["animal_count"].sum().sort_index()
+    years = pd.RangeIndex(born.index.min(), born.index.max() + 1, name="Birth_Year")
+    born = born.reindex(years, fill_value=0)
+    return pd.DataFrame({"animals_now": born, "animals_now_born_by_year": born.cumsum()})
+
+
+# --- Per-species totals by gender and health ---
+def species_summary(df):
+    if df.empty:
+        return pd.DataFrame()
+    by_gender = df.pivot_table(index="Sp_ID", columns="Gender", values="animal_count",
+                               aggfunc="sum", fill_value=0)
+    by_health = df.pivot_table(index="Sp_ID", columns="Health_status", values="animal_count",
+                               aggfunc="sum", fill_value=0)
+    summary = by_gender.join(by_health, rsuffix="_health")
+    summary.insert(0, "total", df.groupby("Sp_ID")["animal_count"].sum())
+    return summary
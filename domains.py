@@ -0,0 +1,52 @@
+# ==========================================================
+# CODED DOMAINS
+# Labels of the ENUM status/level columns (section 15 of
+# final_project.sql), in code order: code 1 is the first label.
+# Keep in step with the ALTER TABLE statements there.
+#
+# Frames are decoded once into pandas categoricals: one small
+# integer per row plus a single copy of each label, so grouping
+# and filtering compare integers instead of strings.
+# ==========================================================
+import pandas as pd
+
+DOMAINS = {
+    "conservation_status": ["Least Concern", "Near Threatened", "Vulnerable", "Endangered", "Critically Endangered"],
+    "raankOfRanger": ["Junior Ranger", "Field Ranger", "Senior Ranger", "Wildlife Officer"],
+    "Gender": ["Male", "Female"],
+    "Health_status": ["Healthy", "Sick", "Injured", "Under Treatment"],
+    "Threat_Level": ["Low", "Medium", "High"],
+    "StatusEqui": ["Available", "In Use", "Maintenance"],
+}
+
+# Domains with a meaningful order (comparisons, sort by severity)
+ORDERED = {"conservation_status", "Threat_Level"}
+
+DTYPES = {column: pd.CategoricalDtype(labels, ordered=column in ORDERED)
+          for column, labels in DOMAINS.items()}
+
+
+# --- Label strings -> categorical; anything outside the domain becomes NaN ---
+def to_categorical(values, column):
+    return pd.Series(values).astype(DTYPES[column])
+
+
+# --- ENUM codes (column + 0: 1-based, 0 = invalid, NULL) -> categorical ---
+def from_codes(codes, column):
+    codes = pd.Series(codes).fillna(0).astype("int64") - 1
+    codes = codes.where(codes.between(0, len(DOMAINS[column]) - 1), -1)
+    return pd.Categorical.from_codes(codes, dtype=DTYPES[column])
+
+
+# --- Decode every domain column of a frame (in place) and return it ---
+# aliases maps result column names to domain names, e.g.
+# {"equipment_status": "StatusEqui"}.
+def decode(df, aliases=None):
+    if df is None or df.empty:
+        return df
+    names = dict(aliases or {})
+    names.update({c: c for c in df.columns if c in DTYPES})
+    for column, domain in names.items():
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(DTYPES[domain])
+    return df
@@ -0,0 +1,147 @@
+# ==========================================================
+# TABLE / REPORT EXPORT
+# Streams a query result from an unbuffered cursor straight into a
+# CSV or Parquet file on disk, one chunk at a time, so the full
+# result never sits in memory (or in the browser).
+# ==========================================================
+import csv
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+from mysql.connector import FieldType
+
+from db import stream_query, DEFAULT_CHUNK_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ["CSV", "Parquet"]
+MIME_TYPES = {"CSV": "text/csv", "Parquet": "application/vnd.apache.parquet"}
+PARQUET_COMPRESSION = "zstd"
+
+
+def parquet_available():
+    return pa is not None
+
+
+# --- MySQL column type -> Arrow type ---
+def _arrow_type(type_code):
+    if type_code in (FieldType.TINY, FieldType.SHORT, FieldType.LONG,
+                     FieldType.LONGLONG, FieldType.INT24, FieldType.YEAR):
+        return pa.int64()
+    if type_code in (FieldType.FLOAT, FieldType.DOUBLE,
+                     FieldType.DECIMAL, FieldType.NEWDECIMAL):
+        return pa.float64()
+    if type_code in (FieldType.DATE, FieldType.NEWDATE):
+        return pa.date32()
+    if type_code in (FieldType.DATETIME, FieldType.TIMESTAMP):
+        return pa.timestamp("us")
+    if type_code == FieldType.TIME:
+        return pa.duration("us")  # connector returns TIME as timedelta
+    return pa.string()
+
+
+def _arrow_schema(columns, description):
+    return pa.schema([pa.field(name, _arrow_type(d[1])) for name, d in zip(columns, description)])
+
+
+def _arrow_batch(schema, rows):
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [r[i] for r in rows]
+        if pa.types.is_floating(field.type):
+            values = [float(v) if isinstance(v, Decimal) else v for v in values]
+        elif pa.types.is_string(field.type):
+            values = [v if v is None or isinstance(v, str) else
+                      v.decode("utf-8", "replace") if isinstance(v, (bytes, bytearray)) else str(v)
+                      for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# --- Writers: consume chunks from stream_query, return row count ---
+def _write_csv(path, chunks):
+    rows_written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        header_done = False
+        for columns, _, rows in chunks:
+            if not header_done:
+                writer.writerow(columns)
+                header_done = True
+            writer.writerows(rows)
+            rows_written += len(rows)
+    return rows_written
+
+
+def _write_parquet(path, chunks):
+    if not parquet_available():
+        raise RuntimeError("Parquet export needs the 'pyarrow' package.")
+    rows_written = 0
+    writer = None
+    try:
+        for columns, description, rows in chunks:
+            if writer is None:
+                schema = _arrow_schema(columns, description)
+                writer = pq.ParquetWriter(path, schema, compression=PARQUET_COMPRESSION)
+            if rows:
+                writer.write_batch(_arrow_batch(schema, rows))
+                rows_written += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows_written
+
+
+# --- Export a query to a temp file ---
+# Returns (path, stats). The caller owns the file and should remove it
+# with cleanup_export() once it has been served.
+def export_query(conn, query, fmt="CSV", params=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    suffix = ".csv" if fmt == "CSV" else ".parquet"
+    fd, path = tempfile.mkstemp(prefix="wildlife_export_", suffix=suffix)
+    os.close(fd)
+
+    start = time.perf_counter()
+    chunks = stream_query(conn, query, params, chunk_size)
+    try:
+        if fmt == "CSV":
+            rows = _write_csv(path, chunks)
+        else:
+            rows = _write_parquet(path, chunks)
+    except Exception:
+        chunks.close()
+        cleanup_export(path)
+        raise
+    elapsed = time.perf_counter() - start
+
+    size = os.path.getsize(path)
+    stats = {
+        "rows": rows,
+        "bytes": size,
+        "seconds": elapsed,
+        "bytes_per_sec": size / elapsed if elapsed > 0 else float(size),
+    }
+    return path, stats
+
+
+def cleanup_export(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# --- Human readable byte counts for the UI ---
+def format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}" if unit != "B" else f"{int(n)} B"
+        n /= 1024
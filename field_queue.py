@@ -0,0 +1,300 @@
+# ==========================================================
+# OFFLINE FIELD CAPTURE QUEUE
+# Sightings, sighting details and threat reports captured while the
+# MySQL server is unreachable are journalled to a local SQLite file
+# and pushed later in large batches.
+#
+# Every capture gets a UUID capture key. Sighting and Threat_Report
+# store it in a UNIQUE Capture_Key column (section 12 of
+# final_project.sql) and Sighting_Details is deduped by its primary
+# key, so a batch can be replayed safely after a crash or a lost
+# reply: INSERT IGNORE skips what already made it to the server.
+# ==========================================================
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta
+
+from mysql.connector import errors
+
+from db import transaction, insert_many
+
+DEFAULT_PATH = os.environ.get("WILDLIFE_FIELD_QUEUE", "field_queue.sqlite3")
+DEFAULT_BATCH_SIZE = 500
+
+# Client errors that mean "server unreachable" rather than "bad data"
+OFFLINE_ERRNOS = {2003, 2005, 2006, 2013, 2055}
+
+KIND_SIGHTING = "sighting"
+KIND_DETAIL = "sighting_detail"
+KIND_THREAT = "threat"
+
+
+# Only lost or refused connections mean the capture should stay
+# queued; other client errors (e.g. 2014 commands out of sync) are bugs
+# that a retry would not fix.
+def is_offline_error(e):
+    if not isinstance(e, (errors.InterfaceError, errors.OperationalError)):
+        return False
+    errno = getattr(e, "errno", None)
+    return errno is None or errno < 1000 or errno in OFFLINE_ERRNOS
+
+
+# Key for a capture: chosen before the online attempt so a write whose
+# reply was lost is skipped, not duplicated, when the queued copy syncs
+def new_capture_key():
+    return str(uuid.uuid4())
+
+
+def _json_default(v):
+    if isinstance(v, (date, datetime, dtime)):
+        return v.isoformat()
+    if isinstance(v, timedelta):  # TIME columns come back as timedelta
+        return str(v)
+    return str(v)
+
+
+class FieldQueue:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._lookup_saved = {}   # lookup name -> time of the last save_lookup
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")  # a capture survives a crash once saved
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS captures (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                capture_key TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                captured_at TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',   -- pending | synced | rejected
+                server_id INTEGER,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_captures_status ON captures (status, kind, seq);
+            CREATE TABLE IF NOT EXISTS lookups (
+                name TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                refreshed_at TEXT NOT NULL
+            );
+        """)
+
+    # ------------------------------------------------------
+    # Capture (always local, never touches MySQL)
+    # ------------------------------------------------------
+    def _capture(self, kind, payload, key=None):
+        key = key or new_capture_key()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO captures (capture_key, kind, payload, captured_at) VALUES (?, ?, ?, ?)",
+                (key, kind, json.dumps(payload, default=_json_default), datetime.now().isoformat()))
+        return key
+
+    def capture_sighting(self, ranger_id, sighting_date, sighting_time, location, capture_key=None):
+        return self._capture(KIND_SIGHTING, {
+            "Ranger_ID": ranger_id, "Sighting_Date": sighting_date,
+            "Sighting_Time": sighting_time, "Location": location}, capture_key)
+
+    # Either sighting_id (already on the server) or sighting_key (a queued sighting)
+    def capture_sighting_detail(self, animal_id, ranger_id, sighting_id=None, sighting_key=None):
+        if sighting_id is None and sighting_key is None:
+            raise ValueError("sighting_id or sighting_key is required")
+        return self._capture(KIND_DETAIL, {
+            "sighting_ID": sighting_id, "sighting_key": sighting_key,
+            "Animal_ID": animal_id, "Ranger_ID": ranger_id})
+
+    # Same fields as LogThreatReport; the report date is the capture date
+    # (LogThreatReport would stamp CURDATE() at sync time instead)
+    def capture_threat(self, habitat_id, ranger_id, threat_level, description, report_date=None,
+                       capture_key=None):
+        return self._capture(KIND_THREAT, {
+            "Habitat_ID": habitat_id, "Ranger_ID": ranger_id,
+            "Report_Date": report_date or date.today(),
+            "Threat_Level": threat_level, "Description": description}, capture_key)
+
+    # ------------------------------------------------------
+    # Queue state
+    # ------------------------------------------------------
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM captures GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    # after: only captures queued after that seq (for paging)
+    def pending(self, kind=None, limit=None, after=None):
+        query = "SELECT seq, capture_key, kind, payload, captured_at FROM captures WHERE status = 'pending'"
+        params = []
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        if after is not None:
+            query += " AND seq > ?"
+            params.append(after)
+        query += " ORDER BY seq"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [{"seq": sq, "capture_key": k, "kind": kd, "payload": json.loads(p), "captured_at": c}
+                for sq, k, kd, p, c in rows]
+
+    def rejected(self):
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT capture_key, kind, payload, captured_at, error
+                FROM captures WHERE status = 'rejected' ORDER BY seq
+            """).fetchall()
+        return [{"capture_key": k, "kind": kd, "payload": p, "captured_at": c, "error": e}
+                for k, kd, p, c, e in rows]
+
+    def _mark(self, synced, rejected=()):
+        # synced: [(server_id, capture_key)], rejected: [(error, capture_key)]
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "UPDATE captures SET status = 'synced', server_id = ?, error = NULL WHERE capture_key = ?", synced)
+            self._db.executemany(
+                "UPDATE captures SET status = 'rejected', error = ? WHERE capture_key = ?", rejected)
+            self._db.execute("COMMIT")
+
+    # (status, server_id) of an earlier capture, e.g. a detail's parent sighting
+    def _capture_state(self, capture_key):
+        with self._lock:
+            row = self._db.execute("SELECT status, server_id FROM captures WHERE capture_key = ?",
+                                   (capture_key,)).fetchone()
+        return row if row else (None, None)
+
+    # ------------------------------------------------------
+    # Last known lookup lists (rangers, animals, ...) for offline forms
+    # ------------------------------------------------------
+    # min_interval: skip the save if this list was saved less than that
+    # many seconds ago (callers refreshing it on every page render)
+    def save_lookup(self, name, rows, min_interval=0):
+        now = time.monotonic()
+        if min_interval and now - self._lookup_saved.get(name, float("-inf")) < min_interval:
+            return False
+        self._lookup_saved[name] = now
+        payload = json.dumps(rows, default=_json_default)
+        with self._lock:
+            self._db.execute("""
+                INSERT INTO lookups (name, payload, refreshed_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET payload = excluded.payload, refreshed_at = excluded.refreshed_at
+                WHERE lookups.payload <> excluded.payload
+            """, (name, payload, datetime.now().isoformat()))
+        return True
+
+    def load_lookup(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM lookups WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------
+    # Pushes pending captures in batches: sightings first (details may
+    # point at them), then threat reports, then sighting details.
+    # Batches are paged by seq, so captures that cannot be resolved yet
+    # (a detail whose sighting is still queued) stay pending without
+    # holding back the ones behind them.
+    # Returns {"synced": n, "rejected": n, "batches": n}.
+    def sync(self, conn, batch_size=DEFAULT_BATCH_SIZE):
+        stats = {"synced": 0, "rejected": 0, "batches": 0}
+        for kind, push in ((KIND_SIGHTING, self._push_sightings),
+                           (KIND_THREAT, self._push_threats),
+                           (KIND_DETAIL, self._push_details)):
+            after = None
+            while True:
+                batch = self.pending(kind, batch_size, after=after)
+                if not batch:
+                    break
+                after = batch[-1]["seq"]
+                synced, rejected = push(conn, batch)
+                self._mark(synced, rejected)
+                stats["synced"] += len(synced)
+                stats["rejected"] += len(rejected)
+                stats["batches"] += 1
+        return stats
+
+    # Insert a keyed batch, then read back ids by capture key
+    def _push_keyed(self, conn, batch, table, id_col, columns):
+        keys = [c["capture_key"] for c in batch]
+        rows = [tuple(c["payload"][col] for col in columns) + (c["capture_key"],) for c in batch]
+        with transaction(conn) as cursor:
+            insert_many(cursor, table, columns + ("Capture_Key",), rows, ignore=True)
+            marks = ", ".join(["%s"] * len(keys))
+            cursor.execute(f"SELECT Capture_Key, {id_col} FROM {table} WHERE Capture_Key IN ({marks})", tuple(keys))
+            found = dict(cursor.fetchall())
+        synced = [(found[k], k) for k in keys if k in found]
+        # INSERT IGNORE turns bad references into warnings: those rows are missing
+        rejected = [("Rejected by the server (invalid ranger/habitat reference?)", k)
+                    for k in keys if k not in found]
+        return synced, rejected
+
+    def _push_sightings(self, conn, batch):
+        return self._push_keyed(conn, batch, "Sighting", "Sighting_ID",
+                                ("Ranger_ID", "Sighting_Date", "Sighting_Time", "Location"))
+
+    def _push_threats(self, conn, batch):
+        return self._push_keyed(conn, batch, "Threat_Report", "Report_ID",
+                                ("Habitat_ID", "Ranger_ID", "Report_Date", "Threat_Level", "Description"))
+
+    def _push_details(self, conn, batch):
+        rows, keys, rejected = [], [], []
+        for c in batch:
+            p = c["payload"]
+            sighting_id = p["sighting_ID"]
+            if sighting_id is None:
+                status, sighting_id = self._capture_state(p["sighting_key"])
+                if status == "pending":
+                    continue  # parent sighting not synced yet
+                if status != "synced":
+                    rejected.append(("Its sighting was rejected or is missing", c["capture_key"]))
+                    continue
+            rows.append((sighting_id, p["Animal_ID"], p["Ranger_ID"]))
+            keys.append(c["capture_key"])
+        if not rows:
+            return [], rejected
+
+        columns = ("sighting_ID", "Animal_ID", "Ranger_ID")
+        failed = {}
+        try:
+            with transaction(conn) as cursor:
+                insert_many(cursor, "Sighting_Details", columns, rows, ignore=True)
+        except errors.DatabaseError as e:
+            if is_offline_error(e):
+                raise
+            # A trigger (e.g. trg_no_sick_sighting) rejected the batch:
+            # fall back to row by row to find the offending captures
+            for row, key in zip(rows, keys):
+                try:
+                    with transaction(conn) as cursor:
+                        insert_many(cursor, "Sighting_Details", columns, [row], ignore=True)
+                except errors.DatabaseError as row_error:
+                    if is_offline_error(row_error):
+                        raise
+                    failed[key] = str(row_error)
+
+        # Confirm which rows are on the server (PK lookups)
+        cursor = conn.cursor()
+        present = set()
+        for start in range(0, len(rows), DEFAULT_BATCH_SIZE):
+            chunk = rows[start:start + DEFAULT_BATCH_SIZE]
+            cond = " OR ".join(["(sighting_ID=%s AND Animal_ID=%s AND Ranger_ID=%s)"] * len(chunk))
+            cursor.execute(f"SELECT sighting_ID, Animal_ID, Ranger_ID FROM Sighting_Details WHERE {cond}",
+                           tuple(v for r in chunk for v in r))
+            present.update(tuple(r) for r in cursor.fetchall())
+        cursor.close()
+
+        synced = []
+        for row, key in zip(rows, keys):
+            if tuple(row) in present:
+                synced.append((row[0], key))
+            else:
+                rejected.append((failed.get(key, "Rejected by the server (invalid animal/ranger reference?)"), key))
+        return synced, rejected
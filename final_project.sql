@@ -469,6 +469,1140 @@ WHERE
     )
     AND raankOfRanger = 'Senior Ranger';
     
+-- -------------------------------------------------------
+-- 7. TABLE VERSION COUNTERS (Cache Invalidation)
+-- -------------------------------------------------------
+-- One counter per watched table, bumped by triggers on every change.
+-- The app compares counters (a primary key lookup) to decide whether a
+-- cached result built from that table is still valid.
+-- NOTE: MySQL does not fire triggers for rows removed by ON DELETE CASCADE,
+-- so the parent tables bump the counters of the link tables they cascade into.
+
+CREATE TABLE Table_Version (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO Table_Version (table_name) VALUES ('Inhabits'), ('Sighting_Details');
+
+DELIMITER $$
+
+CREATE TRIGGER trg_inhabits_version_ins AFTER INSERT ON Inhabits
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Inhabits';
+END$$
+
+CREATE TRIGGER trg_inhabits_version_upd AFTER UPDATE ON Inhabits
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Inhabits';
+END$$
+
+CREATE TRIGGER trg_inhabits_version_del AFTER DELETE ON Inhabits
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Inhabits';
+END$$
+
+CREATE TRIGGER trg_sighting_details_version_ins AFTER INSERT ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Sighting_Details';
+END$$
+
+CREATE TRIGGER trg_sighting_details_version_upd AFTER UPDATE ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Sighting_Details';
+END$$
+
+CREATE TRIGGER trg_sighting_details_version_del AFTER DELETE ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Sighting_Details';
+END$$
+
+-- Parents whose deletes cascade into the link tables
+CREATE TRIGGER trg_species_version_del AFTER DELETE ON Species
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Inhabits';
+END$$
+
+CREATE TRIGGER trg_habitat_version_del AFTER DELETE ON Habitat
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Inhabits';
+END$$
+
+CREATE TRIGGER trg_sighting_version_del AFTER DELETE ON Sighting
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Sighting_Details';
+END$$
+
+CREATE TRIGGER trg_ranger_version_del AFTER DELETE ON Ranger
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Sighting_Details';
+END$$
+
+-- Animal species changes move sightings between species
+CREATE TRIGGER trg_animal_version_upd AFTER UPDATE ON Animal
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Sp_ID <=> NEW.Sp_ID) OR NOT (OLD.Animal_ID <=> NEW.Animal_ID) THEN
+        UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Sighting_Details';
+    END IF;
+END$$
+DELIMITER ;
+
+
+-- -------------------------------------------------------
+-- 8. THREAT TIME SERIES (Per-Habitat Daily Threat Scores)
+-- -------------------------------------------------------
+-- One row per habitat per day, kept current by triggers on Threat_Report
+-- (so LogThreatReport inserts land here immediately). updated_at lets the
+-- app poll only the rows that changed since its last refresh.
+
+CREATE TABLE Habitat_Threat_Daily (
+    Habitat_ID INT,
+    Report_Day DATE,
+    report_count INT NOT NULL DEFAULT 0,
+    score_sum INT NOT NULL DEFAULT 0,
+    max_score INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (Habitat_ID, Report_Day),
+    INDEX idx_threat_daily_day (Report_Day),
+    INDEX idx_threat_daily_updated (updated_at),
+    FOREIGN KEY (Habitat_ID) REFERENCES Habitat(Habitat_ID) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_threat_habitat_date ON Threat_Report (Habitat_ID, Report_Date);
+
+DELIMITER $$
+
+-- Same scale as threat_severity_score, but from the level itself
+CREATE FUNCTION threat_level_score(p_level VARCHAR(20)) RETURNS INT
+    DETERMINISTIC
+BEGIN
+    RETURN CASE p_level
+        WHEN 'Low' THEN 1
+        WHEN 'Medium' THEN 2
+        WHEN 'High' THEN 3
+        ELSE 0
+    END;
+END$$
+
+-- Recomputes one habitat-day from Threat_Report (used after deletes/moves)
+CREATE PROCEDURE RefreshThreatDay(IN p_Habitat_ID INT, IN p_Day DATE)
+BEGIN
+    INSERT INTO Habitat_Threat_Daily (Habitat_ID, Report_Day, report_count, score_sum, max_score)
+    SELECT p_Habitat_ID, p_Day, COUNT(*),
+           COALESCE(SUM(threat_level_score(Threat_Level)), 0),
+           COALESCE(MAX(threat_level_score(Threat_Level)), 0)
+    FROM Threat_Report
+    WHERE Habitat_ID = p_Habitat_ID AND Report_Date = p_Day
+    ON DUPLICATE KEY UPDATE
+        report_count = VALUES(report_count),
+        score_sum = VALUES(score_sum),
+        max_score = VALUES(max_score);
+END$$
+
+CREATE TRIGGER trg_threat_daily_ins AFTER INSERT ON Threat_Report
+FOR EACH ROW
+BEGIN
+    IF NEW.Habitat_ID IS NOT NULL AND NEW.Report_Date IS NOT NULL THEN
+        INSERT INTO Habitat_Threat_Daily (Habitat_ID, Report_Day, report_count, score_sum, max_score)
+        VALUES (NEW.Habitat_ID, NEW.Report_Date, 1,
+                threat_level_score(NEW.Threat_Level), threat_level_score(NEW.Threat_Level))
+        ON DUPLICATE KEY UPDATE
+            report_count = report_count + 1,
+            score_sum = score_sum + VALUES(score_sum),
+            max_score = GREATEST(max_score, VALUES(max_score));
+    END IF;
+END$$
+
+CREATE TRIGGER trg_threat_daily_upd AFTER UPDATE ON Threat_Report
+FOR EACH ROW
+BEGIN
+    IF OLD.Habitat_ID IS NOT NULL AND OLD.Report_Date IS NOT NULL THEN
+        CALL RefreshThreatDay(OLD.Habitat_ID, OLD.Report_Date);
+    END IF;
+    IF NEW.Habitat_ID IS NOT NULL AND NEW.Report_Date IS NOT NULL
+       AND NOT (NEW.Habitat_ID <=> OLD.Habitat_ID AND NEW.Report_Date <=> OLD.Report_Date) THEN
+        CALL RefreshThreatDay(NEW.Habitat_ID, NEW.Report_Date);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_threat_daily_del AFTER DELETE ON Threat_Report
+FOR EACH ROW
+BEGIN
+    IF OLD.Habitat_ID IS NOT NULL AND OLD.Report_Date IS NOT NULL THEN
+        CALL RefreshThreatDay(OLD.Habitat_ID, OLD.Report_Date);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Backfill from existing reports
+INSERT INTO Habitat_Threat_Daily (Habitat_ID, Report_Day, report_count, score_sum, max_score)
+SELECT Habitat_ID, Report_Date, COUNT(*),
+       SUM(threat_level_score(Threat_Level)), MAX(threat_level_score(Threat_Level))
+FROM Threat_Report
+WHERE Habitat_ID IS NOT NULL AND Report_Date IS NOT NULL
+GROUP BY Habitat_ID, Report_Date;
+
+
+-- -------------------------------------------------------
+-- 9. ROW VERSIONS (Optimistic Concurrency for Update Forms)
+-- -------------------------------------------------------
+-- Every update (forms, procedures, other triggers) bumps row_version, so a
+-- form can write with "WHERE ... AND row_version = <version it loaded>"
+-- and detect that someone else changed the row in the meantime.
+
+ALTER TABLE Species ADD COLUMN row_version INT NOT NULL DEFAULT 1;
+ALTER TABLE Habitat ADD COLUMN row_version INT NOT NULL DEFAULT 1;
+ALTER TABLE Ranger ADD COLUMN row_version INT NOT NULL DEFAULT 1;
+ALTER TABLE Animal ADD COLUMN row_version INT NOT NULL DEFAULT 1;
+ALTER TABLE Organization ADD COLUMN row_version INT NOT NULL DEFAULT 1;
+ALTER TABLE Equipment ADD COLUMN row_version INT NOT NULL DEFAULT 1;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_species_row_version BEFORE UPDATE ON Species
+FOR EACH ROW
+BEGIN
+    SET NEW.row_version = OLD.row_version + 1;
+END$$
+
+CREATE TRIGGER trg_habitat_row_version BEFORE UPDATE ON Habitat
+FOR EACH ROW
+BEGIN
+    SET NEW.row_version = OLD.row_version + 1;
+END$$
+
+CREATE TRIGGER trg_ranger_row_version BEFORE UPDATE ON Ranger
+FOR EACH ROW
+BEGIN
+    SET NEW.row_version = OLD.row_version + 1;
+END$$
+
+CREATE TRIGGER trg_animal_row_version BEFORE UPDATE ON Animal
+FOR EACH ROW
+BEGIN
+    SET NEW.row_version = OLD.row_version + 1;
+END$$
+
+CREATE TRIGGER trg_org_row_version BEFORE UPDATE ON Organization
+FOR EACH ROW
+BEGIN
+    SET NEW.row_version = OLD.row_version + 1;
+END$$
+
+CREATE TRIGGER trg_equipment_row_version BEFORE UPDATE ON Equipment
+FOR EACH ROW
+BEGIN
+    SET NEW.row_version = OLD.row_version + 1;
+END$$
+DELIMITER ;
+
+
+-- -------------------------------------------------------
+-- 10. ANIMAL DEMOGRAPHICS (Incremental Aggregates)
+-- -------------------------------------------------------
+-- Per-species animal counts by gender, health status and date of birth,
+-- kept current by triggers on Animal. The birth date (not age) is stored
+-- so rows do not go stale as animals get older; ages are derived when
+-- reading with TIMESTAMPDIFF(YEAR, Birth_Date, CURDATE()), which is exact
+-- to the day. Unknown DOBs are stored as 1000-01-01 (a key column cannot
+-- be NULL). Deleted animals are subtracted, so the counts describe the
+-- animals recorded now.
+
+CREATE TABLE Animal_Demographics (
+    Sp_ID INT,
+    Gender VARCHAR(10),
+    Health_status VARCHAR(50),
+    Birth_Date DATE NOT NULL,       -- 1000-01-01 when DOB is unknown
+    animal_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (Sp_ID, Gender, Health_status, Birth_Date),
+    INDEX idx_demographics_birth (Birth_Date)
+);
+
+DELIMITER $$
+
+CREATE TRIGGER trg_demographics_ins AFTER INSERT ON Animal
+FOR EACH ROW
+BEGIN
+    INSERT INTO Animal_Demographics (Sp_ID, Gender, Health_status, Birth_Date, animal_count)
+    VALUES (NEW.Sp_ID, COALESCE(NEW.Gender, 'Unknown'), COALESCE(NEW.Health_status, 'Unknown'),
+            COALESCE(NEW.DOB, '1000-01-01'), 1)
+    ON DUPLICATE KEY UPDATE animal_count = animal_count + 1;
+END$$
+
+CREATE TRIGGER trg_demographics_upd AFTER UPDATE ON Animal
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Sp_ID <=> NEW.Sp_ID AND OLD.Gender <=> NEW.Gender
+            AND OLD.Health_status <=> NEW.Health_status AND OLD.DOB <=> NEW.DOB) THEN
+        UPDATE Animal_Demographics
+        SET animal_count = animal_count - 1
+        WHERE Sp_ID = OLD.Sp_ID
+          AND Gender = COALESCE(OLD.Gender, 'Unknown')
+          AND Health_status = COALESCE(OLD.Health_status, 'Unknown')
+          AND Birth_Date = COALESCE(OLD.DOB, '1000-01-01');
+
+        INSERT INTO Animal_Demographics (Sp_ID, Gender, Health_status, Birth_Date, animal_count)
+        VALUES (NEW.Sp_ID, COALESCE(NEW.Gender, 'Unknown'), COALESCE(NEW.Health_status, 'Unknown'),
+                COALESCE(NEW.DOB, '1000-01-01'), 1)
+        ON DUPLICATE KEY UPDATE animal_count = animal_count + 1;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_demographics_del AFTER DELETE ON Animal
+FOR EACH ROW
+BEGIN
+    UPDATE Animal_Demographics
+    SET animal_count = animal_count - 1
+    WHERE Sp_ID = OLD.Sp_ID
+      AND Gender = COALESCE(OLD.Gender, 'Unknown')
+      AND Health_status = COALESCE(OLD.Health_status, 'Unknown')
+      AND Birth_Date = COALESCE(OLD.DOB, '1000-01-01');
+END$$
+DELIMITER ;
+
+-- Backfill from existing animals
+INSERT INTO Animal_Demographics (Sp_ID, Gender, Health_status, Birth_Date, animal_count)
+SELECT Sp_ID, COALESCE(Gender, 'Unknown'), COALESCE(Health_status, 'Unknown'),
+       COALESCE(DOB, '1000-01-01'), COUNT(*)
+FROM Animal
+GROUP BY Sp_ID, COALESCE(Gender, 'Unknown'), COALESCE(Health_status, 'Unknown'), COALESCE(DOB, '1000-01-01');
+
+
+-- -------------------------------------------------------
+-- 11. FULL-TEXT SEARCH INDEXES
+-- -------------------------------------------------------
+-- Used by the global Search page (search.py) via MATCH ... AGAINST.
+-- InnoDB keeps these indexes current on every insert/update.
+
+ALTER TABLE Threat_Report ADD FULLTEXT INDEX ft_threat_description (Description);
+ALTER TABLE Species ADD FULLTEXT INDEX ft_species_names (common_name, Scientific_name);
+ALTER TABLE Alt_Names ADD FULLTEXT INDEX ft_alt_names (Alt_Name);
+ALTER TABLE Habitat ADD FULLTEXT INDEX ft_habitat_region (region, habitat_type);
+ALTER TABLE Ranger ADD FULLTEXT INDEX ft_ranger_name (fname);
+
+
+-- -------------------------------------------------------
+-- 12. FIELD CAPTURE KEYS (Offline Sync Deduplication)
+-- -------------------------------------------------------
+-- Sightings and threat reports recorded offline carry the UUID they were
+-- captured with (field_queue.py). The unique key makes a re-sent batch a
+-- no-op under INSERT IGNORE. Rows entered online leave it NULL.
+
+ALTER TABLE Sighting ADD COLUMN Capture_Key CHAR(36) NULL,
+    ADD UNIQUE INDEX uq_sighting_capture (Capture_Key);
+ALTER TABLE Threat_Report ADD COLUMN Capture_Key CHAR(36) NULL,
+    ADD UNIQUE INDEX uq_threat_capture (Capture_Key);
+
+
+-- -------------------------------------------------------
+-- 13. CHANGE DATA CAPTURE (Append-Only change_log)
+-- -------------------------------------------------------
+-- Every insert/update/delete on the watched tables appends one compact row:
+-- table, operation (I/U/D) and the primary key as JSON. seq only grows, so
+-- a consumer (change_feed.py) keeps the last seq it processed in
+-- change_log_checkpoint and reads forward from there in batches.
+-- An update that changes the primary key is logged as D (old key) + I (new key).
+-- NOTE: cascaded deletes do not fire triggers, so the parents log their
+-- children in BEFORE DELETE triggers (same statement, same rollback).
+
+CREATE TABLE change_log (
+    seq BIGINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+    table_name VARCHAR(64) NOT NULL,
+    op CHAR(1) NOT NULL,            -- I = insert, U = update, D = delete
+    pk JSON NOT NULL,
+    changed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    INDEX idx_change_log_table (table_name, seq),
+    INDEX idx_change_log_time (changed_at)
+);
+
+CREATE TABLE change_log_checkpoint (
+    consumer VARCHAR(64) PRIMARY KEY,
+    last_seq BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+);
+
+DELIMITER $$
+
+CREATE PROCEDURE LogChange(IN p_table VARCHAR(64), IN p_op CHAR(1), IN p_pk JSON)
+BEGIN
+    INSERT INTO change_log (table_name, op, pk) VALUES (p_table, p_op, p_pk);
+END$$
+
+CREATE PROCEDURE LogUpdate(IN p_table VARCHAR(64), IN p_old JSON, IN p_new JSON)
+BEGIN
+    IF p_old = p_new THEN
+        CALL LogChange(p_table, 'U', p_new);
+    ELSE
+        CALL LogChange(p_table, 'D', p_old);
+        CALL LogChange(p_table, 'I', p_new);
+    END IF;
+END$$
+
+-- Species
+CREATE TRIGGER trg_species_cdc_ins AFTER INSERT ON Species
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Species', 'I', JSON_OBJECT('Sp_ID', NEW.Sp_ID));
+END$$
+
+CREATE TRIGGER trg_species_cdc_upd AFTER UPDATE ON Species
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Species', JSON_OBJECT('Sp_ID', OLD.Sp_ID), JSON_OBJECT('Sp_ID', NEW.Sp_ID));
+END$$
+
+CREATE TRIGGER trg_species_cdc_del AFTER DELETE ON Species
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Species', 'D', JSON_OBJECT('Sp_ID', OLD.Sp_ID));
+END$$
+
+-- Animal
+CREATE TRIGGER trg_animal_cdc_ins AFTER INSERT ON Animal
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Animal', 'I', JSON_OBJECT('Animal_ID', NEW.Animal_ID, 'Sp_ID', NEW.Sp_ID));
+END$$
+
+CREATE TRIGGER trg_animal_cdc_upd AFTER UPDATE ON Animal
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Animal', JSON_OBJECT('Animal_ID', OLD.Animal_ID, 'Sp_ID', OLD.Sp_ID),
+                   JSON_OBJECT('Animal_ID', NEW.Animal_ID, 'Sp_ID', NEW.Sp_ID));
+END$$
+
+CREATE TRIGGER trg_animal_cdc_del AFTER DELETE ON Animal
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Animal', 'D', JSON_OBJECT('Animal_ID', OLD.Animal_ID, 'Sp_ID', OLD.Sp_ID));
+END$$
+
+-- Sighting
+CREATE TRIGGER trg_sighting_cdc_ins AFTER INSERT ON Sighting
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Sighting', 'I', JSON_OBJECT('Sighting_ID', NEW.Sighting_ID));
+END$$
+
+CREATE TRIGGER trg_sighting_cdc_upd AFTER UPDATE ON Sighting
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Sighting', JSON_OBJECT('Sighting_ID', OLD.Sighting_ID), JSON_OBJECT('Sighting_ID', NEW.Sighting_ID));
+END$$
+
+CREATE TRIGGER trg_sighting_cdc_del AFTER DELETE ON Sighting
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Sighting', 'D', JSON_OBJECT('Sighting_ID', OLD.Sighting_ID));
+END$$
+
+-- Sighting_Details
+CREATE TRIGGER trg_sighting_details_cdc_ins AFTER INSERT ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Sighting_Details', 'I',
+                   JSON_OBJECT('sighting_ID', NEW.sighting_ID, 'Animal_ID', NEW.Animal_ID, 'Ranger_ID', NEW.Ranger_ID));
+END$$
+
+CREATE TRIGGER trg_sighting_details_cdc_upd AFTER UPDATE ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Sighting_Details',
+                   JSON_OBJECT('sighting_ID', OLD.sighting_ID, 'Animal_ID', OLD.Animal_ID, 'Ranger_ID', OLD.Ranger_ID),
+                   JSON_OBJECT('sighting_ID', NEW.sighting_ID, 'Animal_ID', NEW.Animal_ID, 'Ranger_ID', NEW.Ranger_ID));
+END$$
+
+CREATE TRIGGER trg_sighting_details_cdc_del AFTER DELETE ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Sighting_Details', 'D',
+                   JSON_OBJECT('sighting_ID', OLD.sighting_ID, 'Animal_ID', OLD.Animal_ID, 'Ranger_ID', OLD.Ranger_ID));
+END$$
+
+-- Threat_Report
+CREATE TRIGGER trg_threat_cdc_ins AFTER INSERT ON Threat_Report
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Threat_Report', 'I', JSON_OBJECT('Report_ID', NEW.Report_ID));
+END$$
+
+CREATE TRIGGER trg_threat_cdc_upd AFTER UPDATE ON Threat_Report
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Threat_Report', JSON_OBJECT('Report_ID', OLD.Report_ID), JSON_OBJECT('Report_ID', NEW.Report_ID));
+END$$
+
+CREATE TRIGGER trg_threat_cdc_del AFTER DELETE ON Threat_Report
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Threat_Report', 'D', JSON_OBJECT('Report_ID', OLD.Report_ID));
+END$$
+
+-- Equipment
+CREATE TRIGGER trg_equipment_cdc_ins AFTER INSERT ON Equipment
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Equipment', 'I', JSON_OBJECT('Equipment_ID', NEW.Equipment_ID));
+END$$
+
+CREATE TRIGGER trg_equipment_cdc_upd AFTER UPDATE ON Equipment
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Equipment', JSON_OBJECT('Equipment_ID', OLD.Equipment_ID), JSON_OBJECT('Equipment_ID', NEW.Equipment_ID));
+END$$
+
+CREATE TRIGGER trg_equipment_cdc_del AFTER DELETE ON Equipment
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Equipment', 'D', JSON_OBJECT('Equipment_ID', OLD.Equipment_ID));
+END$$
+
+-- Uses
+CREATE TRIGGER trg_uses_cdc_ins AFTER INSERT ON Uses
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Uses', 'I', JSON_OBJECT('Ranger_ID', NEW.Ranger_ID, 'Equipment_ID', NEW.Equipment_ID));
+END$$
+
+CREATE TRIGGER trg_uses_cdc_upd AFTER UPDATE ON Uses
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Uses', JSON_OBJECT('Ranger_ID', OLD.Ranger_ID, 'Equipment_ID', OLD.Equipment_ID),
+                   JSON_OBJECT('Ranger_ID', NEW.Ranger_ID, 'Equipment_ID', NEW.Equipment_ID));
+END$$
+
+CREATE TRIGGER trg_uses_cdc_del AFTER DELETE ON Uses
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Uses', 'D', JSON_OBJECT('Ranger_ID', OLD.Ranger_ID, 'Equipment_ID', OLD.Equipment_ID));
+END$$
+
+-- Parents whose deletes cascade into watched tables
+CREATE TRIGGER trg_sighting_cdc_cascade BEFORE DELETE ON Sighting
+FOR EACH ROW
+BEGIN
+    INSERT INTO change_log (table_name, op, pk)
+    SELECT 'Sighting_Details', 'D', JSON_OBJECT('sighting_ID', sighting_ID, 'Animal_ID', Animal_ID, 'Ranger_ID', Ranger_ID)
+    FROM Sighting_Details WHERE sighting_ID = OLD.Sighting_ID;
+END$$
+
+CREATE TRIGGER trg_equipment_cdc_cascade BEFORE DELETE ON Equipment
+FOR EACH ROW
+BEGIN
+    INSERT INTO change_log (table_name, op, pk)
+    SELECT 'Uses', 'D', JSON_OBJECT('Ranger_ID', Ranger_ID, 'Equipment_ID', Equipment_ID)
+    FROM Uses WHERE Equipment_ID = OLD.Equipment_ID;
+END$$
+
+CREATE TRIGGER trg_habitat_cdc_cascade BEFORE DELETE ON Habitat
+FOR EACH ROW
+BEGIN
+    INSERT INTO change_log (table_name, op, pk)
+    SELECT 'Threat_Report', 'D', JSON_OBJECT('Report_ID', Report_ID)
+    FROM Threat_Report WHERE Habitat_ID = OLD.Habitat_ID;
+END$$
+
+CREATE TRIGGER trg_ranger_cdc_cascade BEFORE DELETE ON Ranger
+FOR EACH ROW
+BEGIN
+    INSERT INTO change_log (table_name, op, pk)
+    SELECT 'Sighting_Details', 'D', JSON_OBJECT('sighting_ID', sd.sighting_ID, 'Animal_ID', sd.Animal_ID, 'Ranger_ID', sd.Ranger_ID)
+    FROM Sighting_Details sd
+    WHERE sd.Ranger_ID = OLD.Ranger_ID
+       OR sd.sighting_ID IN (SELECT Sighting_ID FROM Sighting WHERE Ranger_ID = OLD.Ranger_ID);
+
+    INSERT INTO change_log (table_name, op, pk)
+    SELECT 'Sighting', 'D', JSON_OBJECT('Sighting_ID', Sighting_ID)
+    FROM Sighting WHERE Ranger_ID = OLD.Ranger_ID;
+
+    INSERT INTO change_log (table_name, op, pk)
+    SELECT 'Threat_Report', 'D', JSON_OBJECT('Report_ID', Report_ID)
+    FROM Threat_Report WHERE Ranger_ID = OLD.Ranger_ID;
+
+    INSERT INTO change_log (table_name, op, pk)
+    SELECT 'Uses', 'D', JSON_OBJECT('Ranger_ID', Ranger_ID, 'Equipment_ID', Equipment_ID)
+    FROM Uses WHERE Ranger_ID = OLD.Ranger_ID;
+END$$
+DELIMITER ;
+
+
+-- -------------------------------------------------------
+-- 14. ANIMAL LAST SEEN (Per-Animal Sighting Summary)
+-- -------------------------------------------------------
+-- One row per animal: number of distinct sightings plus the date, time,
+-- location and ranger of the most recent one, so "when was T123 last
+-- seen" and "not seen in N days" are index lookups instead of scans of
+-- the whole sighting history. Kept current by triggers on Sighting_Details;
+-- Sighting/Ranger deletes cascade without firing those, so they (and
+-- Sighting edits) refresh the affected animals themselves.
+
+CREATE TABLE Animal_Last_Seen (
+    Animal_ID INT PRIMARY KEY,
+    sightings_count INT NOT NULL DEFAULT 0,
+    last_sighting_ID INT NULL,
+    last_seen_date DATE NULL,           -- NULL = never seen
+    last_seen_time TIME NULL,
+    last_location VARCHAR(100) NULL,
+    last_ranger_ID INT NULL,
+    INDEX idx_last_seen_date (last_seen_date),
+    INDEX idx_last_seen_sighting (last_sighting_ID)
+);
+
+CREATE INDEX idx_animal_tracking ON Animal (Tracking_ID);
+
+DELIMITER $$
+
+-- Recomputes one animal from its history. p_skip_sighting / p_skip_ranger
+-- leave out rows that are about to be removed by a cascade (NULL = none).
+CREATE PROCEDURE RefreshLastSeen(IN p_Animal_ID INT, IN p_skip_sighting INT, IN p_skip_ranger INT)
+BEGIN
+    DECLARE v_count INT DEFAULT 0;
+    DECLARE v_sighting INT DEFAULT NULL;
+    DECLARE v_date DATE DEFAULT NULL;
+    DECLARE v_time TIME DEFAULT NULL;
+    DECLARE v_location VARCHAR(100) DEFAULT NULL;
+    DECLARE v_ranger INT DEFAULT NULL;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND BEGIN END;
+
+    SELECT COUNT(DISTINCT sd.sighting_ID) INTO v_count
+    FROM Sighting_Details sd
+    JOIN Sighting s ON sd.sighting_ID = s.Sighting_ID
+    WHERE sd.Animal_ID = p_Animal_ID
+      AND (p_skip_sighting IS NULL OR sd.sighting_ID <> p_skip_sighting)
+      AND (p_skip_ranger IS NULL OR (sd.Ranger_ID <> p_skip_ranger AND NOT (s.Ranger_ID <=> p_skip_ranger)));
+
+    SELECT sd.sighting_ID, s.Sighting_Date, s.Sighting_Time, s.Location, sd.Ranger_ID
+    INTO v_sighting, v_date, v_time, v_location, v_ranger
+    FROM Sighting_Details sd
+    JOIN Sighting s ON sd.sighting_ID = s.Sighting_ID
+    WHERE sd.Animal_ID = p_Animal_ID
+      AND (p_skip_sighting IS NULL OR sd.sighting_ID <> p_skip_sighting)
+      AND (p_skip_ranger IS NULL OR (sd.Ranger_ID <> p_skip_ranger AND NOT (s.Ranger_ID <=> p_skip_ranger)))
+    ORDER BY s.Sighting_Date DESC, s.Sighting_Time DESC, sd.sighting_ID DESC, sd.Ranger_ID DESC
+    LIMIT 1;
+
+    INSERT INTO Animal_Last_Seen (Animal_ID, sightings_count, last_sighting_ID, last_seen_date,
+                                  last_seen_time, last_location, last_ranger_ID)
+    VALUES (p_Animal_ID, v_count, v_sighting, v_date, v_time, v_location, v_ranger)
+    ON DUPLICATE KEY UPDATE
+        sightings_count = VALUES(sightings_count),
+        last_sighting_ID = VALUES(last_sighting_ID),
+        last_seen_date = VALUES(last_seen_date),
+        last_seen_time = VALUES(last_seen_time),
+        last_location = VALUES(last_location),
+        last_ranger_ID = VALUES(last_ranger_ID);
+END$$
+
+-- Refreshes every animal in a sighting or seen by a ranger.
+-- p_excluding = TRUE leaves that sighting/ranger's rows out (BEFORE DELETE).
+CREATE PROCEDURE RefreshLastSeenFor(IN p_Sighting_ID INT, IN p_Ranger_ID INT, IN p_excluding BOOLEAN)
+BEGIN
+    DECLARE v_done BOOLEAN DEFAULT FALSE;
+    DECLARE v_animal INT;
+    DECLARE cur_animals CURSOR FOR
+        SELECT DISTINCT sd.Animal_ID
+        FROM Sighting_Details sd
+        JOIN Sighting s ON sd.sighting_ID = s.Sighting_ID
+        WHERE sd.sighting_ID = p_Sighting_ID OR sd.Ranger_ID = p_Ranger_ID OR s.Ranger_ID = p_Ranger_ID;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_done = TRUE;
+
+    OPEN cur_animals;
+    animal_loop: LOOP
+        FETCH cur_animals INTO v_animal;
+        IF v_done THEN
+            LEAVE animal_loop;
+        END IF;
+        IF p_excluding THEN
+            CALL RefreshLastSeen(v_animal, p_Sighting_ID, p_Ranger_ID);
+        ELSE
+            CALL RefreshLastSeen(v_animal, NULL, NULL);
+        END IF;
+    END LOOP;
+    CLOSE cur_animals;
+END$$
+
+CREATE TRIGGER trg_last_seen_ins AFTER INSERT ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    DECLARE v_date DATE;
+    DECLARE v_time TIME;
+    DECLARE v_location VARCHAR(100);
+    DECLARE v_last_date DATE DEFAULT NULL;
+    DECLARE v_last_time TIME DEFAULT NULL;
+    DECLARE v_last_sighting INT DEFAULT NULL;
+    DECLARE v_new_sighting BOOLEAN;
+    DECLARE v_newer BOOLEAN;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND BEGIN END;
+
+    SELECT Sighting_Date, Sighting_Time, Location INTO v_date, v_time, v_location
+    FROM Sighting WHERE Sighting_ID = NEW.sighting_ID;
+
+    SELECT last_seen_date, last_seen_time, last_sighting_ID INTO v_last_date, v_last_time, v_last_sighting
+    FROM Animal_Last_Seen WHERE Animal_ID = NEW.Animal_ID;
+
+    -- Another ranger already logged this animal in this sighting?
+    SET v_new_sighting = NOT EXISTS (
+        SELECT 1 FROM Sighting_Details
+        WHERE sighting_ID = NEW.sighting_ID AND Animal_ID = NEW.Animal_ID AND Ranger_ID <> NEW.Ranger_ID);
+
+    SET v_newer = v_last_sighting IS NULL
+        OR (COALESCE(v_date, '1000-01-01'), COALESCE(v_time, '00:00:00'), NEW.sighting_ID)
+           >= (COALESCE(v_last_date, '1000-01-01'), COALESCE(v_last_time, '00:00:00'), v_last_sighting);
+
+    INSERT INTO Animal_Last_Seen (Animal_ID, sightings_count, last_sighting_ID, last_seen_date,
+                                  last_seen_time, last_location, last_ranger_ID)
+    VALUES (NEW.Animal_ID, 1, NEW.sighting_ID, v_date, v_time, v_location, NEW.Ranger_ID)
+    ON DUPLICATE KEY UPDATE
+        sightings_count = sightings_count + IF(v_new_sighting, 1, 0),
+        last_sighting_ID = IF(v_newer, VALUES(last_sighting_ID), last_sighting_ID),
+        last_seen_date = IF(v_newer, VALUES(last_seen_date), last_seen_date),
+        last_seen_time = IF(v_newer, VALUES(last_seen_time), last_seen_time),
+        last_location = IF(v_newer, VALUES(last_location), last_location),
+        last_ranger_ID = IF(v_newer, VALUES(last_ranger_ID), last_ranger_ID);
+END$$
+
+CREATE TRIGGER trg_last_seen_del AFTER DELETE ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    IF EXISTS (SELECT 1 FROM Animal_Last_Seen
+               WHERE Animal_ID = OLD.Animal_ID AND last_sighting_ID = OLD.sighting_ID) THEN
+        -- The latest sighting changed: recompute from the remaining history
+        CALL RefreshLastSeen(OLD.Animal_ID, NULL, NULL);
+    ELSEIF NOT EXISTS (SELECT 1 FROM Sighting_Details
+                       WHERE sighting_ID = OLD.sighting_ID AND Animal_ID = OLD.Animal_ID) THEN
+        UPDATE Animal_Last_Seen SET sightings_count = sightings_count - 1
+        WHERE Animal_ID = OLD.Animal_ID;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_last_seen_upd AFTER UPDATE ON Sighting_Details
+FOR EACH ROW
+BEGIN
+    CALL RefreshLastSeen(OLD.Animal_ID, NULL, NULL);
+    IF NOT (NEW.Animal_ID <=> OLD.Animal_ID) THEN
+        CALL RefreshLastSeen(NEW.Animal_ID, NULL, NULL);
+    END IF;
+END$$
+
+-- Sighting date/time/location edits move the "latest" sighting
+CREATE TRIGGER trg_last_seen_sighting_upd AFTER UPDATE ON Sighting
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Sighting_Date <=> NEW.Sighting_Date AND OLD.Sighting_Time <=> NEW.Sighting_Time
+            AND OLD.Location <=> NEW.Location) THEN
+        CALL RefreshLastSeenFor(NEW.Sighting_ID, NULL, FALSE);
+    END IF;
+END$$
+
+-- Cascaded deletes (Sighting -> Sighting_Details, Ranger -> both)
+CREATE TRIGGER trg_last_seen_sighting_del BEFORE DELETE ON Sighting
+FOR EACH ROW
+BEGIN
+    CALL RefreshLastSeenFor(OLD.Sighting_ID, NULL, TRUE);
+END$$
+
+CREATE TRIGGER trg_last_seen_ranger_del BEFORE DELETE ON Ranger
+FOR EACH ROW
+BEGIN
+    CALL RefreshLastSeenFor(NULL, OLD.Ranger_ID, TRUE);
+END$$
+
+-- New animals start as "never seen" so the alert query finds them
+CREATE TRIGGER trg_last_seen_animal_ins AFTER INSERT ON Animal
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO Animal_Last_Seen (Animal_ID) VALUES (NEW.Animal_ID);
+END$$
+
+CREATE TRIGGER trg_last_seen_animal_del AFTER DELETE ON Animal
+FOR EACH ROW
+BEGIN
+    -- Animal_ID can repeat across species; keep the row while any remain
+    IF NOT EXISTS (SELECT 1 FROM Animal WHERE Animal_ID = OLD.Animal_ID) THEN
+        DELETE FROM Animal_Last_Seen WHERE Animal_ID = OLD.Animal_ID;
+    END IF;
+END$$
+DELIMITER ;
+
+-- Backfill: latest sighting per animal, then animals never seen
+INSERT INTO Animal_Last_Seen (Animal_ID, sightings_count, last_sighting_ID, last_seen_date,
+                              last_seen_time, last_location, last_ranger_ID)
+SELECT r.Animal_ID, c.sightings, r.sighting_ID, r.Sighting_Date, r.Sighting_Time, r.Location, r.Ranger_ID
+FROM (
+    SELECT sd.Animal_ID, sd.sighting_ID, s.Sighting_Date, s.Sighting_Time, s.Location, sd.Ranger_ID,
+           ROW_NUMBER() OVER (PARTITION BY sd.Animal_ID
+                              ORDER BY s.Sighting_Date DESC, s.Sighting_Time DESC,
+                                       sd.sighting_ID DESC, sd.Ranger_ID DESC) AS rn
+    FROM Sighting_Details sd
+    JOIN Sighting s ON sd.sighting_ID = s.Sighting_ID
+) r
+JOIN (
+    SELECT Animal_ID, COUNT(DISTINCT sighting_ID) AS sightings
+    FROM Sighting_Details GROUP BY Animal_ID
+) c ON r.Animal_ID = c.Animal_ID
+WHERE r.rn = 1;
+
+INSERT IGNORE INTO Animal_Last_Seen (Animal_ID)
+SELECT DISTINCT Animal_ID FROM Animal;
+
+
+-- -------------------------------------------------------
+-- 15. CODED DOMAINS (Status / Level Columns as ENUM)
+-- -------------------------------------------------------
+-- The six status/level columns only ever hold a handful of labels. As ENUM
+-- each value is stored as a 1-byte code, GROUP BY / ORDER BY compare codes
+-- instead of strings, and (in strict mode) a misspelled label is rejected
+-- instead of creating a new group. Columns keep their names and still read
+-- and write as text, so queries, procedures and triggers are unchanged.
+-- Level columns are declared in severity order, so ORDER BY sorts by it.
+-- The labels are mirrored in domains.py.
+
+-- Values that do not fit a domain are kept here before being cleared
+CREATE TABLE Domain_Migration_Rejects (
+    table_name VARCHAR(64) NOT NULL,
+    column_name VARCHAR(64) NOT NULL,
+    row_key VARCHAR(100) NOT NULL,
+    old_value VARCHAR(100),
+    migrated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 1) Normalize: strip blanks, empty -> NULL. Case is folded by the ENUM
+--    conversion itself (the collation is case-insensitive).
+UPDATE Species SET conservation_status = NULLIF(TRIM(conservation_status), '')
+WHERE BINARY conservation_status <> BINARY TRIM(conservation_status) OR TRIM(conservation_status) = '';
+UPDATE Ranger SET raankOfRanger = NULLIF(TRIM(raankOfRanger), '')
+WHERE BINARY raankOfRanger <> BINARY TRIM(raankOfRanger) OR TRIM(raankOfRanger) = '';
+UPDATE Animal SET Gender = NULLIF(TRIM(Gender), '')
+WHERE BINARY Gender <> BINARY TRIM(Gender) OR TRIM(Gender) = '';
+UPDATE Animal SET Health_status = NULLIF(TRIM(Health_status), '')
+WHERE BINARY Health_status <> BINARY TRIM(Health_status) OR TRIM(Health_status) = '';
+UPDATE Threat_Report SET Threat_Level = NULLIF(TRIM(Threat_Level), '')
+WHERE BINARY Threat_Level <> BINARY TRIM(Threat_Level) OR TRIM(Threat_Level) = '';
+UPDATE Equipment SET StatusEqui = NULLIF(TRIM(StatusEqui), '')
+WHERE BINARY StatusEqui <> BINARY TRIM(StatusEqui) OR TRIM(StatusEqui) = '';
+
+-- 2) Set aside and clear anything still outside its domain
+INSERT INTO Domain_Migration_Rejects (table_name, column_name, row_key, old_value)
+SELECT 'Species', 'conservation_status', CONCAT('Sp_ID=', Sp_ID), conservation_status FROM Species
+WHERE conservation_status NOT IN ('Least Concern', 'Near Threatened', 'Vulnerable', 'Endangered', 'Critically Endangered')
+UNION ALL
+SELECT 'Ranger', 'raankOfRanger', CONCAT('Ranger_ID=', Ranger_ID), raankOfRanger FROM Ranger
+WHERE raankOfRanger NOT IN ('Junior Ranger', 'Field Ranger', 'Senior Ranger', 'Wildlife Officer')
+UNION ALL
+SELECT 'Animal', 'Gender', CONCAT('Animal_ID=', Animal_ID, ',Sp_ID=', Sp_ID), Gender FROM Animal
+WHERE Gender NOT IN ('Male', 'Female')
+UNION ALL
+SELECT 'Animal', 'Health_status', CONCAT('Animal_ID=', Animal_ID, ',Sp_ID=', Sp_ID), Health_status FROM Animal
+WHERE Health_status NOT IN ('Healthy', 'Sick', 'Injured', 'Under Treatment')
+UNION ALL
+SELECT 'Threat_Report', 'Threat_Level', CONCAT('Report_ID=', Report_ID), Threat_Level FROM Threat_Report
+WHERE Threat_Level NOT IN ('Low', 'Medium', 'High')
+UNION ALL
+SELECT 'Equipment', 'StatusEqui', CONCAT('Equipment_ID=', Equipment_ID), StatusEqui FROM Equipment
+WHERE StatusEqui NOT IN ('Available', 'In Use', 'Maintenance');
+
+UPDATE Species SET conservation_status = NULL
+WHERE conservation_status NOT IN ('Least Concern', 'Near Threatened', 'Vulnerable', 'Endangered', 'Critically Endangered');
+UPDATE Ranger SET raankOfRanger = NULL
+WHERE raankOfRanger NOT IN ('Junior Ranger', 'Field Ranger', 'Senior Ranger', 'Wildlife Officer');
+UPDATE Animal SET Gender = NULL WHERE Gender NOT IN ('Male', 'Female');
+UPDATE Animal SET Health_status = NULL WHERE Health_status NOT IN ('Healthy', 'Sick', 'Injured', 'Under Treatment');
+UPDATE Threat_Report SET Threat_Level = NULL WHERE Threat_Level NOT IN ('Low', 'Medium', 'High');
+UPDATE Equipment SET StatusEqui = NULL WHERE StatusEqui NOT IN ('Available', 'In Use', 'Maintenance');
+
+-- 3) Convert (NULL stays allowed, as before)
+ALTER TABLE Species MODIFY conservation_status
+    ENUM('Least Concern', 'Near Threatened', 'Vulnerable', 'Endangered', 'Critically Endangered') NULL;
+ALTER TABLE Ranger MODIFY raankOfRanger
+    ENUM('Junior Ranger', 'Field Ranger', 'Senior Ranger', 'Wildlife Officer') NULL;
+ALTER TABLE Animal
+    MODIFY Gender ENUM('Male', 'Female') NULL,
+    MODIFY Health_status ENUM('Healthy', 'Sick', 'Injured', 'Under Treatment') NULL;
+ALTER TABLE Threat_Report MODIFY Threat_Level ENUM('Low', 'Medium', 'High') NULL;
+ALTER TABLE Equipment MODIFY StatusEqui ENUM('Available', 'In Use', 'Maintenance') NULL; -- Updated by Triggers
+
+-- Code/label pairs for clients that fetch codes (column + 0) and decode
+-- them themselves. Codes are 1-based; NULL stays NULL.
+CREATE OR REPLACE VIEW Domain_Codes AS
+SELECT 'conservation_status' AS column_name, 1 AS code, 'Least Concern' AS label
+UNION ALL SELECT 'conservation_status', 2, 'Near Threatened'
+UNION ALL SELECT 'conservation_status', 3, 'Vulnerable'
+UNION ALL SELECT 'conservation_status', 4, 'Endangered'
+UNION ALL SELECT 'conservation_status', 5, 'Critically Endangered'
+UNION ALL SELECT 'raankOfRanger', 1, 'Junior Ranger'
+UNION ALL SELECT 'raankOfRanger', 2, 'Field Ranger'
+UNION ALL SELECT 'raankOfRanger', 3, 'Senior Ranger'
+UNION ALL SELECT 'raankOfRanger', 4, 'Wildlife Officer'
+UNION ALL SELECT 'Gender', 1, 'Male'
+UNION ALL SELECT 'Gender', 2, 'Female'
+UNION ALL SELECT 'Health_status', 1, 'Healthy'
+UNION ALL SELECT 'Health_status', 2, 'Sick'
+UNION ALL SELECT 'Health_status', 3, 'Injured'
+UNION ALL SELECT 'Health_status', 4, 'Under Treatment'
+UNION ALL SELECT 'Threat_Level', 1, 'Low'
+UNION ALL SELECT 'Threat_Level', 2, 'Medium'
+UNION ALL SELECT 'Threat_Level', 3, 'High'
+UNION ALL SELECT 'StatusEqui', 1, 'Available'
+UNION ALL SELECT 'StatusEqui', 2, 'In Use'
+UNION ALL SELECT 'StatusEqui', 3, 'Maintenance';
+
+
+-- -------------------------------------------------------
+-- 16. NAME CHANGES IN THE CHANGE LOG (Alt_Names)
+-- -------------------------------------------------------
+-- The species name resolver (name_resolver.py) keeps every common,
+-- scientific and alternative name in memory and refreshes from change_log.
+-- Species is already logged (section 13); this adds Alt_Names.
+-- Alternative names removed by a Species delete cascade need no rows of
+-- their own: the Species 'D' row already makes the resolver re-read
+-- that Sp_ID.
+
+DELIMITER $$
+
+CREATE TRIGGER trg_alt_names_cdc_ins AFTER INSERT ON Alt_Names
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Alt_Names', 'I', JSON_OBJECT('Sp_ID', NEW.Sp_ID, 'Alt_Name', NEW.Alt_Name));
+END$$
+
+CREATE TRIGGER trg_alt_names_cdc_upd AFTER UPDATE ON Alt_Names
+FOR EACH ROW
+BEGIN
+    CALL LogUpdate('Alt_Names', JSON_OBJECT('Sp_ID', OLD.Sp_ID, 'Alt_Name', OLD.Alt_Name),
+                   JSON_OBJECT('Sp_ID', NEW.Sp_ID, 'Alt_Name', NEW.Alt_Name));
+END$$
+
+CREATE TRIGGER trg_alt_names_cdc_del AFTER DELETE ON Alt_Names
+FOR EACH ROW
+BEGIN
+    CALL LogChange('Alt_Names', 'D', JSON_OBJECT('Sp_ID', OLD.Sp_ID, 'Alt_Name', OLD.Alt_Name));
+END$$
+
+DELIMITER ;
+
+
+-- -------------------------------------------------------
+-- 17. DUPLICATE SIGHTINGS (sighting_dedup.py)
+-- -------------------------------------------------------
+-- Detail rows judged to repeat an earlier sighting of the same animal at
+-- the same place within a few minutes, with the sighting they duplicate.
+-- Written by "sighting_dedup.py --mode flag"; "--mode merge" folds them
+-- into the kept sighting instead.
+
+CREATE TABLE Sighting_Duplicate (
+    sighting_ID INT NOT NULL,
+    Animal_ID INT NOT NULL,
+    Ranger_ID INT NOT NULL,
+    keep_sighting_ID INT NOT NULL,
+    detected_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (sighting_ID, Animal_ID, Ranger_ID),
+    INDEX idx_duplicate_keep (keep_sighting_ID),
+    FOREIGN KEY (sighting_ID) REFERENCES Sighting (Sighting_ID) ON DELETE CASCADE,
+    FOREIGN KEY (keep_sighting_ID) REFERENCES Sighting (Sighting_ID) ON DELETE CASCADE
+);
+
+-- Date-window scans of the dedup engine
+CREATE INDEX idx_sighting_date ON Sighting (Sighting_Date);
+
+
+-- -------------------------------------------------------
+-- 18. ANIMAL HEALTH HISTORY (Temporal Status Table)
+-- -------------------------------------------------------
+-- Animal.Health_status only holds the current value; UpdateAnimalHealth
+-- and the update forms overwrite it. Triggers on Animal keep every status
+-- as a period [valid_from, valid_to) here (valid_to NULL = current), so
+-- outbreak analysis can ask what the status was on any date
+-- (health_history.py) without snapshots.
+-- valid_from is unique per animal (a change within the same microsecond
+-- is moved 1us later), so the primary key orders each animal's periods
+-- and "status as of D" is one index seek per animal. The history starts
+-- with the statuses current when this section is run.
+
+CREATE TABLE Animal_Health_History (
+    Animal_ID INT NOT NULL,
+    Sp_ID INT NOT NULL,
+    valid_from DATETIME(6) NOT NULL,
+    valid_to DATETIME(6) NULL,          -- NULL = still current
+    status ENUM('Healthy', 'Sick', 'Injured', 'Under Treatment') NULL,
+    prev_status ENUM('Healthy', 'Sick', 'Injured', 'Under Treatment') NULL,
+    PRIMARY KEY (Animal_ID, Sp_ID, valid_from),
+    INDEX idx_health_changes (valid_from, status, prev_status),   -- covers daily counts
+    INDEX idx_health_status_from (status, valid_from)
+);
+
+DELIMITER $$
+
+-- Ends the animal's open period at p_at (none open = no-op)
+CREATE PROCEDURE CloseHealthPeriod(IN p_Animal_ID INT, IN p_Sp_ID INT, IN p_at DATETIME(6))
+BEGIN
+    UPDATE Animal_Health_History
+    SET valid_to = p_at
+    WHERE Animal_ID = p_Animal_ID AND Sp_ID = p_Sp_ID AND valid_to IS NULL
+    ORDER BY valid_from DESC
+    LIMIT 1;
+END$$
+
+-- Closes the open period and starts a new one with p_status
+CREATE PROCEDURE RecordHealthStatus(IN p_Animal_ID INT, IN p_Sp_ID INT,
+                                    IN p_prev VARCHAR(50), IN p_status VARCHAR(50))
+BEGIN
+    DECLARE v_from DATETIME(6) DEFAULT NOW(6);
+    DECLARE v_last DATETIME(6) DEFAULT NULL;
+
+    SELECT MAX(valid_from) INTO v_last
+    FROM Animal_Health_History
+    WHERE Animal_ID = p_Animal_ID AND Sp_ID = p_Sp_ID;
+    IF v_last IS NOT NULL AND v_from <= v_last THEN
+        SET v_from = v_last + INTERVAL 1 MICROSECOND;
+    END IF;
+
+    CALL CloseHealthPeriod(p_Animal_ID, p_Sp_ID, v_from);
+    INSERT INTO Animal_Health_History (Animal_ID, Sp_ID, valid_from, status, prev_status)
+    VALUES (p_Animal_ID, p_Sp_ID, v_from, p_status, p_prev);
+END$$
+
+CREATE TRIGGER trg_health_history_ins AFTER INSERT ON Animal
+FOR EACH ROW
+BEGIN
+    CALL RecordHealthStatus(NEW.Animal_ID, NEW.Sp_ID, NULL, NEW.Health_status);
+END$$
+
+-- Only status changes (or a re-keyed animal) are recorded
+CREATE TRIGGER trg_health_history_upd AFTER UPDATE ON Animal
+FOR EACH ROW
+BEGIN
+    IF OLD.Animal_ID <> NEW.Animal_ID OR OLD.Sp_ID <> NEW.Sp_ID THEN
+        CALL CloseHealthPeriod(OLD.Animal_ID, OLD.Sp_ID, NOW(6));
+        CALL RecordHealthStatus(NEW.Animal_ID, NEW.Sp_ID, OLD.Health_status, NEW.Health_status);
+    ELSEIF NOT (OLD.Health_status <=> NEW.Health_status) THEN
+        CALL RecordHealthStatus(NEW.Animal_ID, NEW.Sp_ID, OLD.Health_status, NEW.Health_status);
+    END IF;
+END$$
+
+-- Deleted animals keep their history; the last period just ends
+CREATE TRIGGER trg_health_history_del AFTER DELETE ON Animal
+FOR EACH ROW
+BEGIN
+    CALL CloseHealthPeriod(OLD.Animal_ID, OLD.Sp_ID, NOW(6));
+END$$
+
+DELIMITER ;
+
+-- Backfill: one open period per existing animal
+INSERT INTO Animal_Health_History (Animal_ID, Sp_ID, valid_from, status)
+SELECT Animal_ID, Sp_ID, NOW(6), Health_status FROM Animal;
+
+
+-- -------------------------------------------------------
+-- 19. TABLE VERSION COUNTERS FOR CACHED FRAMES
+-- -------------------------------------------------------
+-- The app's DataFrame cache (cached_frame in appp.py) sees changes to
+-- CDC tables through change_log. The other tables its pages read get
+-- Table_Version counters (section 7), so a change made anywhere,
+-- including outside the app, invalidates the cached frames at once.
+
+INSERT INTO Table_Version (table_name) VALUES ('Habitat'), ('Ranger'), ('Assigned_To'), ('Organization');
+
+DELIMITER $$
+
+CREATE TRIGGER trg_habitat_frame_version_ins AFTER INSERT ON Habitat
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Habitat';
+END$$
+
+CREATE TRIGGER trg_habitat_frame_version_upd AFTER UPDATE ON Habitat
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Habitat';
+END$$
+
+CREATE TRIGGER trg_habitat_frame_version_del AFTER DELETE ON Habitat
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Habitat';
+END$$
+
+CREATE TRIGGER trg_ranger_frame_version_ins AFTER INSERT ON Ranger
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Ranger';
+END$$
+
+CREATE TRIGGER trg_ranger_frame_version_upd AFTER UPDATE ON Ranger
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Ranger';
+END$$
+
+CREATE TRIGGER trg_ranger_frame_version_del AFTER DELETE ON Ranger
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Ranger';
+END$$
+
+CREATE TRIGGER trg_assigned_to_frame_version_ins AFTER INSERT ON Assigned_To
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Assigned_To';
+END$$
+
+CREATE TRIGGER trg_assigned_to_frame_version_upd AFTER UPDATE ON Assigned_To
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Assigned_To';
+END$$
+
+CREATE TRIGGER trg_assigned_to_frame_version_del AFTER DELETE ON Assigned_To
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Assigned_To';
+END$$
+
+CREATE TRIGGER trg_organization_frame_version_ins AFTER INSERT ON Organization
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Organization';
+END$$
+
+CREATE TRIGGER trg_organization_frame_version_upd AFTER UPDATE ON Organization
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Organization';
+END$$
+
+CREATE TRIGGER trg_organization_frame_version_del AFTER DELETE ON Organization
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Organization';
+END$$
+
+-- Ranger and Habitat deletes cascade into Assigned_To
+CREATE TRIGGER trg_ranger_assigned_version_del AFTER DELETE ON Ranger
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Assigned_To';
+END$$
+
+CREATE TRIGGER trg_habitat_assigned_version_del AFTER DELETE ON Habitat
+FOR EACH ROW
+BEGIN
+    UPDATE Table_Version SET version = version + 1 WHERE table_name = 'Assigned_To';
+END$$
+DELIMITER ;
+
+
 -- user privileges
 
 CREATE USER 'tanisha'@'localhost' IDENTIFIED BY 'tanisha';
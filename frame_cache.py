@@ -0,0 +1,139 @@
+# ==========================================================
+# DATAFRAME MEMO CACHE
+# Keeps built DataFrames between Streamlit reruns so a widget
+# click or tab switch does not re-query and rebuild them.
+#
+# - One process-wide cache with a total memory budget
+#   (FRAME_CACHE_BUDGET_MB, default 256).
+# - Entries carry a version token; a different token (the data
+#   changed) or an entry older than max_age means a rebuild;
+#   callers can pass a shorter max_age per lookup.
+# - Frames are deduplicated by content hash: sessions that build
+#   the same frame share one copy, counted once in the budget.
+# - Over budget, entries are evicted from the least recently used
+#   end, largest first among the oldest few.
+#
+# Cached frames are shared: treat them as read-only.
+# ==========================================================
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+DEFAULT_BUDGET_MB = float(os.environ.get("FRAME_CACHE_BUDGET_MB", "256"))
+DEFAULT_MAX_AGE = 300          # seconds; catches changes no version token sees
+UNTRACKED_MAX_AGE = 30         # seconds; for frames reading a table no version token covers
+EVICTION_WINDOW = 4            # oldest entries considered when picking a victim
+MAX_ENTRY_FRACTION = 0.5       # frames bigger than this share of the budget are not kept
+
+_Entry = namedtuple("_Entry", ["version", "digest", "stored_at"])
+
+
+def frame_size(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# --- Content hash (values, index, column names and dtypes) ---
+def frame_digest(df):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(zip(map(str, df.columns), map(str, df.dtypes)))).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts): fall back to the text form
+        h.update(df.to_csv(index=True).encode())
+    return h.hexdigest()
+
+
+class FrameCache:
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, max_age=DEFAULT_MAX_AGE):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.max_age = max_age
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared = 0                 # stores that reused an identical frame
+        self._entries = OrderedDict()   # key -> _Entry, least recently used first
+        self._frames = {}               # digest -> [frame, size, refs]
+        self._lock = threading.Lock()
+
+    # --- Cached frame for key, or build(), store and return it ---
+    # build() may return None (e.g. the query failed): nothing is stored.
+    # max_age overrides the cache-wide limit for this lookup.
+    def get(self, key, version, build, max_age=None):
+        limit = self.max_age if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version \
+                    and time.monotonic() - entry.stored_at < limit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._frames[entry.digest][0]
+            self.misses += 1
+        frame = build()
+        return frame if frame is None else self.put(key, version, frame)
+
+    def put(self, key, version, frame):
+        size = frame_size(frame)
+        digest = frame_digest(frame)
+        with self._lock:
+            self._drop(key)
+            if size > self.budget * MAX_ENTRY_FRACTION:
+                return frame
+            slot = self._frames.get(digest)
+            if slot is not None:
+                slot[2] += 1
+                self.shared += 1
+                frame = slot[0]
+            else:
+                self._frames[digest] = [frame, size, 1]
+                self.used += size
+            self._entries[key] = _Entry(version, digest, time.monotonic())
+            self._evict()
+        return frame
+
+    # --- Drop entries whose key starts with prefix (a tuple), or all ---
+    def invalidate(self, prefix=()):
+        with self._lock:
+            for key in [k for k in self._entries if k[:len(prefix)] == prefix]:
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "frames": len(self._frames),
+                "used_mb": self.used / (1024 * 1024),
+                "budget_mb": self.budget / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "shared": self.shared,
+            }
+
+    # Caller holds the lock
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        slot = self._frames[entry.digest]
+        slot[2] -= 1
+        if slot[2] == 0:
+            del self._frames[entry.digest]
+            self.used -= slot[1]
+
+    def _evict(self):
+        while self.used > self.budget and self._entries:
+            oldest = []
+            for key, entry in self._entries.items():
+                oldest.append((self._frames[entry.digest][1], key))
+                if len(oldest) == EVICTION_WINDOW:
+                    break
+            self._drop(max(oldest, key=lambda item: item[0])[1])
+            self.evictions += 1
@@ -0,0 +1,153 @@
+# ==========================================================
+# ANIMAL HEALTH HISTORY
+# Reads the trigger-maintained Animal_Health_History table (section
+# 18 of final_project.sql): one row per health status period,
+# [valid_from, valid_to), with the status it replaced.
+#
+#     status_counts_as_of(conn, date(2024, 3, 1))   # animals per status that day
+#     status_as_of(conn, date(2024, 3, 1), offset=1000)   # one page of animals
+#     transitions(conn, start, end, status="Sick")
+#     daily_transitions(conn, start, end)        # outbreak curve
+#
+# Every query is a range scan on the primary key or one of the two
+# secondary indexes, so cost follows the rows returned, not the
+# size of the history.
+# ==========================================================
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+
+DEFAULT_LIMIT = 1000
+
+_NAMES = """
+    LEFT JOIN Animal a ON a.Animal_ID = h.Animal_ID AND a.Sp_ID = h.Sp_ID
+    LEFT JOIN Species s ON s.Sp_ID = h.Sp_ID
+"""
+
+
+def _frame(conn, query, params):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return pd.DataFrame(rows)
+
+
+# A bare date means the end of that day
+def _instant(when):
+    if isinstance(when, datetime):
+        return when
+    return datetime.combine(when, time.max)
+
+
+# Half-open [start, end) bounds; a bare end date includes that day
+def _bounds(start, end):
+    start = start if isinstance(start, datetime) else datetime.combine(start, time.min)
+    end = end if isinstance(end, datetime) else datetime.combine(end + timedelta(days=1), time.min)
+    return start, end
+
+
+# --- Period current at a point in time, per animal: (FROM clause, params) ---
+# params end with the instant for the caller's valid_to test.
+# The derived table is a loose index scan of the primary key: one seek
+# per animal for its last period starting by then. Animals deleted
+# before that time (period already closed) are left out.
+def _as_of(when, sp_id=None):
+    at = _instant(when)
+    where, params = "", [at]
+    if sp_id is not None:
+        where, params = " AND Sp_ID = %s", [at, sp_id]
+    return f"""
+        FROM (
+            SELECT Animal_ID, Sp_ID, MAX(valid_from) AS valid_from
+            FROM Animal_Health_History
+            WHERE valid_from <= %s{where}
+            GROUP BY Animal_ID, Sp_ID
+        ) latest
+        JOIN Animal_Health_History h
+          ON h.Animal_ID = latest.Animal_ID AND h.Sp_ID = latest.Sp_ID AND h.valid_from = latest.valid_from
+    """, (*params, at)
+
+
+# --- Number of animals in each status at a point in time ---
+def status_counts_as_of(conn, when, sp_id=None):
+    source, params = _as_of(when, sp_id)
+    return _frame(conn, f"""
+        SELECT h.status, COUNT(*) AS animals
+        {source}
+        WHERE h.valid_to IS NULL OR h.valid_to > %s
+        GROUP BY h.status
+        ORDER BY animals DESC
+    """, params)
+
+
+# --- Status of each animal at a point in time, one page at a time ---
+# Ordered by animal; animals deleted since keep their status but have
+# no Tracking_ID.
+def status_as_of(conn, when, sp_id=None, limit=DEFAULT_LIMIT, offset=0):
+    source, params = _as_of(when, sp_id)
+    return _frame(conn, f"""
+        SELECT h.Animal_ID, h.Sp_ID, a.Tracking_ID, s.common_name, h.status,
+               h.valid_from AS status_since, h.prev_status
+        {source}
+        {_NAMES}
+        WHERE h.valid_to IS NULL OR h.valid_to > %s
+        ORDER BY h.Animal_ID, h.Sp_ID
+        LIMIT %s OFFSET %s
+    """, (*params, limit, offset))
+
+
+# --- Status changes in [start, end), newest first ---
+# status narrows to changes into that status (idx_health_status_from);
+# otherwise idx_health_changes is scanned. Rows without a previous
+# status (new animals, the initial backfill) are left out unless
+# include_new is set.
+def transitions(conn, start, end, status=None, sp_id=None, include_new=False, limit=DEFAULT_LIMIT):
+    start, end = _bounds(start, end)
+    conditions, params = ["h.valid_from >= %s", "h.valid_from < %s"], [start, end]
+    if status is not None:
+        conditions.append("h.status = %s")
+        params.append(status)
+    if sp_id is not None:
+        conditions.append("h.Sp_ID = %s")
+        params.append(sp_id)
+    if not include_new:
+        conditions.append("h.prev_status IS NOT NULL")
+    return _frame(conn, f"""
+        SELECT h.valid_from AS changed_at, h.Animal_ID, h.Sp_ID, a.Tracking_ID, s.common_name,
+               h.prev_status, h.status, h.valid_to
+        FROM Animal_Health_History h
+        {_NAMES}
+        WHERE {' AND '.join(conditions)}
+        ORDER BY h.valid_from DESC
+        LIMIT %s
+    """, (*params, limit))
+
+
+# --- Changes into each status per day (rows: day, columns: status) ---
+# Answered from idx_health_changes alone (covering index).
+def daily_transitions(conn, start, end):
+    start, end = _bounds(start, end)
+    counts = _frame(conn, """
+        SELECT DATE(valid_from) AS day, status, COUNT(*) AS changes
+        FROM Animal_Health_History
+        WHERE valid_from >= %s AND valid_from < %s AND prev_status IS NOT NULL
+        GROUP BY DATE(valid_from), status
+    """, (start, end))
+    if counts.empty:
+        return counts
+    counts["status"] = counts["status"].fillna("Unknown")
+    return counts.pivot(index="day", columns="status", values="changes").fillna(0).astype(int)
+
+
+# --- One animal's periods by tracking ID, newest first ---
+def history_for_tracking(conn, tracking_id, limit=DEFAULT_LIMIT):
+    return _frame(conn, """
+        SELECT h.valid_from, h.valid_to, h.prev_status, h.status,
+               TIMESTAMPDIFF(DAY, h.valid_from, COALESCE(h.valid_to, NOW())) AS days
+        FROM Animal a
+        JOIN Animal_Health_History h ON h.Animal_ID = a.Animal_ID AND h.Sp_ID = a.Sp_ID
+        WHERE a.Tracking_ID = %s
+        ORDER BY h.valid_from DESC
+        LIMIT %s
+    """, (tracking_id.strip(), limit))
@@ -0,0 +1,55 @@
+# ==========================================================
+# ANIMAL LAST SEEN
+# Reads the trigger-maintained Animal_Last_Seen table (section 14
+# of final_project.sql): last sighting date/location/ranger and
+# sighting count per animal, without touching the sighting history.
+# ==========================================================
+from datetime import date, timedelta
+
+import pandas as pd
+
+_SELECT = """
+    SELECT a.Animal_ID, a.Tracking_ID, s.common_name, a.Health_status,
+           als.sightings_count, als.last_seen_date, als.last_seen_time,
+           als.last_location, r.fname AS last_ranger,
+           DATEDIFF(%s, als.last_seen_date) AS days_since_seen
+    FROM Animal_Last_Seen als
+    JOIN Animal a ON a.Animal_ID = als.Animal_ID
+    JOIN Species s ON a.Sp_ID = s.Sp_ID
+    LEFT JOIN Ranger r ON r.Ranger_ID = als.last_ranger_ID
+"""
+
+
+def _frame(conn, query, params):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return pd.DataFrame(rows)
+
+
+# --- One animal by tracking ID (idx_animal_tracking + primary key) ---
+def lookup_tracking(conn, tracking_id, today=None):
+    return _frame(conn, _SELECT + " WHERE a.Tracking_ID = %s",
+                  (today or date.today(), tracking_id.strip()))
+
+
+# --- Animals not seen in the last `days` days (or never) ---
+# Range scan on idx_last_seen_date, oldest first.
+def not_seen_since(conn, days, today=None, limit=500):
+    today = today or date.today()
+    cutoff = today - timedelta(days=days)
+    return _frame(conn, _SELECT + """
+        WHERE als.last_seen_date < %s OR als.last_seen_date IS NULL
+        ORDER BY als.last_seen_date IS NOT NULL, als.last_seen_date
+        LIMIT %s
+    """, (today, cutoff, limit))
+
+
+# --- Most recently seen animals ---
+def recently_seen(conn, limit=50, today=None):
+    return _frame(conn, _SELECT + """
+        WHERE als.last_seen_date IS NOT NULL
+        ORDER BY als.last_seen_date DESC, als.last_seen_time DESC
+        LIMIT %s
+    """, (today or date.today(), limit))
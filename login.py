@@ -2,6 +2,8 @@ import streamlit as st
 import mysql.connector
 from mysql.connector import Error
 
+from shared_store import get_sessions
+
 st.set_page_config(page_title="Login - Wildlife Conservation", page_icon="🌿", layout="centered")
 
 # --- Page styling ---
@@ -41,7 +43,6 @@ with st.form("login_form"):
 if submitted:
     if test_connection(username, password):
         st.session_state.user = username
-        st.session_state.password = password
 
         # Role classification
         if username in ["app_user", "tanisha","bhoomika"]:
@@ -53,6 +54,13 @@ if submitted:
         else:
             st.session_state.role = "Unknown"
 
+        # Shared session record so any app worker can serve this login.
+        # The password is not kept anywhere. The app page hands the
+        # token to the browser as a cookie.
+        st.session_state.session_token = get_sessions().create(
+            {"user": username, "role": st.session_state.role},
+            client=st.context.headers.get("User-Agent", ""))
+
         st.success(f"✅ Logged in as {st.session_state.role}")
         st.switch_page("pages/appp.py")
 
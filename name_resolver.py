@@ -0,0 +1,306 @@
+# ==========================================================
+# SPECIES NAME RESOLVER
+# Maps free-text species names to Sp_ID in memory, across
+# Species.common_name, Species.Scientific_name and Alt_Names:
+#
+#     resolver = NameResolver.from_connection(conn)
+#     resolver.resolve("asian  elephánt")     # exact after normalising
+#     resolver.resolve("Asain Elephant")       # fuzzy (trigram similarity)
+#     resolver.resolve_many(names)             # bulk loaders
+#
+# Names are compared after case folding, accent stripping and
+# punctuation/whitespace collapsing. Misses fall back to trigram
+# similarity over all known names.
+#
+# refresh(conn) replays the change_log rows for Species and
+# Alt_Names (section 16 of final_project.sql) written since the
+# last load and re-reads only the species they touch.
+# ==========================================================
+import math
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+
+from change_feed import ChangeFeed, latest_seq
+
+NAME_TABLES = ("Species", "Alt_Names")
+DEFAULT_MIN_SCORE = 0.45       # trigram similarity (0..1) a fuzzy match must reach
+SUGGEST_MIN_SCORE = 0.2
+REFRESH_BATCH = 1000
+IN_CHUNK = 1000                # Sp_IDs per re-read query
+
+Match = namedtuple("Match", ["Sp_ID", "name", "source", "score", "ambiguous"])
+
+# Priority when several species share a name (lower wins)
+SOURCE_RANK = {"common_name": 0, "Scientific_name": 1, "Alt_Name": 2}
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+# --- Case/diacritic/punctuation-insensitive key ---
+def normalize(name):
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameResolver:
+    def __init__(self, min_score=DEFAULT_MIN_SCORE):
+        self.min_score = min_score
+        self.seq = 0
+        self._names = {}       # Sp_ID -> [(source, name, key)]
+        self._exact = {}       # key -> {Sp_ID: source}
+        self._grams = {}       # trigram -> set of key ids
+        self._key_grams = {}   # key -> its trigram set
+        self._reset_ids()
+        self._lock = threading.RLock()
+        self._feed = ChangeFeed("name_resolver", tables=NAME_TABLES, batch_size=REFRESH_BATCH)
+
+    # Key ids are kept for the life of the index (a dropped key that
+    # comes back gets its old id), so _sizes only ever grows.
+    def _reset_ids(self):
+        self._key_ids = {}     # key -> id
+        self._keys = []        # id -> key
+        self._sizes = np.zeros(1024, dtype=np.int64)   # id -> trigram count
+        self._postings = {}    # trigram -> (ids, sizes, min, max) sorted by size, built on demand
+
+    @classmethod
+    def from_connection(cls, conn, **kwargs):
+        resolver = cls(**kwargs)
+        resolver.load(conn)
+        return resolver
+
+    # ------------------------------------------------------
+    # Building
+    # ------------------------------------------------------
+    # Full (re)load. The log position is read first, so anything
+    # committed during the load is replayed by the next refresh.
+    def load(self, conn):
+        seq = latest_seq(conn)
+        names = self._read(conn)
+        with self._lock:
+            self._names, self._exact, self._grams, self._key_grams = {}, {}, {}, {}
+            self._reset_ids()
+            for sp_id, entries in names.items():
+                self._set_species(sp_id, entries)
+            self.seq = seq
+        return len(self._exact)
+
+    # Names of the given species (all species when sp_ids is None)
+    def _read(self, conn, sp_ids=None):
+        names = {}
+        cursor = conn.cursor()
+        chunks = [None] if sp_ids is None else [sp_ids[i:i + IN_CHUNK] for i in range(0, len(sp_ids), IN_CHUNK)]
+        for chunk in chunks:
+            where, params = "", ()
+            if chunk is not None:
+                where, params = f" WHERE Sp_ID IN ({', '.join(['%s'] * len(chunk))})", tuple(chunk)
+            cursor.execute("SELECT Sp_ID, common_name, Scientific_name FROM Species" + where, params)
+            for sp_id, common, scientific in cursor.fetchall():
+                names.setdefault(sp_id, []).extend([("common_name", common), ("Scientific_name", scientific)])
+            cursor.execute("SELECT Sp_ID, Alt_Name FROM Alt_Names" + where, params)
+            for sp_id, alt in cursor.fetchall():
+                names.setdefault(sp_id, []).append(("Alt_Name", alt))
+        cursor.close()
+        return names
+
+    # --- Replace the names of one species: [(source, name)] ---
+    # Also used to build an index without a database (benchmarks).
+    def set_species(self, sp_id, entries):
+        with self._lock:
+            self._set_species(sp_id, entries)
+
+    # Caller holds the lock
+    def _set_species(self, sp_id, entries):
+        self._drop_species(sp_id)
+        kept = []
+        for source, name in entries:
+            key = normalize(name)
+            if not key:
+                continue
+            kept.append((source, name, key))
+            owners = self._exact.setdefault(key, {})
+            if sp_id not in owners or SOURCE_RANK[source] < SOURCE_RANK[owners[sp_id]]:
+                owners[sp_id] = source
+            if key not in self._key_grams:
+                grams = frozenset(trigrams(key))
+                self._key_grams[key] = grams
+                key_id = self._key_id(key, len(grams))
+                for g in grams:
+                    self._grams.setdefault(g, set()).add(key_id)
+                    self._postings.pop(g, None)
+        if kept:
+            self._names[sp_id] = kept
+
+    def _drop_species(self, sp_id):
+        for _, _, key in self._names.pop(sp_id, []):
+            owners = self._exact.get(key)
+            if owners is None:
+                continue
+            owners.pop(sp_id, None)
+            if not owners:
+                del self._exact[key]
+                key_id = self._key_ids[key]
+                for g in self._key_grams.pop(key):
+                    self._postings.pop(g, None)
+                    postings = self._grams.get(g)
+                    if postings is not None:
+                        postings.discard(key_id)
+                        if not postings:
+                            del self._grams[g]
+
+    def _key_id(self, key, size):
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self._keys)
+            self._keys.append(key)
+            if key_id == len(self._sizes):
+                self._sizes = np.concatenate([self._sizes, np.zeros_like(self._sizes)])
+            self._sizes[key_id] = size
+        return key_id
+
+    # Posting list of a trigram as arrays ordered by candidate size
+    def _posting(self, gram):
+        posting = self._postings.get(gram)
+        if posting is None:
+            ids = self._grams.get(gram)
+            if not ids:
+                return None
+            ids = np.fromiter(ids, dtype=np.int64, count=len(ids))
+            sizes = self._sizes[ids]
+            order = np.argsort(sizes, kind="stable")
+            ids, sizes = ids[order], sizes[order]
+            posting = self._postings[gram] = (ids, sizes, int(sizes[0]), int(sizes[-1]))
+        return posting
+
+    # --- Apply Species/Alt_Names changes logged since the last load ---
+    # Returns the number of species re-read. Falls back to a full
+    # load if the log was pruned past our position.
+    def refresh(self, conn):
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(seq) FROM change_log")
+        oldest = cursor.fetchone()[0]
+        cursor.close()
+        if oldest is not None and oldest > self.seq + 1 and self.seq:
+            return self.load(conn)
+
+        after, touched = self.seq, set()
+        while True:
+            changes, upto = self._feed.poll(conn, after)
+            touched.update(c.pk["Sp_ID"] for c in changes)
+            if upto == after:
+                break
+            after = upto
+        if touched:
+            ids = sorted(touched)
+            names = self._read(conn, ids)
+            with self._lock:
+                for sp_id in ids:
+                    self._set_species(sp_id, names.get(sp_id, []))
+        self.seq = after
+        return len(touched)
+
+    # ------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------
+    def _best(self, key, owners, score):
+        sp_id, source = min(owners.items(), key=lambda item: (SOURCE_RANK[item[1]], item[0]))
+        name = next((n for s, n, k in self._names[sp_id] if k == key), key)
+        return Match(sp_id, name, source, score, len(owners) > 1)
+
+    # --- One name -> Match, or None ---
+    def resolve(self, name, min_score=None, fuzzy=True):
+        key = normalize(name)
+        if not key:
+            return None
+        with self._lock:
+            owners = self._exact.get(key)
+            if owners:
+                return self._best(key, owners, 1.0)
+            if not fuzzy:
+                return None
+            scored = self._scored(key, self.min_score if min_score is None else min_score)
+            if not scored:
+                return None
+            score, best_key = min(scored, key=lambda item: (-item[0], item[1]))
+            return self._best(best_key, self._exact[best_key], round(score, 3))
+
+    # --- (score, key) for every known name with Jaccard trigram similarity >= min_score ---
+    # Jaccard n / (a + b - n) >= t needs n >= t * a, so a match must
+    # contain one of the query's (a - ceil(t * a) + 1) rarest trigrams:
+    # only those posting lists are counted (prefix filtering). It also
+    # needs t * a <= b <= a / t, so each list is first cut to candidates
+    # of that size (length filtering). A candidate is then checked
+    # exactly only if the shared count seen so far, plus every trigram
+    # not counted, could still reach the threshold for its length:
+    # n >= t * (a + b) / (1 + t). Counting runs over arrays of key ids.
+    def _scored(self, key, min_score):
+        grams = trigrams(key)
+        a = len(grams)
+        need = max(1, math.ceil(min_score * a - 1e-9))
+        if need > a:
+            return []
+        shortest = need
+        longest = math.floor(a / min_score + 1e-9) if min_score > 0 else math.inf
+        rare = sorted(grams, key=lambda g: len(self._grams.get(g, ())))[:a - need + 1]
+        unseen = a - len(rare)
+        lists = []
+        for g in rare:
+            posting = self._posting(g)
+            if posting is None:
+                continue
+            ids, sizes, smallest, largest = posting
+            if smallest < shortest or largest > longest:
+                ids = ids[np.searchsorted(sizes, shortest, side="left"):
+                          np.searchsorted(sizes, longest, side="right")]
+            lists.append(ids)
+        if not lists:
+            return []
+        candidates, seen = np.unique(np.concatenate(lists), return_counts=True)
+        b = self._sizes[candidates]
+        candidates = candidates[seen + unseen >= min_score * (a + b) / (1 + min_score) - 1e-9]
+        scored = []
+        for key_id in candidates.tolist():
+            candidate = self._keys[key_id]
+            other = self._key_grams[candidate]
+            b = len(other)
+            n = len(grams & other)
+            score = n / (a + b - n)
+            if score >= min_score:
+                scored.append((score, candidate))
+        return scored
+
+    # --- Many names; repeats (after normalising) are resolved once ---
+    def resolve_many(self, names, min_score=None, fuzzy=True):
+        memo = {}
+        results = []
+        for name in names:
+            key = normalize(name)
+            if key not in memo:
+                memo[key] = self.resolve(key, min_score, fuzzy)
+            results.append(memo[key])
+        return results
+
+    # --- Top candidates for a search box ---
+    def suggest(self, name, limit=5, min_score=SUGGEST_MIN_SCORE):
+        key = normalize(name)
+        if not key:
+            return []
+        with self._lock:
+            scored = sorted(self._scored(key, min_score), key=lambda item: (-item[0], item[1]))
+            return [self._best(c, self._exact[c], round(s, 3)) for s, c in scored[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {"species": len(self._names), "names": len(self._exact),
+                    "trigrams": len(self._grams), "seq": self.seq}
@@ -0,0 +1,80 @@
+# ==========================================================
+# OPTIMISTIC CONCURRENCY FOR UPDATE FORMS
+# Every editable table has a row_version column that a BEFORE UPDATE
+# trigger bumps (section 9 of final_project.sql). A form remembers the
+# version it loaded and writes back with
+#     UPDATE ... SET <changed cols> WHERE <key> AND row_version = %s
+# so a concurrent edit makes the update match 0 rows instead of being
+# silently overwritten. No locks are held while the user is typing.
+# ==========================================================
+from decimal import Decimal, InvalidOperation
+
+VERSION_COLUMN = "row_version"
+
+# Primary key and editable columns per table (also the identifier
+# whitelist: only these names are ever put into the SQL text)
+EDITABLE_TABLES = {
+    "Species": (("Sp_ID",), ("common_name", "Scientific_name", "conservation_status", "Avg_lifespan")),
+    "Habitat": (("Habitat_ID",), ("habitat_type", "climate", "region", "area_size")),
+    "Ranger": (("Ranger_ID",), ("fname", "raankOfRanger", "date_joined", "Phone", "email", "Super_Ranger_ID")),
+    "Animal": (("Animal_ID", "Sp_ID"), ("Tracking_ID", "DOB", "Gender", "Health_status")),
+    "Organization": (("Org_ID",), ("fi_name", "typeOrg", "phone", "email", "contact")),
+    "Equipment": (("Equipment_ID",), ("StatusEqui", "purchase_date", "equip_type", "Org_ID")),
+}
+
+
+# --- Form value vs stored value, compared as the column's type ---
+# DECIMAL columns come back as Decimal while number_input gives a
+# float (Decimal('12.30') != 12.3), so the form value is converted and
+# rounded to the stored scale first. An empty text box equals NULL.
+def same_value(stored, value):
+    if stored is None or value is None:
+        return (stored is None or stored == "") and (value is None or value == "")
+    if isinstance(stored, Decimal) and not isinstance(value, (str, bool)):
+        try:
+            return stored == Decimal(str(value)).quantize(stored)
+        except InvalidOperation:
+            return False
+    return stored == value
+
+
+# --- Only the columns the user actually changed ---
+def changed_columns(original, new_values):
+    return {col: val for col, val in new_values.items() if not same_value(original.get(col), val)}
+
+
+# --- Conditional UPDATE for the changed columns ---
+# Returns (sql, params); the statement affects 0 rows on a conflict.
+def build_conditional_update(table, original, changes):
+    if table not in EDITABLE_TABLES:
+        raise ValueError(f"Table {table} is not editable")
+    key_cols, editable = EDITABLE_TABLES[table]
+    unknown = set(changes) - set(editable)
+    if unknown:
+        raise ValueError(f"Columns not editable on {table}: {', '.join(sorted(unknown))}")
+
+    sets = ", ".join(f"{col}=%s" for col in changes)
+    where = " AND ".join(f"{col}=%s" for col in key_cols)
+    query = f"UPDATE {table} SET {sets} WHERE {where} AND {VERSION_COLUMN}=%s"
+    params = tuple(changes.values()) + tuple(original[c] for c in key_cols) + (original[VERSION_COLUMN],)
+    return query, params
+
+
+# --- Query to re-read the row after a conflict ---
+def build_reload(table, original):
+    key_cols, _ = EDITABLE_TABLES[table]
+    where = " AND ".join(f"{col}=%s" for col in key_cols)
+    return f"SELECT * FROM {table} WHERE {where}", tuple(original[c] for c in key_cols)
+
+
+# --- Side by side view of a conflict: what you wanted vs what is stored now ---
+def conflict_rows(original, changes, latest):
+    rows = []
+    for col, mine in changes.items():
+        rows.append({
+            "column": col,
+            "when you opened it": original.get(col),
+            "your value": mine,
+            "current value": latest.get(col) if latest else None,
+        })
+    return rows
@@ -0,0 +1,52 @@
+# ==========================================================
+# SHARED QUERIES
+# Plain SQL used by the Streamlit pages and the export/report tools.
+# Kept free of Streamlit imports so scripts can reuse it.
+# ==========================================================
+
+# Tables listed on the "View All Tables" page
+TABLES = [
+    "Species", "Alt_Names", "Habitat", "Inhabits", "Ranger",
+    "Assigned_To", "Animal", "Threat_Report", "Organization",
+    "Equipment", "Uses", "Sighting", "Sighting_Details"
+]
+
+# Analytics page reports (title -> SQL)
+ANALYTICS_QUERIES = {
+    "Conservation Status Distribution": """
+        SELECT conservation_status, COUNT(*) as c FROM Species GROUP BY conservation_status
+    """,
+    "Animals by Health Status": """
+        SELECT Health_status, COUNT(*) as c FROM Animal GROUP BY Health_status
+    """,
+    "Threat Reports by Level": """
+        SELECT Threat_Level, COUNT(*) as c FROM Threat_Report GROUP BY Threat_Level
+    """,
+    "Equipment Status Overview": """
+        SELECT StatusEqui, COUNT(*) as c FROM Equipment GROUP BY StatusEqui
+    """,
+    "Species Count by Habitat": """
+        SELECT h.habitat_type, h.region, COUNT(DISTINCT i.Sp_ID) as species_count
+        FROM Habitat h LEFT JOIN Inhabits i ON h.Habitat_ID = i.Habitat_ID
+        GROUP BY h.Habitat_ID, h.habitat_type, h.region
+        ORDER BY species_count DESC
+    """,
+    "Ranger Assignment Summary": """
+        SELECT r.fname, r.raankOfRanger, COUNT(a.Habitat_ID) as habitats_assigned,
+               TIMESTAMPDIFF(YEAR, r.date_joined, CURDATE()) as years_experience
+        FROM Ranger r
+        LEFT JOIN Assigned_To a ON r.Ranger_ID = a.Ranger_ID
+        GROUP BY r.Ranger_ID, r.fname, r.raankOfRanger, r.date_joined
+        ORDER BY years_experience DESC
+    """,
+    "Recent Sightings Summary": """
+        SELECT DATE(s.Sighting_Date) as date,
+               COUNT(DISTINCT s.Sighting_ID) as total_sightings,
+               COUNT(DISTINCT sd.Animal_ID) as animals_spotted
+        FROM Sighting s
+        LEFT JOIN Sighting_Details sd ON s.Sighting_ID = sd.sighting_ID
+        GROUP BY DATE(s.Sighting_Date)
+        ORDER BY date DESC
+        LIMIT 10
+    """,
+}
@@ -0,0 +1,244 @@
+# ==========================================================
+# NIGHTLY HABITAT REPORTS (headless)
+# One HTML (optionally PDF) report per habitat: species and animal
+# health, recent threats, assigned rangers, their recent sightings
+# and the equipment they hold, plus an index page with the
+# Analytics page reports.
+#
+#     python report_cli.py                       # all CPUs, ./reports
+#     python report_cli.py --workers 1 2 4 8     # wall clock per worker count
+#     python report_cli.py --days 7 --pdf        # PDFs need weasyprint
+#
+# Everything is read from MySQL once, in bulk, before rendering;
+# worker processes receive that snapshot once (pool initializer)
+# and never touch the database.
+# ==========================================================
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import pandas as pd
+
+from db import connect
+from queries import ANALYTICS_QUERIES
+
+try:
+    from weasyprint import HTML
+except ImportError:  # PDF output is optional
+    HTML = None
+
+DEFAULT_DAYS = 30
+DEFAULT_OUT_DIR = "reports"
+
+# Bulk pre-fetch: one query per table group for all habitats.
+# %(since)s limits threats and sightings to the report window.
+PREFETCH_QUERIES = {
+    "habitats": """
+        SELECT Habitat_ID, habitat_type, climate, region, area_size FROM Habitat ORDER BY Habitat_ID
+    """,
+    "species": """
+        SELECT i.Habitat_ID, s.Sp_ID, s.common_name, s.Scientific_name, s.conservation_status
+        FROM Inhabits i JOIN Species s ON i.Sp_ID = s.Sp_ID
+    """,
+    "animals": """
+        SELECT Sp_ID, Health_status, COUNT(*) AS animals FROM Animal GROUP BY Sp_ID, Health_status
+    """,
+    "threats": """
+        SELECT tr.Habitat_ID, tr.Report_ID, tr.Report_Date, tr.Threat_Level, r.fname AS reported_by, tr.Description
+        FROM Threat_Report tr LEFT JOIN Ranger r ON tr.Ranger_ID = r.Ranger_ID
+        WHERE tr.Report_Date >= %(since)s
+        ORDER BY tr.Report_Date DESC
+    """,
+    "rangers": """
+        SELECT a.Habitat_ID, r.Ranger_ID, r.fname, r.raankOfRanger, a.Assigned_Date
+        FROM Assigned_To a JOIN Ranger r ON a.Ranger_ID = r.Ranger_ID
+    """,
+    "sightings": """
+        SELECT s.Ranger_ID, s.Sighting_ID, s.Sighting_Date, s.Sighting_Time, s.Location,
+               COUNT(sd.Animal_ID) AS animals_recorded
+        FROM Sighting s LEFT JOIN Sighting_Details sd ON s.Sighting_ID = sd.sighting_ID
+        WHERE s.Sighting_Date >= %(since)s
+        GROUP BY s.Sighting_ID, s.Ranger_ID, s.Sighting_Date, s.Sighting_Time, s.Location
+        ORDER BY s.Sighting_Date DESC
+    """,
+    "equipment": """
+        SELECT u.Ranger_ID, e.Equipment_ID, e.equip_type, e.StatusEqui, u.Date_Issued
+        FROM Uses u JOIN Equipment e ON u.Equipment_ID = e.Equipment_ID
+    """,
+}
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2rem; color: #1B1B1B; }}
+h1 {{ color: #2E7D32; }} h2 {{ color: #388E3C; border-bottom: 1px solid #C8E6C9; }}
+table.data {{ border-collapse: collapse; margin-bottom: 1rem; }}
+table.data th, table.data td {{ padding: 4px 10px; border: 1px solid #DDD; text-align: left; }}
+table.data th {{ background: #E8F5E9; }}
+.meta {{ color: #666; }}
+</style></head>
+<body>
+<h1>{title}</h1>
+<p class="meta">{subtitle}</p>
+{body}
+</body></html>
+"""
+
+
+# --- Pull every table group once (parent process) ---
+def prefetch(conn, since):
+    data = {}
+    cursor = conn.cursor(dictionary=True)
+    for name, query in PREFETCH_QUERIES.items():
+        cursor.execute(query, {"since": since})
+        data[name] = pd.DataFrame(cursor.fetchall())
+    overview = {}
+    for title, query in ANALYTICS_QUERIES.items():
+        cursor.execute(query)
+        overview[title] = pd.DataFrame(cursor.fetchall())
+    cursor.close()
+    return data, overview
+
+
+# ------------------------------------------------------
+# Worker side
+# ------------------------------------------------------
+_SNAPSHOT = {}
+
+
+def _groups(df, key):
+    if df.empty:
+        return {}
+    return {k: g.drop(columns=[key]) for k, g in df.groupby(key)}
+
+
+# Pool initializer: index the snapshot once per worker process
+def _init_worker(data, options):
+    _SNAPSHOT.clear()
+    _SNAPSHOT["habitats"] = data["habitats"].set_index("Habitat_ID", drop=False) if not data["habitats"].empty else data["habitats"]
+    _SNAPSHOT["species"] = _groups(data["species"], "Habitat_ID")
+    _SNAPSHOT["threats"] = _groups(data["threats"], "Habitat_ID")
+    _SNAPSHOT["rangers"] = _groups(data["rangers"], "Habitat_ID")
+    _SNAPSHOT["sightings"] = data["sightings"]
+    _SNAPSHOT["equipment"] = data["equipment"]
+    animals = data["animals"]
+    _SNAPSHOT["health"] = (animals.pivot_table(index="Sp_ID", columns="Health_status", values="animals",
+                                               aggfunc="sum", fill_value=0)
+                           if not animals.empty else pd.DataFrame())
+    _SNAPSHOT["options"] = options
+
+
+def _table(df, empty="None recorded."):
+    if df is None or df.empty:
+        return f"<p>{html.escape(empty)}</p>"
+    return df.to_html(index=False, border=0, classes="data", na_rep="")
+
+
+def _section(title, content):
+    return f"<h2>{html.escape(title)}</h2>\n{content}\n"
+
+
+def render_habitat(habitat_id):
+    options = _SNAPSHOT["options"]
+    habitat = _SNAPSHOT["habitats"].loc[habitat_id]
+    empty = pd.DataFrame()
+
+    species = _SNAPSHOT["species"].get(habitat_id, empty)
+    if not species.empty and not _SNAPSHOT["health"].empty:
+        species = species.join(_SNAPSHOT["health"], on="Sp_ID").fillna(0)
+
+    threats = _SNAPSHOT["threats"].get(habitat_id, empty)
+    threat_levels = (threats.groupby("Threat_Level").size().rename("reports").reset_index()
+                     if not threats.empty else empty)
+
+    rangers = _SNAPSHOT["rangers"].get(habitat_id, empty)
+    ranger_ids = set(rangers["Ranger_ID"]) if not rangers.empty else set()
+    sightings = _SNAPSHOT["sightings"]
+    sightings = sightings[sightings["Ranger_ID"].isin(ranger_ids)] if not sightings.empty else empty
+    equipment = _SNAPSHOT["equipment"]
+    equipment = equipment[equipment["Ranger_ID"].isin(ranger_ids)] if not equipment.empty else empty
+
+    title = f"{habitat['habitat_type']} - {habitat['region']}"
+    body = "".join([
+        _section("Habitat", _table(pd.DataFrame([habitat]))),
+        _section(f"Species ({len(species)})", _table(species)),
+        _section(f"Threat Reports, last {options['days']} days ({len(threats)})",
+                 _table(threat_levels) + _table(threats)),
+        _section(f"Assigned Rangers ({len(rangers)})", _table(rangers)),
+        _section(f"Sightings by Assigned Rangers, last {options['days']} days ({len(sightings)})",
+                 _table(sightings)),
+        _section(f"Equipment Held by Assigned Rangers ({len(equipment)})", _table(equipment)),
+    ])
+    doc = PAGE.format(title=html.escape(title),
+                      subtitle=f"Habitat {habitat_id} &middot; generated {options['today']}",
+                      body=body)
+    path = os.path.join(options["out_dir"], f"habitat_{habitat_id}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(doc)
+    if options["pdf"]:
+        HTML(string=doc).write_pdf(path[:-5] + ".pdf")
+    return path
+
+
+# ------------------------------------------------------
+# Parent side
+# ------------------------------------------------------
+def write_index(out_dir, habitats, overview, today):
+    links = "".join(
+        f'<li><a href="habitat_{h.Habitat_ID}.html">{html.escape(f"{h.habitat_type} - {h.region}")}</a></li>'
+        for h in habitats.itertuples())
+    body = _section("Habitat Reports", f"<ul>{links}</ul>")
+    body += "".join(_section(title, _table(df)) for title, df in overview.items())
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(PAGE.format(title="Sanctuary Summary", subtitle=f"generated {today}", body=body))
+
+
+def render_all(data, options, workers):
+    habitat_ids = list(data["habitats"]["Habitat_ID"]) if not data["habitats"].empty else []
+    chunksize = max(1, len(habitat_ids) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data, options)) as pool:
+        return list(pool.map(render_habitat, habitat_ids, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render one report per habitat.")
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR, help="output directory")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="threat/sighting window")
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="worker process counts; several values run a timing sweep")
+    parser.add_argument("--pdf", action="store_true", help="also write PDFs (needs weasyprint)")
+    args = parser.parse_args()
+    if args.pdf and HTML is None:
+        parser.error("--pdf needs the weasyprint package")
+
+    os.makedirs(args.out, exist_ok=True)
+    today = date.today()
+    options = {"out_dir": args.out, "days": args.days, "pdf": args.pdf, "today": today.isoformat()}
+
+    start = time.perf_counter()
+    conn = connect()
+    try:
+        data, overview = prefetch(conn, today - timedelta(days=args.days))
+    finally:
+        conn.close()
+    fetched = time.perf_counter() - start
+    rows = sum(len(df) for df in data.values())
+    print(f"Prefetch: {rows} rows in {fetched:.2f}s")
+    write_index(args.out, data["habitats"], overview, options["today"])
+
+    print(f"{'workers':>8} {'reports':>8} {'seconds':>8} {'reports/s':>10}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        paths = render_all(data, options, workers)
+        elapsed = time.perf_counter() - start
+        rate = len(paths) / elapsed if elapsed > 0 else 0.0
+        print(f"{workers:>8} {len(paths):>8} {elapsed:>8.2f} {rate:>10.1f}")
+    print(f"Reports written to {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
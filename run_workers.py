@@ -0,0 +1,67 @@
+# ==========================================================
+# MULTI-WORKER LAUNCHER
+# Starts N Streamlit processes of the app on consecutive ports,
+# all pointing at the same shared session/cache store:
+#
+#     python run_workers.py --workers 4                 # file store
+#     python run_workers.py --workers 8 --store redis
+#
+# Put a load balancer in front, e.g. nginx:
+#     upstream wildlife { ip_hash; server 127.0.0.1:8501; server 127.0.0.1:8502; ... }
+# (plus the websocket Upgrade headers). ip_hash keeps a browser on
+# one worker while its websocket is open; after a reload or a worker
+# restart any worker restores the login from the session cookie.
+# Ctrl+C stops every worker.
+# ==========================================================
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from shared_store import BACKENDS, DEFAULT_DIR, DEFAULT_REDIS_URL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several Streamlit workers sharing one store.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--base-port", type=int, default=8501)
+    parser.add_argument("--store", choices=BACKENDS, default="file")
+    parser.add_argument("--store-dir", default=DEFAULT_DIR, help="directory for --store file")
+    parser.add_argument("--redis-url", default=DEFAULT_REDIS_URL, help="server for --store redis")
+    parser.add_argument("--app", default="login.py", help="entry page")
+    args = parser.parse_args()
+    if args.store == "memory" and args.workers > 1:
+        parser.error("--store memory cannot be shared between workers; use file or redis")
+
+    env = dict(os.environ, WILDLIFE_STORE=args.store,
+               WILDLIFE_STORE_DIR=os.path.abspath(args.store_dir), WILDLIFE_REDIS_URL=args.redis_url)
+    workers = []
+    for i in range(args.workers):
+        port = args.base_port + i
+        workers.append(subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", args.app,
+             "--server.port", str(port), "--server.headless", "true"],
+            env=env))
+        print(f"worker {i + 1}: http://localhost:{port}")
+    print(f"{args.workers} workers, shared store: {args.store}")
+
+    try:
+        while all(w.poll() is None for w in workers):
+            time.sleep(1)
+        print("A worker exited; stopping the others.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for w in workers:
+            if w.poll() is None:
+                w.terminate()
+        for w in workers:
+            try:
+                w.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                w.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# ==========================================================
+# GLOBAL SEARCH
+# One round trip over the FULLTEXT indexes from section 11 of
+# final_project.sql: threat descriptions, species common /
+# scientific / alternative names, habitat regions and rangers.
+# Each source returns its own top hits; MATCH scores depend on
+# the index they come from, so each source's scores are divided
+# by its best score before the hits are merged.
+# ==========================================================
+import re
+
+DEFAULT_LIMIT = 20
+SNIPPET_CHARS = 160
+
+SEARCH_KINDS = ["Threat Report", "Species", "Alternative Name", "Habitat", "Ranger"]
+
+# (kind, SELECT returning id, title, detail, score); every %s is the search text
+_SOURCES = {
+    "Threat Report": """
+        SELECT 'Threat Report' AS kind, tr.Report_ID AS id,
+               CONCAT(h.habitat_type, ' - ', h.region, ' (', tr.Report_Date, ', ', tr.Threat_Level, ')') AS title,
+               LEFT(tr.Description, {snippet}) AS detail,
+               MATCH(tr.Description) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM Threat_Report tr
+        JOIN Habitat h ON tr.Habitat_ID = h.Habitat_ID
+        WHERE MATCH(tr.Description) AGAINST (%s IN BOOLEAN MODE)
+    """,
+    "Species": """
+        SELECT 'Species' AS kind, Sp_ID AS id, common_name AS title, Scientific_name AS detail,
+               MATCH(common_name, Scientific_name) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM Species
+        WHERE MATCH(common_name, Scientific_name) AGAINST (%s IN BOOLEAN MODE)
+    """,
+    "Alternative Name": """
+        SELECT 'Alternative Name' AS kind, a.Sp_ID AS id, a.Alt_Name AS title,
+               CONCAT('Also known as ', s.common_name) AS detail,
+               MATCH(a.Alt_Name) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM Alt_Names a
+        JOIN Species s ON a.Sp_ID = s.Sp_ID
+        WHERE MATCH(a.Alt_Name) AGAINST (%s IN BOOLEAN MODE)
+    """,
+    "Habitat": """
+        SELECT 'Habitat' AS kind, Habitat_ID AS id, habitat_type AS title, region AS detail,
+               MATCH(region, habitat_type) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM Habitat
+        WHERE MATCH(region, habitat_type) AGAINST (%s IN BOOLEAN MODE)
+    """,
+    "Ranger": """
+        SELECT 'Ranger' AS kind, Ranger_ID AS id, fname AS title, raankOfRanger AS detail,
+               MATCH(fname) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM Ranger
+        WHERE MATCH(fname) AGAINST (%s IN BOOLEAN MODE)
+    """,
+}
+
+
+# --- Free text -> boolean-mode query: every word required, prefix match ---
+# Only word characters are kept, so user input cannot inject operators.
+# Single letters are dropped (far below the FULLTEXT minimum token size).
+def to_boolean_query(text):
+    words = [w for w in re.findall(r"\w+", text or "") if len(w) > 1]
+    return " ".join(f"+{w}*" for w in words)
+
+
+# --- One source's top hits, scored relative to its best hit (0-1] ---
+def _ranked_source(kind):
+    return f"""(
+        SELECT kind, id, title, detail, score / MAX(score) OVER () AS score
+        FROM ({_SOURCES[kind].format(snippet=SNIPPET_CHARS)} ORDER BY score DESC LIMIT %s) AS hits
+    )"""
+
+
+# --- Build the UNION ALL statement for the chosen kinds ---
+def build_search(text, kinds=None, limit=DEFAULT_LIMIT):
+    kinds = [k for k in (kinds or SEARCH_KINDS) if k in _SOURCES]
+    boolean = to_boolean_query(text)
+    if not boolean or not kinds:
+        return None, ()
+    parts = [_ranked_source(k) for k in kinds]
+    query = "\nUNION ALL\n".join(parts) + "\nORDER BY score DESC, kind, id LIMIT %s"
+    params = []
+    for _ in kinds:
+        params.extend([boolean, boolean, limit])
+    params.append(limit)
+    return query, tuple(params)
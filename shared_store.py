@@ -0,0 +1,284 @@
+# ==========================================================
+# SHARED SESSION + CACHE STORE
+# Lets several Streamlit worker processes serve the same users:
+#
+# - SessionStore: login identity (user, role) under a random token
+#   kept in a browser cookie (SESSION_COOKIE), so any worker can pick
+#   the session up after a reload or reconnect. A session is bound to
+#   the browser's User-Agent, expires after SESSION_TTL idle seconds
+#   (and SESSION_MAX_AGE at most), and is deleted for every worker at
+#   logout. Tokens are stored hashed.
+#   Limits: the cookie is written by page JavaScript (Streamlit has no
+#   server-side cookie setter), so it cannot be HttpOnly and any script
+#   running in the page can read it. The User-Agent binding only stops
+#   casual reuse: a stolen token replayed with the same User-Agent is
+#   accepted until it expires or the user logs out. Serve the app over
+#   HTTPS and do not load untrusted scripts into it.
+# - SharedCache: query results shared by all workers, plus a
+#   generation token that any worker bumps after a write so every
+#   worker drops what it cached before.
+#
+# Backend chosen with WILDLIFE_STORE:
+#   memory  one process only (default; also the local test stand-in)
+#   file    a directory shared by the workers on one host
+#           (WILDLIFE_STORE_DIR, default .wildlife_store)
+#   redis   a Redis server (WILDLIFE_REDIS_URL, default
+#           redis://localhost:6379/0); needs the redis package
+#
+# Values are pickled: only point this at storage you trust.
+# ==========================================================
+import hashlib
+import os
+import pickle
+import secrets
+import tempfile
+import threading
+import time
+import uuid
+from functools import lru_cache
+
+try:
+    import redis
+except ImportError:  # only needed for WILDLIFE_STORE=redis
+    redis = None
+
+BACKENDS = ("memory", "file", "redis")
+DEFAULT_BACKEND = os.environ.get("WILDLIFE_STORE", "memory")
+DEFAULT_DIR = os.environ.get("WILDLIFE_STORE_DIR", ".wildlife_store")
+DEFAULT_REDIS_URL = os.environ.get("WILDLIFE_REDIS_URL", "redis://localhost:6379/0")
+
+SESSION_COOKIE = "wildlife_sid"
+SESSION_TTL = int(os.environ.get("WILDLIFE_SESSION_TTL", "3600"))         # idle seconds
+SESSION_MAX_AGE = int(os.environ.get("WILDLIFE_SESSION_MAX_AGE", str(8 * 3600)))
+CACHE_TTL = 300                    # seconds a shared query result is kept
+MAX_SHARED_BYTES = 1024 * 1024     # bigger results stay per-process only
+PURGE_EVERY = 200                  # file store: sweep expired files every N writes
+GENERATION_KEY = "cache:generation"
+
+
+# ------------------------------------------------------
+# Key/value backends: get, set (optional ttl seconds), delete
+# ------------------------------------------------------
+class MemoryStore:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.time() + ttl if ttl else None, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+# One file per key, written to a temp file and renamed into place so a
+# reader never sees half a value. Works across processes on one host.
+class FileStore:
+    def __init__(self, path=DEFAULT_DIR):
+        self.path = path
+        self._writes = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha256(key.encode()).hexdigest() + ".pkl")
+
+    def get(self, key):
+        try:
+            with open(self._file(key), "rb") as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires is not None and expires < time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((time.time() + ttl if ttl else None, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._file(key))
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self.purge()
+
+    def delete(self, key):
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    # --- Remove expired entries (and temp files left by a crash) ---
+    def purge(self):
+        now = time.time()
+        removed = 0
+        for name in os.listdir(self.path):
+            full = os.path.join(self.path, name)
+            try:
+                if name.endswith(".tmp"):
+                    if now - os.path.getmtime(full) > 3600:
+                        os.remove(full)
+                    continue
+                with open(full, "rb") as f:
+                    expires, _ = pickle.load(f)
+                if expires is not None and expires < now:
+                    os.remove(full)
+                    removed += 1
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+        return removed
+
+
+class RedisStore:
+    def __init__(self, url=DEFAULT_REDIS_URL, prefix="wildlife:"):
+        if redis is None:
+            raise RuntimeError("WILDLIFE_STORE=redis needs the redis package")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return None if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                         ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+
+def open_store(backend=None):
+    backend = backend or DEFAULT_BACKEND
+    if backend == "memory":
+        return MemoryStore()
+    if backend == "file":
+        return FileStore()
+    if backend == "redis":
+        return RedisStore()
+    raise ValueError(f"Unknown WILDLIFE_STORE backend {backend!r}; use one of {', '.join(BACKENDS)}")
+
+
+# ------------------------------------------------------
+# Sessions
+# ------------------------------------------------------
+class SessionStore:
+    def __init__(self, store, ttl=SESSION_TTL, max_age=SESSION_MAX_AGE):
+        self.store = store
+        self.ttl = ttl
+        self.max_age = max_age
+
+    # The store only ever sees a hash of the token
+    @staticmethod
+    def _key(token):
+        return "session:" + hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _client(client):
+        return hashlib.sha256((client or "").encode()).hexdigest()
+
+    # --- New session for data (e.g. {"user", "role"}) -> token ---
+    # client: what the browser presents with every request besides the
+    # token (its User-Agent); get() must be given the same value.
+    def create(self, data, client=None):
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        self.store.set(self._key(token), {"data": dict(data), "client": self._client(client),
+                                          "created": now, "renewed": now}, self.ttl)
+        return token
+
+    # --- Session data, or None if unknown/expired/another client ---
+    # Sliding expiry: renewed at most every quarter TTL, not on every
+    # read, and never past max_age from login.
+    def get(self, token, client=None):
+        if not token:
+            return None
+        record = self.store.get(self._key(token))
+        if record is None or record["client"] != self._client(client):
+            return None
+        now = time.time()
+        if now - record["created"] > self.max_age:
+            self.delete(token)
+            return None
+        if now - record["renewed"] > self.ttl / 4:
+            record["renewed"] = now
+            self.store.set(self._key(token), record,
+                           max(1, int(min(self.ttl, record["created"] + self.max_age - now))))
+        return record["data"]
+
+    def delete(self, token):
+        if token:
+            self.store.delete(self._key(token))
+
+
+# ------------------------------------------------------
+# Shared query cache
+# ------------------------------------------------------
+class SharedCache:
+    def __init__(self, store, ttl=CACHE_TTL, max_bytes=MAX_SHARED_BYTES):
+        self.store = store
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    # --- Token that changes whenever any worker wrote data ---
+    def generation(self):
+        value = self.store.get(GENERATION_KEY)
+        if value is None:
+            value = self.bump()
+        return value
+
+    def bump(self):
+        value = uuid.uuid4().hex
+        self.store.set(GENERATION_KEY, value)
+        return value
+
+    @staticmethod
+    def _key(key):
+        return "cache:" + hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+        return self.store.get(self._key(key))
+
+    # Values over max_bytes (pickled) are not shared; returns whether stored
+    def set(self, key, value):
+        if len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) > self.max_bytes:
+            return False
+        self.store.set(self._key(key), value, self.ttl)
+        return True
+
+    # --- Shared value for key, or build(), share and return it ---
+    # build() returning None (e.g. a failed query) is not stored.
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is None:
+            value = build()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+
+# One store per process, chosen by WILDLIFE_STORE
+@lru_cache(maxsize=None)
+def get_store():
+    return open_store()
+
+
+def get_sessions():
+    return SessionStore(get_store())
+
+
+def get_shared_cache():
+    return SharedCache(get_store())
@@ -0,0 +1,229 @@
+# ==========================================================
+# DUPLICATE SIGHTING DETECTION + MERGE
+# Rangers often log the same animal at nearly the same place and
+# time. Those Sighting + Sighting_Details rows inflate the sighting
+# counts. This finds them and either flags them
+# (Sighting_Duplicate, section 17 of final_project.sql) or merges
+# them into the first sighting of their cluster.
+#
+#     python sighting_dedup.py                        # report only
+#     python sighting_dedup.py --mode flag --window-minutes 45
+#     python sighting_dedup.py --mode merge --since 2024-01-01
+#
+# Sightings are read in date windows. Inside a window the detail
+# rows are sorted by (animal, normalised location, time) and split
+# wherever the animal or place changes or the gap to the previous
+# sighting exceeds the window: one sort plus a diff and a cumulative
+# sum, with no pairwise comparison. A cluster never spans more than
+# the window from its first sighting, so the few runs longer than
+# that (an animal watched for hours) are cut again from their first
+# sighting on. Every window is written in one transaction.
+# ==========================================================
+import argparse
+import math
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from db import connect, insert_many, transaction
+from name_resolver import normalize
+
+DEFAULT_WINDOW = timedelta(minutes=30)
+DEFAULT_CHUNK_DAYS = 31
+WRITE_BATCH = 1000
+MODES = ("report", "flag", "merge")
+
+KEY = ["sighting_ID", "Animal_ID", "Ranger_ID"]
+
+_LOAD = """
+    SELECT sd.sighting_ID, sd.Animal_ID, sd.Ranger_ID, s.Sighting_Date, s.Sighting_Time, s.Location
+    FROM Sighting s
+    JOIN Sighting_Details sd ON sd.sighting_ID = s.Sighting_ID
+    WHERE s.Sighting_Date >= %s AND s.Sighting_Date < %s
+"""
+
+
+# --- Detail rows of sightings dated [start, end) ---
+def load_window(conn, start, end):
+    cursor = conn.cursor()
+    cursor.execute(_LOAD, (start, end))
+    rows = cursor.fetchall()
+    cursor.close()
+    df = pd.DataFrame(rows, columns=KEY + ["Sighting_Date", "Sighting_Time", "Location"])
+    # TIME comes back as timedelta; a missing time or place is never matched
+    df["ts"] = pd.to_datetime(df["Sighting_Date"]) + pd.to_timedelta(df["Sighting_Time"])
+    return df.drop(columns=["Sighting_Date", "Sighting_Time"])
+
+
+# --- Cluster duplicates ---
+# df: sighting_ID, Animal_ID, Ranger_ID, ts, Location.
+# Returns the duplicate detail rows with keep_sighting_ID (the earliest
+# sighting of their cluster) and the action a merge takes:
+# "move" the detail onto the kept sighting, or "drop" it because the
+# kept sighting already has that animal/ranger pair.
+def find_duplicates(df, window=DEFAULT_WINDOW):
+    df = df[df["ts"].notna() & df["Location"].notna()]
+    if df.empty:
+        return df.assign(keep_sighting_ID=pd.Series(dtype="int64"), action=pd.Series(dtype="object"))
+    locations = df["Location"].astype(str)
+    uniques = locations.unique()
+    place = locations.map(dict(zip(uniques, (normalize(u) for u in uniques))))
+    df = df.assign(place=pd.factorize(place)[0])
+    df = df.sort_values(["Animal_ID", "place", "ts", "sighting_ID"], kind="mergesort")
+
+    animal = df["Animal_ID"].to_numpy()
+    place = df["place"].to_numpy()
+    ts = df["ts"].to_numpy()
+    limit = np.timedelta64(pd.Timedelta(window))
+    starts = np.ones(len(df), dtype=bool)
+    starts[1:] = (animal[1:] != animal[:-1]) | (place[1:] != place[:-1]) | ((ts[1:] - ts[:-1]) > limit)
+    run_id = np.cumsum(starts) - 1
+    bounds = np.append(np.flatnonzero(starts), len(df))
+    cluster = np.zeros(len(df), dtype=np.int64)
+    # Runs spanning more than the window are cut from their first sighting on
+    over = ts - ts[bounds[run_id]] > limit
+    for r in np.unique(run_id[over]):
+        anchor, part = ts[bounds[r]], 0
+        for i in range(bounds[r] + 1, bounds[r + 1]):
+            if ts[i] - anchor > limit:
+                anchor, part = ts[i], part + 1
+            cluster[i] = part
+
+    keep = df.groupby([run_id, cluster])["sighting_ID"].transform("first")
+    dups = df.assign(keep_sighting_ID=keep.to_numpy())
+    dups = dups[dups["sighting_ID"] != dups["keep_sighting_ID"]]
+
+    # Moving would collide with a row the kept sighting already has
+    # (or another duplicate moved there first): drop those instead
+    existing = pd.MultiIndex.from_frame(df[KEY])
+    target = pd.MultiIndex.from_arrays([dups["keep_sighting_ID"], dups["Animal_ID"], dups["Ranger_ID"]])
+    collides = target.isin(existing) | target.duplicated()
+    dups = dups.assign(action=["drop" if c else "move" for c in collides])
+    return dups.drop(columns=["place"])
+
+
+# --- Record duplicates for review ---
+def flag(cursor, dups):
+    rows = list(zip(*(dups[c].tolist() for c in KEY + ["keep_sighting_ID"])))
+    for i in range(0, len(rows), WRITE_BATCH):
+        insert_many(cursor, "Sighting_Duplicate", tuple(KEY + ["keep_sighting_ID"]), rows[i:i + WRITE_BATCH],
+                    on_duplicate="keep_sighting_ID = VALUES(keep_sighting_ID), detected_at = CURRENT_TIMESTAMP")
+    return len(rows)
+
+
+# --- Fold duplicates into the kept sightings ---
+# Details are moved with UPDATE (trg_no_sick_sighting guards inserts
+# only) or dropped; sightings left without details are deleted, and
+# earlier flags for the merged sightings are cleared.
+# Returns (details moved, details dropped, sightings deleted).
+def merge(cursor, dups):
+    move = dups[dups["action"] == "move"]
+    drop = dups[dups["action"] == "drop"]
+    sighting_ids = sorted(set(dups["sighting_ID"].tolist()))
+    cursor.executemany("DELETE FROM Sighting_Duplicate WHERE sighting_ID = %s", [(s,) for s in sighting_ids])
+    if len(move):
+        cursor.executemany(
+            "UPDATE Sighting_Details SET sighting_ID = %s WHERE sighting_ID = %s AND Animal_ID = %s AND Ranger_ID = %s",
+            list(zip(*(move[c].tolist() for c in ["keep_sighting_ID"] + KEY))))
+    if len(drop):
+        cursor.executemany(
+            "DELETE FROM Sighting_Details WHERE sighting_ID = %s AND Animal_ID = %s AND Ranger_ID = %s",
+            list(zip(*(drop[c].tolist() for c in KEY))))
+    emptied = 0
+    for i in range(0, len(sighting_ids), WRITE_BATCH):
+        chunk = sighting_ids[i:i + WRITE_BATCH]
+        cursor.execute(f"""
+            DELETE FROM Sighting
+            WHERE Sighting_ID IN ({', '.join(['%s'] * len(chunk))})
+              AND NOT EXISTS (SELECT 1 FROM Sighting_Details sd WHERE sd.sighting_ID = Sighting.Sighting_ID)
+        """, tuple(chunk))
+        emptied += cursor.rowcount
+    return len(move), len(drop), emptied
+
+
+def _date_range(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(Sighting_Date), MAX(Sighting_Date) FROM Sighting")
+    first, last = cursor.fetchone()
+    cursor.close()
+    return first, last
+
+
+# --- Scan [since, until] window by window ---
+# Each window also reads the days just before it, so a cluster that
+# crosses a window edge is seen whole; only duplicates dated inside
+# the window are acted on. progress(stats) is called per window.
+def run(conn, since=None, until=None, mode="report", window=DEFAULT_WINDOW,
+        chunk_days=DEFAULT_CHUNK_DAYS, progress=None):
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    first, last = _date_range(conn)
+    stats = {"windows": 0, "rows": 0, "duplicates": 0, "moved": 0, "dropped": 0,
+             "sightings_deleted": 0, "flagged": 0, "seconds": 0.0, "found": []}
+    if first is None:
+        return stats
+    since, until = since or first, until or last
+    overlap = timedelta(days=math.ceil(window / timedelta(days=1)))
+    start_time = time.perf_counter()
+    start = since
+    while start <= until:
+        end = min(start + timedelta(days=chunk_days), until + timedelta(days=1))
+        df = load_window(conn, start - overlap, end)
+        dups = find_duplicates(df, window)
+        dups = dups[dups["ts"] >= pd.Timestamp(start)]
+        stats["windows"] += 1
+        stats["rows"] += len(df)
+        stats["duplicates"] += len(dups)
+        if len(dups) and mode == "report":
+            stats["found"].append(dups)
+        elif len(dups):
+            with transaction(conn) as cursor:
+                if mode == "flag":
+                    stats["flagged"] += flag(cursor, dups)
+                else:
+                    moved, dropped, deleted = merge(cursor, dups)
+                    stats["moved"] += moved
+                    stats["dropped"] += dropped
+                    stats["sightings_deleted"] += deleted
+        if progress:
+            progress({"window_start": start, "window_end": end, **{k: v for k, v in stats.items() if k != "found"}})
+        start = end
+    stats["seconds"] = time.perf_counter() - start_time
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find, flag or merge duplicate sightings.")
+    parser.add_argument("--mode", choices=MODES, default="report")
+    parser.add_argument("--since", type=date.fromisoformat, help="first sighting date (default: earliest)")
+    parser.add_argument("--until", type=date.fromisoformat, help="last sighting date (default: latest)")
+    parser.add_argument("--window-minutes", type=float, default=DEFAULT_WINDOW.total_seconds() / 60,
+                        help="max gap between sightings of one cluster")
+    parser.add_argument("--chunk-days", type=int, default=DEFAULT_CHUNK_DAYS)
+    args = parser.parse_args()
+
+    def show(p):
+        print(f"{p['window_start']} .. {p['window_end']}: {p['rows']} rows, {p['duplicates']} duplicates")
+
+    conn = connect()
+    try:
+        stats = run(conn, args.since, args.until, args.mode, timedelta(minutes=args.window_minutes),
+                    args.chunk_days, progress=show)
+    finally:
+        conn.close()
+    rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"{stats['rows']} detail rows in {stats['windows']} windows, {stats['seconds']:.2f}s ({rate:,.0f} rows/s)")
+    if args.mode == "report":
+        for dups in stats["found"]:
+            print(dups.to_string(index=False))
+    elif args.mode == "flag":
+        print(f"{stats['flagged']} duplicate details flagged in Sighting_Duplicate")
+    else:
+        print(f"{stats['moved']} details moved, {stats['dropped']} dropped, "
+              f"{stats['sightings_deleted']} sightings deleted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("aiomysql")
+pymysql = pytest.importorskip("pymysql")
+
+import api  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+
+# Records statements; fails any statement containing fail_on
+class FakeConn:
+    def __init__(self, rows=(), fail_on=None, error=None):
+        self.rows = list(rows)
+        self.fail_on = fail_on
+        self.error = error
+        self.executed = []
+        self.log = []
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    async def begin(self):
+        self.log.append("begin")
+
+    async def commit(self):
+        self.log.append("commit")
+
+    async def rollback(self):
+        self.log.append("rollback")
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 1
+        self.lastrowid = 10
+        self.result = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.conn.executed.append((" ".join(query.split()), params))
+        if self.conn.fail_on and self.conn.fail_on in query:
+            raise self.conn.error
+        self.result = list(self.conn.rows)
+
+    async def executemany(self, query, rows):
+        await self.execute(query, rows)
+
+    async def fetchone(self):
+        return self.result[0] if self.result else None
+
+    async def fetchall(self):
+        return self.result
+
+
+def fake_request(conn, **query_params):
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+    pool = SimpleNamespace(acquire=acquire)
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(pool=pool)), query_params=query_params)
+
+
+SIGHTING = {"Ranger_ID": 1, "Sighting_Date": "2024-05-01", "Sighting_Time": "10:00:00", "Location": "Salt Lick"}
+THREAT = {"Habitat_ID": 2, "Ranger_ID": 1, "Threat_Level": "High", "Description": "Snares"}
+
+
+def test_invalid_body_is_422_before_any_statement():
+    conn = FakeConn()
+    with pytest.raises(api.ApiError) as e:
+        asyncio.run(api._run(conn, "threat", dict(THREAT, Threat_Level="Extreme")))
+    assert e.value.status == 422
+    assert conn.executed == []
+
+
+@pytest.mark.parametrize("errno, status", [(1062, 409), (1452, 422), (1644, 409), (1265, 422), (1205, 500)])
+def test_db_error_status(errno, status):
+    conn = FakeConn(fail_on="Threat_Report", error=pymysql.err.OperationalError(errno, "message"))
+    with pytest.raises(api.ApiError) as e:
+        asyncio.run(api._run(conn, "threat", dict(THREAT, Capture_Key="k-1")))
+    assert (e.value.status, e.value.detail) == (status, "message")
+
+
+def test_lookup_keyset_after():
+    rows = [{"Animal_ID": 5, "Sp_ID": 3}, {"Animal_ID": 6, "Sp_ID": 1}, {"Animal_ID": 6, "Sp_ID": 2}]
+    conn = FakeConn(rows=rows)
+    page = asyncio.run(api.get_lookup("animals", fake_request(conn, health="Sick"), after="5,2", limit=2))
+    query, params = conn.executed[0]
+    assert "WHERE Health_status = %s AND (Animal_ID, Sp_ID) > (%s, %s)" in query
+    assert query.endswith("ORDER BY Animal_ID, Sp_ID LIMIT %s")
+    assert params == ["Sick", "5", "2", 3]
+    assert page == {"items": rows[:2], "next_after": "6,1"}
+
+
+def test_lookup_after_needs_every_key_column():
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(api.get_lookup("animals", fake_request(FakeConn()), after="5"))
+    assert e.value.status_code == 422
+
+
+def test_atomic_batch_rolls_back_on_failure():
+    conn = FakeConn(fail_on="LogThreatReport", error=pymysql.err.IntegrityError(1452, "unknown habitat"))
+    batch = api.BatchIn.model_validate({"atomic": True, "ops": [
+        {"op": "sighting", "body": SIGHTING}, {"op": "threat", "body": THREAT}]})
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(api.post_batch(batch, fake_request(conn)))
+    assert e.value.status_code == 422
+    assert e.value.detail == {"failed_op": 1, "error": "unknown habitat"}
+    assert conn.log == ["begin", "rollback"]
+
+
+def test_non_atomic_batch_commits_each_op():
+    conn = FakeConn(fail_on="LogThreatReport", error=pymysql.err.IntegrityError(1452, "unknown habitat"))
+    batch = api.BatchIn.model_validate({"ops": [
+        {"op": "sighting", "body": SIGHTING}, {"op": "threat", "body": THREAT}]})
+    result = asyncio.run(api.post_batch(batch, fake_request(conn)))
+    assert result["committed"] == 1
+    assert [r["ok"] for r in result["results"]] == [True, False]
+    assert conn.log == ["begin", "commit", "begin", "rollback"]
+
+
+@pytest.mark.parametrize("configured, sent", [(None, None), (None, "x"), ("secret", None), ("secret", "wrong")])
+def test_check_token_rejects(monkeypatch, configured, sent):
+    monkeypatch.setattr(api, "API_TOKEN", configured)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(api.check_token(sent))
+    assert e.value.status_code == 401
+
+
+def test_check_token_accepts(monkeypatch):
+    monkeypatch.setattr(api, "API_TOKEN", "secret")
+    asyncio.run(api.check_token("secret"))
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+import assignment_optimizer as ao
+
+
+# Same objective solved densely: one column per (habitat, slot) up to
+# capacity, plus a zero-valued "stay unassigned" column per ranger
+def dense_optimum(problem, capacity=ao.HABITAT_CAPACITY):
+    ranger_ids, habitat_ids = problem["ranger_ids"], problem["habitat_ids"]
+    n_r, n_h = len(ranger_ids), len(habitat_ids)
+    need = ao.habitat_need(problem["area"], problem["threat"])
+    _, scale = ao.slot_counts(need, n_r, capacity)
+    load = np.zeros(n_r)
+    current = np.zeros((n_r, n_h), dtype=bool)
+    for r, h in problem["assigned"]:
+        load[r - 1] += 1
+        current[r - 1, h - 1] = True
+    penalty = ao.LOAD_PENALTY * scale * (load / max(load.max(), 1))[:, None] * (need / need.max())[None, :]
+    k = min(capacity, n_r)
+    slot_h = np.repeat(np.arange(n_h), k)
+    slot_k = np.tile(np.arange(1, k + 1), n_h)
+    value = need[slot_h] / slot_k + ao.CONTINUITY_BONUS * scale * current[:, slot_h] - penalty[:, slot_h]
+    value = np.hstack([value, np.zeros((n_r, n_r))])
+    rows, cols = linear_sum_assignment(-value)
+    return value[rows, cols].sum(), scale, load, penalty
+
+
+def plan_value(problem, proposals, scale, load, penalty):
+    need = ao.habitat_need(problem["area"], problem["threat"])
+    current = set(map(tuple, problem["assigned"].tolist()))
+    return sum(need[p.Habitat_ID - 1] / p.slot
+               + ao.CONTINUITY_BONUS * scale * ((p.Ranger_ID, p.Habitat_ID) in current)
+               - penalty[p.Ranger_ID - 1, p.Habitat_ID - 1]
+               for p in proposals.itertuples())
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_matches_dense_optimum(seed):
+    rng = np.random.default_rng(seed)
+    problem = ao.synthetic_problem(int(rng.integers(1, 60)), int(rng.integers(1, 12)), seed)
+    proposals, unassigned, stats = ao.solve(problem)
+    best, scale, load, penalty = dense_optimum(problem)
+    assert plan_value(problem, proposals, scale, load, penalty) == pytest.approx(best)
+    assert proposals["Ranger_ID"].is_unique
+    assert len(proposals) + len(unassigned) == stats["rangers"]
+    assert proposals.groupby("Habitat_ID")["slot"].max().le(ao.HABITAT_CAPACITY).all()
+
+
+def test_full_habitats_report_unassigned_rangers():
+    proposals, unassigned, stats = ao.solve(ao.synthetic_problem(200, 1))
+    assert len(proposals) == ao.HABITAT_CAPACITY
+    assert len(unassigned) == stats["unassigned"] == 200 - ao.HABITAT_CAPACITY
+    assert set(unassigned["Ranger_ID"]).isdisjoint(proposals["Ranger_ID"])
+
+
+def test_empty_problem():
+    problem = ao.synthetic_problem(3, 1)
+    problem["habitat_ids"] = problem["habitat_ids"][:0]
+    proposals, unassigned, stats = ao.solve(problem)
+    assert proposals.empty and unassigned["Ranger_ID"].tolist() == [1, 2, 3]
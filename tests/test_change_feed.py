@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+
+from mysql.connector import errors
+
+import change_feed
+from change_feed import ChangeFeed
+
+T0 = datetime(2024, 5, 1, 12, 0, 0)
+
+
+# change_log as seen by another session: committed rows, seqs held by
+# open transactions, and the server clock
+class FakeLog:
+    def __init__(self, committed, held=(), nowait=True):
+        self.committed = {seq: ("Species", "I", '{"Sp_ID": %d}' % seq, T0) for seq in committed}
+        self.held = set(held)
+        self.nowait = nowait
+        self.now = T0
+        self.checkpoints = {}
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        self.statements.append("BEGIN")
+
+    def commit(self):
+        self.statements.append("COMMIT")
+
+    def rollback(self):
+        self.statements.append("ROLLBACK")
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+        self.result = []
+
+    def execute(self, query, params=()):
+        self.log.statements.append(" ".join(query.split()))
+        if "change_log_checkpoint" in query:
+            if query.startswith("SELECT"):
+                row = self.log.checkpoints.get(params[0])
+                self.result = [(row,)] if row is not None else []
+            elif "INSERT IGNORE" in query:
+                self.log.checkpoints.setdefault(*params)
+            else:
+                consumer, seq = params
+                self.log.checkpoints[consumer] = max(self.log.checkpoints.get(consumer, 0), seq)
+        elif "MIN(seq)" in query:
+            self.result = [(min(self.log.committed, default=1) - 1,)]
+        elif "NOW(6)" in query:
+            self.result = [(self.log.now,)]
+        elif "NOWAIT" in query:
+            if not self.log.nowait:
+                raise errors.ProgrammingError(msg="syntax", errno=1064)
+            after, before = params
+            if any(after < s < before for s in self.log.held):
+                raise errors.DatabaseError(msg="lock", errno=change_feed.ER_LOCK_NOWAIT)
+            self.result = [(sum(after < s < before for s in self.log.committed),)]
+        else:
+            after, limit = params
+            self.result = [(s,) + self.log.committed[s] for s in sorted(self.log.committed) if s > after][:limit]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def close(self):
+        pass
+
+
+def test_hole_held_by_open_transaction_is_never_skipped():
+    log = FakeLog([1, 2, 4, 5], held=[3])
+    feed = ChangeFeed("test")
+    assert feed.poll(log, 0)[1] == 2
+    log.now = T0 + timedelta(hours=2)
+    assert feed.poll(log, 2)[1] == 2
+    # it commits
+    log.held.clear()
+    log.committed[3] = ("Species", "I", '{"Sp_ID": 3}', T0)
+    changes, upto = feed.poll(log, 2)
+    assert upto == 5 and [c.seq for c in changes] == [3, 4, 5]
+
+
+def test_rolled_back_hole_is_skipped_after_grace():
+    log = FakeLog([1, 2, 4])
+    feed = ChangeFeed("test")
+    assert feed.poll(log, 0)[1] == 2
+    log.now = T0 + change_feed.HOLE_GRACE
+    changes, upto = feed.poll(log, 2)
+    assert upto == 4 and [c.seq for c in changes] == [4]
+    assert not feed._holes
+
+
+def test_without_nowait_timeout_runs_from_first_sight():
+    log = FakeLog([1, 2, 4], nowait=False)
+    # the row after the hole is already older than the timeout
+    log.now = T0 + timedelta(minutes=10)
+    feed = ChangeFeed("test")
+    assert feed.poll(log, 0)[1] == 2
+    log.now += feed.gap_timeout - timedelta(seconds=1)
+    assert feed.poll(log, 2)[1] == 2
+    log.now += timedelta(seconds=1)
+    assert feed.poll(log, 2)[1] == 4
+
+
+def test_table_filter_still_advances_checkpoint():
+    log = FakeLog([1, 2])
+    log.committed[2] = ("Animal", "U", '{"Animal_ID": 9}', T0)
+    changes, upto = ChangeFeed("test", tables=["Animal"]).poll(log, 0)
+    assert upto == 2 and [(c.table_name, c.pk) for c in changes] == [("Animal", {"Animal_ID": 9})]
+
+
+def test_hole_timings_belong_to_the_feed():
+    log = FakeLog([1, 2, 4])
+    first, second = ChangeFeed("test"), ChangeFeed("test")
+    assert first.poll(log, 0)[1] == 2
+    log.now = T0 + change_feed.HOLE_GRACE
+    # A second feed sees the hole for the first time and waits out its own grace
+    assert second.poll(log, 2)[1] == 2
+    assert first.poll(log, 2)[1] == 4
+    assert second._holes and not first._holes
+
+
+def test_new_consumer_creates_checkpoint_row_before_locking_it():
+    log = FakeLog([5, 6, 7])
+    seen = []
+    handled = ChangeFeed("fresh").consume(log, lambda changes, cursor: seen.extend(c.seq for c in changes))
+    assert handled == 3 and seen == [5, 6, 7]
+    assert log.checkpoints == {"fresh": 7}
+    insert = next(i for i, q in enumerate(log.statements) if q.startswith("INSERT IGNORE"))
+    lock = next(i for i, q in enumerate(log.statements) if q.endswith("FOR UPDATE"))
+    assert log.statements[insert + 1] == "COMMIT" and insert < lock
+
+
+def test_existing_checkpoint_is_kept():
+    log = FakeLog([5, 6, 7])
+    log.checkpoints["old"] = 6
+    assert ChangeFeed("old").consume(log, lambda changes, cursor: None) == 1
+    assert log.checkpoints == {"old": 7}
@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pytest
+
+from cooccurrence import CooccurrenceIndex, _incidence
+
+# Species 10 lives in habitats 1-2, species 20 in 1-3, species 30 only in 3
+INHABITS = [(10, 1), (10, 2), (20, 1), (20, 2), (20, 3), (30, 3)]
+# Sighting 101 saw two animals of species 10
+SIGHTINGS = [(100, 10), (100, 20), (101, 10), (101, 10), (102, 30)]
+
+
+@pytest.fixture
+def index():
+    return CooccurrenceIndex(INHABITS, SIGHTINGS)
+
+
+def test_incidence_is_binary_csr():
+    m = _incidence(np.array([5, 5, 7]), np.array([1, 1, 2]), np.array([5, 7]), np.array([1, 2]))
+    assert m.format == "csr"
+    assert m.toarray().tolist() == [[1, 0], [0, 1]]
+
+
+def test_matrices_count_shared_items(index):
+    assert index.species_ids.tolist() == [10, 20, 30]
+    assert index.habitat_ids.tolist() == [1, 2, 3]
+    assert index.species_species["Shared habitats"].toarray().tolist() == [[2, 2, 0], [2, 3, 1], [0, 1, 1]]
+    assert index.species_species["Co-sightings"].toarray().tolist() == [[2, 1, 0], [1, 1, 0], [0, 0, 1]]
+
+
+def test_similar_species_is_cosine_ranked(index):
+    result = index.similar_species(20)
+    assert [(sp_id, shared) for sp_id, _, shared in result] == [(10, 2), (30, 1)]
+    assert result[0][1] == pytest.approx(2 / math.sqrt(6))
+    assert result[1][1] == pytest.approx(1 / math.sqrt(3))
+    assert index.similar_species(20, k=1) == result[:1]
+    # Species with no shared habitat are not returned, nor is the species itself
+    assert [sp_id for sp_id, _, _ in index.similar_species(10)] == [20]
+
+
+def test_similar_species_by_cosighting(index):
+    [(sp_id, sim, shared)] = index.similar_species(10, basis="Co-sightings")
+    assert (sp_id, shared) == (20, 1)
+    assert sim == pytest.approx(1 / math.sqrt(2))
+
+
+def test_similar_habitats_and_unknown_ids(index):
+    result = index.similar_habitats(1)
+    assert [(h, shared) for h, _, shared in result] == [(2, 2), (3, 1)]
+    assert [sim for _, sim, _ in result] == pytest.approx([1.0, 0.5])
+    assert index.similar_species(99) == []
+    assert index.similar_habitats(99) == []
+
+
+def test_top_pairs(index):
+    assert index.top_pairs() == [(10, 20, 2), (20, 30, 1)]
+    assert index.top_pairs(n=1) == [(10, 20, 2)]
+    assert CooccurrenceIndex([], []).top_pairs() == []
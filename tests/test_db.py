@@ -0,0 +1,108 @@
+import pytest
+from mysql.connector import errors
+
+import db
+
+
+class FakeConn:
+    connection_id = 1
+
+    def __init__(self):
+        self.unread_result = False
+        self.calls = []
+
+    def disconnect(self):
+        self.calls.append("disconnect")
+
+    def close(self):
+        self.calls.append("close")
+
+
+class FakePool:
+    def __init__(self, conns):
+        self.conns = list(conns)
+
+    def get_connection(self):
+        if not self.conns:
+            raise errors.PoolError("pool exhausted")
+        return self.conns.pop()
+
+
+def test_pooled_connection_returned_to_pool(monkeypatch):
+    conn = FakeConn()
+    monkeypatch.setattr(db, "get_pool", lambda: FakePool([conn]))
+    with db.pooled_connection() as got:
+        assert got is conn
+    assert conn.calls == ["close"]
+
+
+def test_unread_result_is_dropped_before_return(monkeypatch):
+    conn = FakeConn()
+    monkeypatch.setattr(db, "get_pool", lambda: FakePool([conn]))
+    with pytest.raises(RuntimeError):
+        with db.pooled_connection() as got:
+            got.unread_result = True
+            raise RuntimeError("consumer stopped")
+    assert conn.calls == ["disconnect", "close"]
+
+
+def test_exhausted_pool_opens_a_plain_connection(monkeypatch):
+    plain = FakeConn()
+    monkeypatch.setattr(db, "get_pool", lambda: FakePool([]))
+    monkeypatch.setattr(db, "connect", lambda: plain)
+    with db.pooled_connection() as got:
+        assert got is plain
+        got.unread_result = True
+    assert plain.calls == ["close"]
+
+
+class PreparedCursor:
+    def __init__(self):
+        self.closed = False
+        self.column_names = ("n",)
+        self.rowcount = 1
+
+    def execute(self, sql, params):
+        assert not self.closed, "executed a closed cursor"
+        if params == ("bad",):
+            raise errors.ProgrammingError("bad value")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        self.closed = True
+
+
+class PreparingConn:
+    connection_id = 7
+
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, prepared=False):
+        self.cursors.append(PreparedCursor())
+        return self.cursors[-1]
+
+
+def test_prepared_cache_reuses_and_evicts(monkeypatch):
+    monkeypatch.setattr(db, "_prepared", type(db._prepared)())
+    monkeypatch.setattr(db, "MAX_PREPARED_STATEMENTS", 2)
+    conn = PreparingConn()
+    assert db.execute_prepared(conn, "SELECT 1", ()) == [{"n": 1}]
+    db.execute_prepared(conn, "SELECT 1", ())
+    assert len(conn.cursors) == 1
+    db.execute_prepared(conn, "SELECT 2", ())
+    db.execute_prepared(conn, "SELECT 3", ())
+    assert conn.cursors[0].closed and not conn.cursors[2].closed
+    db.forget_prepared(conn)
+    assert all(c.closed for c in conn.cursors)
+
+
+def test_failed_prepared_statement_is_not_reused(monkeypatch):
+    monkeypatch.setattr(db, "_prepared", type(db._prepared)())
+    conn = PreparingConn()
+    with pytest.raises(errors.ProgrammingError):
+        db.execute_prepared(conn, "SELECT %s", ("bad",))
+    db.execute_prepared(conn, "SELECT %s", ("ok",))
+    assert len(conn.cursors) == 2 and conn.cursors[0].closed
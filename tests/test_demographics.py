@@ -0,0 +1,70 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from demographics import (UNKNOWN_BAND, UNKNOWN_DOB, birth_cohorts, health_by_age, load_demographics,
+                          population_pyramid, species_summary)
+
+
+class RecordingConn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        assert query.count("%s") == len(params)
+        self.executed.append((" ".join(query.split()), params))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["Sp_ID", "Gender", "Health_status", "Birth_Year", "Age", "animal_count"])
+
+
+def test_load_computes_age_from_dob():
+    conn = RecordingConn([(1, "Male", "Healthy", 2020, 3, Decimal(2)), (1, "Female", "Sick", 0, None, Decimal(1))])
+    df = load_demographics(conn, sp_id=1, today=date(2024, 5, 1))
+    query, params = conn.executed[0]
+    assert "TIMESTAMPDIFF(YEAR, Birth_Date, %s)" in query and "AND Sp_ID = %s" in query
+    assert params == (UNKNOWN_DOB, UNKNOWN_DOB, date(2024, 5, 1), 1)
+    assert df["animal_count"].tolist() == [2, 1]
+    assert df["Age"].iloc[0] == 3 and np.isnan(df["Age"].iloc[1])
+
+
+def test_bands_follow_age_not_birth_year():
+    # Same birth year; only one has had this year's birthday
+    df = frame([(1, "Male", "Healthy", 2022, 2, 1), (1, "Female", "Healthy", 2022, 1, 4),
+                (1, "Female", "Sick", 0, np.nan, 3)])
+    pyramid = population_pyramid(df)
+    assert pyramid.loc["0-1", "Female"] == 4
+    assert pyramid.loc["2-4", "Male"] == 1
+    assert pyramid.loc[UNKNOWN_BAND, "Female"] == 3
+    assert health_by_age(df).loc[UNKNOWN_BAND, "Sick"] == 3
+
+
+def test_birth_cohorts_fill_gaps_and_skip_unknown():
+    df = frame([(1, "Male", "Healthy", 2019, 5, 2), (2, "Female", "Healthy", 2021, 3, 1),
+                (1, "Female", "Sick", 0, np.nan, 7)])
+    cohorts = birth_cohorts(df)
+    assert cohorts.index.tolist() == [2019, 2020, 2021]
+    assert cohorts["animals_now"].tolist() == [2, 0, 1]
+    assert cohorts["animals_now_born_by_year"].tolist() == [2, 2, 3]
+    assert birth_cohorts(frame([])).empty
+
+
+def test_species_summary_totals():
+    df = frame([(1, "Male", "Healthy", 2019, 5, 2), (1, "Female", "Sick", 2020, 4, 1),
+                (2, "Female", "Healthy", 2021, 3, 1)])
+    summary = species_summary(df)
+    assert summary["total"].to_dict() == {1: 3, 2: 1}
+    assert summary.loc[1, "Sick"] == 1
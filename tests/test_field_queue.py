@@ -0,0 +1,54 @@
+import pytest
+from mysql.connector import errors
+
+from field_queue import KIND_DETAIL, FieldQueue, is_offline_error
+
+
+def test_sync_pages_past_unresolved_captures(tmp_path):
+    queue = FieldQueue(str(tmp_path / "queue.sqlite3"))
+    sighting = queue.capture_sighting(1, "2024-05-01", "10:00:00", "Salt Lick")
+    waiting = queue.capture_sighting_detail(7, 1, sighting_key=sighting)
+    ready = queue.capture_sighting_detail(8, 1, sighting_id=42)
+
+    # The sighting cannot reach the server; details with a known sighting can
+    def push_details(conn, batch):
+        return [(c["payload"]["sighting_ID"], c["capture_key"]) for c in batch
+                if c["payload"]["sighting_ID"] is not None], []
+
+    queue._push_sightings = lambda conn, batch: ([], [])
+    queue._push_details = push_details
+    stats = queue.sync(None, batch_size=1)
+
+    assert stats == {"synced": 1, "rejected": 0, "batches": 3}
+    assert [c["capture_key"] for c in queue.pending()] == [sighting, waiting]
+    assert queue._capture_state(ready) == ("synced", 42)
+    assert queue.pending(KIND_DETAIL, after=queue.pending(KIND_DETAIL)[0]["seq"]) == []
+
+
+def test_save_lookup_interval(tmp_path):
+    queue = FieldQueue(str(tmp_path / "queue.sqlite3"))
+    assert queue.save_lookup("rangers", [{"Ranger_ID": 1}], min_interval=300)
+    assert not queue.save_lookup("rangers", [{"Ranger_ID": 2}], min_interval=300)
+    assert queue.load_lookup("rangers") == [{"Ranger_ID": 1}]
+    assert queue.save_lookup("rangers", [{"Ranger_ID": 2}])
+    assert queue.load_lookup("rangers") == [{"Ranger_ID": 2}]
+
+
+@pytest.mark.parametrize("error, offline", [
+    (errors.OperationalError(msg="lost", errno=2013), True),
+    (errors.InterfaceError(msg="refused", errno=2003), True),
+    (errors.InterfaceError(msg="no errno"), True),
+    (errors.InterfaceError(msg="out of sync", errno=2014), False),
+    (errors.OperationalError(msg="deadlock", errno=1213), False),
+    (errors.IntegrityError(msg="duplicate", errno=1062), False),
+])
+def test_is_offline_error(error, offline):
+    assert is_offline_error(error) is offline
+
+
+# The online attempt and the queued copy share one capture key
+def test_capture_with_given_key(tmp_path):
+    queue = FieldQueue(str(tmp_path / "queue.sqlite3"))
+    key = queue.capture_threat(3, 1, "High", "Snare line", capture_key="k-1")
+    assert key == "k-1"
+    assert [c["capture_key"] for c in queue.pending("threat")] == ["k-1"]
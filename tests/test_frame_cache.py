@@ -0,0 +1,56 @@
+import pandas as pd
+
+import frame_cache
+from frame_cache import FrameCache
+
+
+def test_version_change_rebuilds():
+    cache = FrameCache(budget_mb=1)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return pd.DataFrame({"a": [len(builds)]})
+
+    cache.get("k", 1, build)
+    cache.get("k", 1, build)
+    cache.get("k", 2, build)
+    assert len(builds) == 2
+
+
+def test_max_age_per_lookup(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(frame_cache.time, "monotonic", lambda: now[0])
+    cache = FrameCache(budget_mb=1, max_age=300)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return pd.DataFrame({"a": [1]})
+
+    cache.get("k", 0, build)
+    now[0] += 60
+    cache.get("k", 0, build)
+    assert len(builds) == 1
+    cache.get("k", 0, build, max_age=30)
+    assert len(builds) == 2
+
+
+def test_failed_build_is_not_stored():
+    cache = FrameCache(budget_mb=1)
+    assert cache.get("k", 0, lambda: None) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_dropping_a_session_keeps_shared_copy():
+    cache = FrameCache(budget_mb=1)
+    frame = pd.DataFrame({"a": range(100)})
+    cache.put(("shared", "species", None), 1, frame)
+    cache.put(("s1", "species", None), 1, frame.copy())
+    cache.put(("s1", "rows", 500), 1, pd.DataFrame({"b": [1]}))
+    assert cache.stats()["frames"] == 2 and cache.shared == 1
+
+    cache.invalidate(("s1",))
+    stats = cache.stats()
+    assert (stats["entries"], stats["frames"]) == (1, 1)
+    assert cache.get(("shared", "species", None), 1, lambda: None) is not None
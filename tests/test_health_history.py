@@ -0,0 +1,42 @@
+from datetime import date, datetime, time
+
+from health_history import status_as_of, status_counts_as_of
+
+END_OF_DAY = datetime.combine(date(2024, 3, 1), time.max)
+
+
+# Records each statement; returns no rows
+class RecordingConn:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, query, params):
+        assert query.count("%s") == len(params)
+        self.statements.append((" ".join(query.split()), params))
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+def test_status_as_of_pages():
+    conn = RecordingConn()
+    assert status_as_of(conn, date(2024, 3, 1), limit=500, offset=1000).empty
+    query, params = conn.statements[0]
+    assert query.endswith("LIMIT %s OFFSET %s")
+    assert params == (END_OF_DAY, END_OF_DAY, 500, 1000)
+
+
+def test_species_filter_applies_to_counts_and_rows():
+    conn = RecordingConn()
+    status_counts_as_of(conn, date(2024, 3, 1), sp_id=7)
+    status_as_of(conn, date(2024, 3, 1), sp_id=7)
+    (counts, count_params), (rows, row_params) = conn.statements
+    assert "GROUP BY h.status" in counts and "LIMIT" not in counts
+    assert count_params == (END_OF_DAY, 7, END_OF_DAY)
+    assert row_params[:3] == (END_OF_DAY, 7, END_OF_DAY)
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from name_resolver import NameResolver, normalize, trigrams
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Asian  Elephant", "asian elephant"),
+    ("  ÉLÉPHANT d'Asie ", "elephant d asie"),
+    ("Panthera_leo", "panthera leo"),
+    ("Straße", "strasse"),
+    (None, ""),
+    ("--", ""),
+])
+def test_normalize(name, key):
+    assert normalize(name) == key
+
+
+@pytest.fixture
+def resolver():
+    r = NameResolver()
+    r.set_species(1, [("common_name", "Asian Elephant"), ("Scientific_name", "Elephas maximus")])
+    r.set_species(2, [("common_name", "African Elephant"), ("Scientific_name", "Loxodonta africana"),
+                      ("Alt_Name", "Asian Elephant")])
+    r.set_species(3, [("common_name", "Tiger"), ("Scientific_name", "Panthera tigris")])
+    return r
+
+
+def test_exact_match_prefers_common_name(resolver):
+    match = resolver.resolve("asian ELEPHANT")
+    assert (match.Sp_ID, match.source, match.score, match.ambiguous) == (1, "common_name", 1.0, True)
+    assert match.name == "Asian Elephant"
+
+
+def test_fuzzy_match_ranks_by_similarity(resolver):
+    match = resolver.resolve("Afrcan Elephant")
+    assert match.Sp_ID == 2 and match.source == "common_name" and 0.45 <= match.score < 1
+    assert resolver.resolve("Afrcan Elephant", fuzzy=False) is None
+    assert resolver.resolve("zebra") is None
+    ranked = [m.Sp_ID for m in resolver.suggest("Elephant")]
+    assert set(ranked[:2]) == {1, 2}
+
+
+def test_set_species_replaces_names(resolver):
+    resolver.set_species(3, [("common_name", "Bengal Tiger")])
+    assert resolver.resolve("Panthera tigris", fuzzy=False) is None
+    assert resolver.resolve("Bengal Tiger").Sp_ID == 3
+    assert resolver.resolve("Tiger", fuzzy=False) is None
+
+
+def test_drop_keeps_shared_keys(resolver):
+    # "asian elephant" is also an alternative name of species 2
+    resolver.set_species(1, [])
+    match = resolver.resolve("Asian Elephant")
+    assert (match.Sp_ID, match.source, match.ambiguous) == (2, "Alt_Name", False)
+    assert resolver.stats()["species"] == 2
+    assert resolver.resolve("Elephas maximus", fuzzy=False) is None
+
+
+def test_drop_removes_postings(resolver):
+    before = resolver.stats()["trigrams"]
+    resolver.set_species(4, [("common_name", "Qwxzvbn")])
+    assert resolver.stats()["trigrams"] > before
+    resolver.set_species(4, [])
+    assert resolver.stats()["trigrams"] == before
+    # A key that comes back is found again
+    resolver.set_species(5, [("common_name", "Qwxzvbn")])
+    assert resolver.resolve("qwxzvbm").Sp_ID == 5
+
+
+# Filtered search agrees with scoring every known name
+def test_scored_matches_brute_force():
+    rng = random.Random(7)
+    letters = "abcdeilmnorstu"
+    r = NameResolver()
+    for sp_id in range(1, 300):
+        r.set_species(sp_id, [("common_name", "".join(rng.choice(letters) for _ in range(rng.randint(3, 14)))),
+                              ("Alt_Name", "".join(rng.choice(letters) for _ in range(rng.randint(3, 14))))])
+    # Churn so ids, postings and cached arrays go through drops and re-adds
+    for sp_id in rng.sample(range(1, 300), 100):
+        r.set_species(sp_id, [("common_name", "".join(rng.choice(letters) for _ in range(rng.randint(3, 14))))])
+    keys = list(r._exact)
+    for _ in range(200):
+        query = normalize("".join(rng.choice(letters) for _ in range(rng.randint(3, 14))))
+        grams = trigrams(query)
+        for t in (0.2, 0.45, 0.7):
+            expected = set()
+            for key in keys:
+                other = trigrams(key)
+                n = len(grams & other)
+                if n / (len(grams) + len(other) - n) >= t:
+                    expected.add(key)
+            assert {k for _, k in r._scored(query, t)} == expected
@@ -0,0 +1,38 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from optimistic import build_conditional_update, changed_columns, same_value
+
+
+@pytest.mark.parametrize("stored, value", [
+    (Decimal("12.30"), 12.3),
+    (Decimal("12.30"), 12.304),          # rounded to the stored scale
+    (Decimal("7"), 7),
+    (None, ""),
+    ("", None),
+    (date(2024, 1, 2), date(2024, 1, 2)),
+])
+def test_same_value(stored, value):
+    assert same_value(stored, value)
+
+
+@pytest.mark.parametrize("stored, value", [
+    (Decimal("12.30"), 12.4),
+    (Decimal("12.30"), "abc"),
+    (None, "x"),
+    ("Male", "Female"),
+])
+def test_different_value(stored, value):
+    assert not same_value(stored, value)
+
+
+def test_untouched_decimal_is_not_written():
+    original = {"Habitat_ID": 3, "area_size": Decimal("12.30"), "region": "North", "row_version": 4}
+    assert changed_columns(original, {"area_size": 12.3, "region": "North"}) == {}
+    changes = changed_columns(original, {"area_size": 12.3, "region": "South"})
+    assert changes == {"region": "South"}
+    query, params = build_conditional_update("Habitat", original, changes)
+    assert query == "UPDATE Habitat SET region=%s WHERE Habitat_ID=%s AND row_version=%s"
+    assert params == ("South", 3, 4)
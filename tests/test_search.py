@@ -0,0 +1,40 @@
+import pytest
+
+from search import SEARCH_KINDS, build_search, to_boolean_query
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("asian elephant", "+asian* +elephant*"),
+    ("  Panthera   pardus ", "+Panthera* +pardus*"),
+    # Boolean-mode operators in user input are stripped, not passed through
+    ('+tiger -lion "snow leopard" ~bear <wolf> (fox) otter* @8', "+tiger* +lion* +snow* +leopard* +bear* +wolf* +fox* +otter*"),
+    ("'); DROP TABLE Species; --", "+DROP* +TABLE* +Species*"),
+    ("a b c", ""),
+    ("", ""),
+    (None, ""),
+])
+def test_to_boolean_query(text, expected):
+    assert to_boolean_query(text) == expected
+
+
+def test_build_search_placeholders_match_params():
+    query, params = build_search("grey wolf", limit=15)
+    assert query.count("%s") == len(params) == 3 * len(SEARCH_KINDS) + 1
+    assert params[:3] == ("+grey* +wolf*", "+grey* +wolf*", 15)
+    assert params[-1] == 15
+    assert query.count("UNION ALL") == len(SEARCH_KINDS) - 1
+    assert "grey" not in query
+
+
+def test_build_search_scores_each_source_against_its_best_hit():
+    query, _ = build_search("wolf", ["Species", "Habitat"])
+    assert query.count("score / MAX(score) OVER ()") == 2
+    assert query.rstrip().endswith("ORDER BY score DESC, kind, id LIMIT %s")
+
+
+def test_build_search_kinds_and_empty_input():
+    query, params = build_search("wolf", ["Ranger", "Unknown"])
+    assert "FROM Ranger" in query and "FROM Species" not in query
+    assert len(params) == 4
+    assert build_search("wolf", ["Unknown"]) == (None, ())
+    assert build_search("?!") == (None, ())
@@ -0,0 +1,117 @@
+import pytest
+
+import shared_store
+from shared_store import FileStore, MemoryStore, SessionStore, SharedCache, open_store
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(shared_store.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "file"])
+def store(request, tmp_path):
+    return MemoryStore() if request.param == "memory" else FileStore(str(tmp_path))
+
+
+def test_store_roundtrip_and_expiry(store, clock):
+    store.set("a", {"x": 1}, ttl=10)
+    store.set("b", [1, 2])
+    assert store.get("a") == {"x": 1}
+    clock[0] += 11
+    assert store.get("a") is None
+    assert store.get("b") == [1, 2]
+    store.delete("b")
+    store.delete("missing")
+    assert store.get("b") is None
+
+
+def test_file_store_purge(tmp_path, clock):
+    store = FileStore(str(tmp_path))
+    store.set("old", 1, ttl=5)
+    store.set("keep", 2)
+    clock[0] += 10
+    assert store.purge() == 1
+    assert store.get("keep") == 2
+
+
+def test_file_store_shared_between_instances(tmp_path):
+    FileStore(str(tmp_path)).set("k", "v")
+    assert FileStore(str(tmp_path)).get("k") == "v"
+
+
+def test_open_store_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        open_store("sqlite")
+
+
+def test_session_roundtrip_and_logout(store, clock):
+    sessions = SessionStore(store, ttl=100, max_age=1000)
+    token = sessions.create({"user": "root", "role": "Supervisor"}, client="Firefox")
+    assert sessions.get(token, "Firefox") == {"user": "root", "role": "Supervisor"}
+    # Another worker sees the same session, and the logout
+    other = SessionStore(store, ttl=100, max_age=1000)
+    assert other.get(token, "Firefox")["user"] == "root"
+    other.delete(token)
+    assert sessions.get(token, "Firefox") is None
+
+
+def test_session_bound_to_client(store):
+    sessions = SessionStore(store)
+    token = sessions.create({"user": "root"}, client="Firefox")
+    assert sessions.get(token, "curl") is None
+    assert sessions.get(token) is None
+    assert sessions.get(None, "Firefox") is None
+    assert sessions.get("guess", "Firefox") is None
+
+
+def test_session_token_not_stored_in_clear(clock):
+    store = MemoryStore()
+    token = SessionStore(store).create({"user": "root"})
+    assert not any(token in key for key in store._data)
+
+
+def test_session_sliding_and_absolute_expiry(store, clock):
+    sessions = SessionStore(store, ttl=100, max_age=250)
+    token = sessions.create({"user": "root"}, client="Firefox")
+    # Reads keep it alive past the idle TTL...
+    for _ in range(4):
+        clock[0] += 60
+        assert sessions.get(token, "Firefox") is not None
+    # ...but never past max_age from login
+    clock[0] += 20
+    assert sessions.get(token, "Firefox") is None
+
+
+def test_session_idle_expiry(store, clock):
+    sessions = SessionStore(store, ttl=100, max_age=1000)
+    token = sessions.create({"user": "root"})
+    clock[0] += 101
+    assert sessions.get(token) is None
+
+
+def test_shared_cache_generation(store):
+    cache = SharedCache(store)
+    first = cache.generation()
+    assert SharedCache(store).generation() == first
+    cache.bump()
+    assert SharedCache(store).generation() != first
+
+
+def test_shared_cache_get_or_build(store):
+    cache = SharedCache(store, max_bytes=1000)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return [1, 2, 3]
+
+    assert cache.get_or_build(("q", 1), build) == [1, 2, 3]
+    assert SharedCache(store).get_or_build(("q", 1), build) == [1, 2, 3]
+    assert len(calls) == 1
+    # Failed builds and oversized values are not shared
+    assert cache.get_or_build(("q", 2), lambda: None) is None
+    assert not cache.set(("big",), "x" * 2000)
+    assert cache.get(("big",)) is None
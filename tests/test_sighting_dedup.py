@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import sighting_dedup
+from sighting_dedup import find_duplicates, run
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["sighting_ID", "Animal_ID", "Ranger_ID", "ts", "Location"]).assign(
+        ts=lambda df: pd.to_datetime(df["ts"]))
+
+
+def test_cluster_measured_from_first_sighting():
+    df = frame([(1, 7, 1, "2024-05-01 10:00", "North Ridge"),
+                (2, 7, 2, "2024-05-01 10:25", "north ridge "),
+                (3, 7, 1, "2024-05-01 10:50", "North Ridge"),
+                (4, 7, 2, "2024-05-01 11:15", "North Ridge")])
+    dups = find_duplicates(df, timedelta(minutes=30))
+    assert dict(zip(dups["sighting_ID"], dups["keep_sighting_ID"])) == {2: 1, 4: 3}
+
+
+def test_other_animal_or_place_is_not_a_duplicate():
+    df = frame([(1, 7, 1, "2024-05-01 10:00", "North Ridge"),
+                (2, 8, 1, "2024-05-01 10:05", "North Ridge"),
+                (3, 7, 1, "2024-05-01 10:05", "Lake Shore")])
+    assert find_duplicates(df).empty
+
+
+def test_collisions_are_dropped():
+    df = frame([(1, 7, 1, "2024-05-01 10:00", "Salt Lick"),
+                (2, 7, 1, "2024-05-01 10:05", "Salt Lick"),   # kept sighting has ranger 1 already
+                (3, 7, 2, "2024-05-01 10:10", "Salt Lick"),
+                (4, 7, 2, "2024-05-01 10:15", "Salt Lick")])  # ranger 2 moved there by sighting 3
+    dups = find_duplicates(df).set_index("sighting_ID")
+    assert dups["keep_sighting_ID"].tolist() == [1, 1, 1]
+    assert dups["action"].to_dict() == {2: "drop", 3: "move", 4: "drop"}
+
+
+def test_missing_time_or_place_is_skipped():
+    df = frame([(1, 7, 1, "2024-05-01 10:00", None),
+                (2, 7, 1, None, "Salt Lick"),
+                (3, 7, 2, "2024-05-01 10:01", None)])
+    dups = find_duplicates(df)
+    assert dups.empty and {"keep_sighting_ID", "action"} <= set(dups.columns)
+
+
+@pytest.fixture
+def history(monkeypatch):
+    df = frame([(1, 7, 1, "2024-05-01 23:50", "Hill Camp"),
+                (2, 7, 2, "2024-05-02 00:05", "Hill Camp"),
+                (3, 9, 1, "2024-05-03 12:00", "Hill Camp")])
+
+    def load_window(conn, start, end):
+        return df[(df["ts"] >= pd.Timestamp(start)) & (df["ts"] < pd.Timestamp(end))]
+
+    monkeypatch.setattr(sighting_dedup, "load_window", load_window)
+    monkeypatch.setattr(sighting_dedup, "_date_range", lambda conn: (date(2024, 5, 1), date(2024, 5, 3)))
+
+
+def test_run_sees_clusters_across_window_edges(history):
+    stats = run(None, chunk_days=1)
+    assert stats["windows"] == 3
+    assert stats["duplicates"] == 1
+    found = pd.concat(stats["found"])
+    assert found[["sighting_ID", "keep_sighting_ID"]].values.tolist() == [[2, 1]]
+
+
+def test_run_rejects_unknown_mode(history):
+    with pytest.raises(ValueError):
+        run(None, mode="delete")
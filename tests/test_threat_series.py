@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from threat_series import POLL_OVERLAP, ThreatSeriesEngine
+
+TODAY = date(2024, 5, 31)
+T0 = datetime(2024, 5, 31, 12, 0, 0)
+
+
+# Habitat_Threat_Daily as seen by successive polls
+class FakeConn:
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.executed = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        self.executed.append((query, params))
+
+    def fetchall(self):
+        return self.batches.pop(0) if self.batches else []
+
+    def close(self):
+        pass
+
+
+def row(habitat_id, day, score, updated_at, count=1):
+    return (habitat_id, day, count, score, score, updated_at)
+
+
+def test_overlapping_polls_replace_day_totals():
+    first = [row(1, TODAY, 5.0, T0), row(2, TODAY, 1.0, T0)]
+    # The overlap window re-reads habitat 2 and brings habitat 1's new total
+    second = [row(1, TODAY, 8.0, T0 + timedelta(minutes=2), count=2), row(2, TODAY, 1.0, T0)]
+    engine = ThreatSeriesEngine(history_days=10)
+    conn = FakeConn(first, second)
+
+    assert engine.refresh(conn, today=TODAY)
+    assert engine.watermark == T0
+    assert engine.refresh(conn, today=TODAY)
+
+    start_day = TODAY - timedelta(days=9)
+    assert conn.executed[0][1] == (start_day,)
+    assert conn.executed[1][1] == (T0 - POLL_OVERLAP, start_day)
+    assert engine.watermark == T0 + timedelta(minutes=2)
+    assert len(engine.daily) == 2
+    daily = engine.habitat_series(1)["daily_score"]
+    assert daily.loc[str(TODAY)] == 8.0
+    assert engine.habitat_series(2)["daily_score"].sum() == 1.0
+
+
+def test_quiet_poll_keeps_ranking_and_old_days_slide_out():
+    engine = ThreatSeriesEngine(history_days=10)
+    conn = FakeConn([row(1, TODAY - timedelta(days=9), 4.0, T0)])
+    assert engine.refresh(conn, today=TODAY)
+    assert not engine.refresh(conn, today=TODAY)
+    # Next day the only row falls outside the 10-day window
+    assert engine.refresh(conn, today=TODAY + timedelta(days=1))
+    assert engine.daily.empty
+    assert engine.hotspots().empty
+
+
+def test_rolling_severity_and_zscore():
+    days = 40
+    start = TODAY - timedelta(days=days - 1)
+    rows = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        # Habitat 1: baseline alternates 1/3 (mean 2), then a week at 10
+        rows.append(row(1, day, 10.0 if i >= days - 7 else (1.0 if i % 2 == 0 else 3.0), T0))
+        # Habitat 2: flat 2; habitat 3: flat 2 with a bump on the last day
+        rows.append(row(2, day, 2.0, T0))
+        rows.append(row(3, day, 3.0 if i == days - 1 else 2.0, T0))
+    engine = ThreatSeriesEngine(history_days=days)
+    engine.refresh(FakeConn(rows), today=TODAY)
+
+    ranking = engine.hotspots().set_index("Habitat_ID")
+    assert engine.hotspots().iloc[0]["Habitat_ID"] == 1
+    assert ranking.loc[1, "severity_7d"] == pytest.approx(10.0)
+    assert ranking.loc[3, "severity_7d"] == pytest.approx(15 / 7)
+    # The 30-day baseline ends where the 7-day window starts: 15 ones and 15 threes
+    assert ranking.loc[1, "z_score"] == pytest.approx(8 / np.sqrt(30 / 29))
+    assert ranking.loc[1, "severity_30d"] == pytest.approx((12 * 1 + 11 * 3 + 7 * 10) / 30)
+    assert ranking["anomaly"].to_dict() == {1: True, 2: False, 3: True}
+    assert np.isnan(ranking.loc[2, "z_score"])
+    assert engine.hotspots(n=1).index.tolist() == [0]
@@ -0,0 +1,126 @@
+# ==========================================================
+# THREAT HOTSPOT TIME SERIES
+# Keeps a dense day x habitat matrix of threat scores in memory,
+# fed incrementally from Habitat_Threat_Daily (maintained by the
+# Threat_Report triggers, see section 8 of final_project.sql).
+#
+# Rolling 7/30-day severity and anomaly flags are computed with
+# vectorised pandas over all habitats at once, and the hotspot
+# ranking is cached so showing it is just a lookup.
+# ==========================================================
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+SHORT_WINDOW = 7
+LONG_WINDOW = 30
+HISTORY_DAYS = 120        # days kept in memory (>= LONG_WINDOW + baseline)
+ANOMALY_Z = 2.0           # 7-day level this many std devs above the 30-day baseline
+POLL_OVERLAP = timedelta(minutes=5)  # re-read recent rows in case of late commits
+
+
+class ThreatSeriesEngine:
+    def __init__(self, history_days=HISTORY_DAYS):
+        self.history_days = history_days
+        self.daily = pd.DataFrame(columns=["Habitat_ID", "Report_Day", "report_count", "score_sum", "max_score"])
+        self.watermark = None
+        self.as_of = None
+        self.ranking = None
+        self.rolling = {}
+        self._lock = threading.Lock()
+
+    # --- Pull changed rows since the last refresh ---
+    def _fetch(self, conn, start_day):
+        cursor = conn.cursor()
+        if self.watermark is None:
+            cursor.execute("""
+                SELECT Habitat_ID, Report_Day, report_count, score_sum, max_score, updated_at
+                FROM Habitat_Threat_Daily WHERE Report_Day >= %s
+            """, (start_day,))
+        else:
+            cursor.execute("""
+                SELECT Habitat_ID, Report_Day, report_count, score_sum, max_score, updated_at
+                FROM Habitat_Threat_Daily WHERE updated_at >= %s AND Report_Day >= %s
+            """, (self.watermark - POLL_OVERLAP, start_day))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    # --- Bring the series up to date; returns True if the ranking changed ---
+    def refresh(self, conn, today=None):
+        today = today or date.today()
+        start_day = today - timedelta(days=self.history_days - 1)
+        with self._lock:
+            rows = self._fetch(conn, start_day)
+            if not rows and self.as_of == today and self.ranking is not None:
+                return False
+
+            if rows:
+                fresh = pd.DataFrame(rows, columns=["Habitat_ID", "Report_Day", "report_count",
+                                                    "score_sum", "max_score", "updated_at"])
+                self.watermark = max(self.watermark or fresh["updated_at"].max(), fresh["updated_at"].max())
+                fresh = fresh.drop(columns="updated_at")
+                # Rows hold absolute day totals, so newer rows simply replace older ones
+                self.daily = (pd.concat([self.daily, fresh], ignore_index=True)
+                              .drop_duplicates(["Habitat_ID", "Report_Day"], keep="last"))
+
+            # Drop days that slid out of the window
+            self.daily = self.daily[pd.to_datetime(self.daily["Report_Day"]) >= pd.Timestamp(start_day)]
+            self._recompute(start_day, today)
+            return True
+
+    # --- Vectorised rolling severity + anomaly flags for every habitat ---
+    def _recompute(self, start_day, today):
+        days = pd.date_range(start_day, today, freq="D")
+        if self.daily.empty:
+            scores = pd.DataFrame(index=days, dtype=float)
+        else:
+            scores = (self.daily.assign(Report_Day=pd.to_datetime(self.daily["Report_Day"]))
+                      .pivot_table(index="Report_Day", columns="Habitat_ID", values="score_sum", aggfunc="sum")
+                      .reindex(days, fill_value=0).fillna(0).astype(float))
+
+        short = scores.rolling(SHORT_WINDOW, min_periods=1).sum() / SHORT_WINDOW
+        long = scores.rolling(LONG_WINDOW, min_periods=1).sum() / LONG_WINDOW
+        # Baseline: the 30 days *before* the short window, so a spike
+        # does not inflate its own baseline
+        baseline = scores.shift(SHORT_WINDOW)
+        base_mean = baseline.rolling(LONG_WINDOW, min_periods=SHORT_WINDOW).mean()
+        base_std = baseline.rolling(LONG_WINDOW, min_periods=SHORT_WINDOW).std()
+        z = (short - base_mean) / base_std.replace(0, np.nan)
+        anomaly = (z > ANOMALY_Z) | ((base_std == 0) & (short > base_mean))
+
+        self.rolling = {"daily": scores, "severity_7d": short, "severity_30d": long,
+                        "z": z, "anomaly": anomaly}
+        if scores.empty or scores.shape[1] == 0:
+            self.ranking = pd.DataFrame(columns=["Habitat_ID", "severity_7d", "severity_30d",
+                                                 "trend", "z_score", "anomaly"])
+        else:
+            last = scores.index[-1]
+            self.ranking = (pd.DataFrame({
+                "Habitat_ID": scores.columns.astype(int),
+                "severity_7d": short.loc[last].values,
+                "severity_30d": long.loc[last].values,
+                "trend": (short.loc[last] - long.loc[last]).values,
+                "z_score": z.loc[last].values,
+                "anomaly": anomaly.loc[last].fillna(False).astype(bool).values,
+            }).sort_values(["severity_7d", "severity_30d"], ascending=False, kind="stable")
+              .reset_index(drop=True))
+        self.as_of = today
+
+    # --- Cached ranking (call refresh() first) ---
+    def hotspots(self, n=None):
+        if self.ranking is None:
+            return None
+        return self.ranking if n is None else self.ranking.head(n)
+
+    # --- Daily score and rolling lines for one habitat (for charts) ---
+    def habitat_series(self, habitat_id):
+        if not self.rolling or habitat_id not in self.rolling["daily"].columns:
+            return None
+        return pd.DataFrame({
+            "daily_score": self.rolling["daily"][habitat_id],
+            "severity_7d": self.rolling["severity_7d"][habitat_id],
+            "severity_30d": self.rolling["severity_30d"][habitat_id],
+        })